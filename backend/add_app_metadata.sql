@@ -0,0 +1,6 @@
+-- Key/value metadata for one-off deploy steps (e.g. the seeded exercise catalog hash)
+CREATE TABLE IF NOT EXISTS app_metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
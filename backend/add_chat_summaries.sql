@@ -0,0 +1,12 @@
+-- Rolling summary of each user's older coach chat turns
+-- The coach prompt carries the latest turns verbatim plus this summary, so its
+-- size stays bounded. summarized_through / summarized_chat_id mark the newest
+-- chat_history row (created_at, chat_id) already folded into the summary.
+CREATE TABLE IF NOT EXISTS chat_summaries (
+    user_id TEXT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    summary TEXT NOT NULL,
+    summarized_through TIMESTAMP NOT NULL,
+    summarized_chat_id TEXT NOT NULL,
+    turn_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
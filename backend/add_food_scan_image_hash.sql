@@ -0,0 +1,4 @@
+-- Food scan images live in the blob store; rows keep the content hash
+-- Existing inline images are moved by migrate_food_scan_images.py
+ALTER TABLE food_scans
+ADD COLUMN IF NOT EXISTS image_hash TEXT;
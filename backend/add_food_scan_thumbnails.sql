@@ -0,0 +1,3 @@
+-- Thumbnail blob keys per size and format: {"160": {"webp": "<hash>", "jpeg": "<hash>"}, ...}
+ALTER TABLE food_scans
+ADD COLUMN IF NOT EXISTS thumbnails JSONB;
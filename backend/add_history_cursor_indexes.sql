@@ -0,0 +1,5 @@
+-- Indexes for keyset pagination on the history endpoints (newest first on (timestamp, id))
+CREATE INDEX IF NOT EXISTS idx_food_scans_user_cursor ON food_scans(user_id, scanned_at DESC, scan_id DESC);
+CREATE INDEX IF NOT EXISTS idx_measurements_user_cursor ON measurements(user_id, recorded_at DESC, measurement_id DESC);
+CREATE INDEX IF NOT EXISTS idx_chat_history_user_cursor ON chat_history(user_id, created_at DESC, chat_id DESC);
+CREATE INDEX IF NOT EXISTS idx_workout_sessions_user_exercise_cursor ON workout_sessions(user_id, exercise_id, created_at DESC, session_id DESC);
@@ -0,0 +1,26 @@
+-- Atomic increment-or-create for daily stats counters
+-- Called over RPC (supabase.rpc('increment_user_stats', {...})) so concurrent
+-- increments never race a select-then-update and cost a single round trip.
+CREATE OR REPLACE FUNCTION increment_user_stats(
+    p_user_id TEXT,
+    p_date TEXT,
+    p_steps INTEGER DEFAULT 0,
+    p_calories_burned INTEGER DEFAULT 0,
+    p_calories_consumed INTEGER DEFAULT 0,
+    p_active_minutes INTEGER DEFAULT 0,
+    p_water_intake INTEGER DEFAULT 0
+)
+RETURNS user_stats
+LANGUAGE sql
+AS $$
+    INSERT INTO user_stats (user_id, date, steps, calories_burned, calories_consumed, active_minutes, water_intake, sleep_hours, updated_at)
+    VALUES (p_user_id, p_date, p_steps, p_calories_burned, p_calories_consumed, p_active_minutes, p_water_intake, 0, NOW())
+    ON CONFLICT (user_id, date) DO UPDATE SET
+        steps = COALESCE(user_stats.steps, 0) + EXCLUDED.steps,
+        calories_burned = COALESCE(user_stats.calories_burned, 0) + EXCLUDED.calories_burned,
+        calories_consumed = COALESCE(user_stats.calories_consumed, 0) + EXCLUDED.calories_consumed,
+        active_minutes = COALESCE(user_stats.active_minutes, 0) + EXCLUDED.active_minutes,
+        water_intake = COALESCE(user_stats.water_intake, 0) + EXCLUDED.water_intake,
+        updated_at = NOW()
+    RETURNING *;
+$$;
@@ -0,0 +1,138 @@
+-- Per-user per-exercise workout aggregates
+-- GET /api/workouts/exercises/{id}/stats reads one row from this table instead of
+-- walking every session and set. New sessions are inserted and folded in
+-- incrementally in one transaction (record_workout_session, which calls
+-- apply_workout_session); edits and deletes recompute the row from the
+-- user's sessions for that exercise (refresh_user_exercise_aggregate).
+CREATE TABLE IF NOT EXISTS user_exercise_aggregates (
+    user_id TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    exercise_id TEXT NOT NULL REFERENCES exercises(exercise_id),
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    total_volume FLOAT NOT NULL DEFAULT 0,
+    personal_best FLOAT,
+    max_reps INTEGER,
+    estimated_1rm FLOAT,
+    last_session JSONB,
+    previous_volume FLOAT,
+    weight_unit TEXT DEFAULT 'kg',
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (user_id, exercise_id)
+);
+
+-- Fold a newly created session into the aggregate (the session becomes the latest one)
+CREATE OR REPLACE FUNCTION apply_workout_session(
+    p_user_id TEXT,
+    p_exercise_id TEXT,
+    p_total_volume FLOAT,
+    p_max_weight FLOAT,
+    p_max_reps INTEGER,
+    p_estimated_1rm FLOAT,
+    p_last_session JSONB,
+    p_weight_unit TEXT
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO user_exercise_aggregates (user_id, exercise_id, total_sessions, total_volume, personal_best, max_reps, estimated_1rm, last_session, previous_volume, weight_unit, updated_at)
+    VALUES (p_user_id, p_exercise_id, 1, p_total_volume, p_max_weight, p_max_reps, p_estimated_1rm, p_last_session, NULL, p_weight_unit, NOW())
+    ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+        total_sessions = user_exercise_aggregates.total_sessions + 1,
+        total_volume = user_exercise_aggregates.total_volume + EXCLUDED.total_volume,
+        personal_best = GREATEST(user_exercise_aggregates.personal_best, EXCLUDED.personal_best),
+        max_reps = GREATEST(user_exercise_aggregates.max_reps, EXCLUDED.max_reps),
+        estimated_1rm = GREATEST(user_exercise_aggregates.estimated_1rm, EXCLUDED.estimated_1rm),
+        previous_volume = (user_exercise_aggregates.last_session->>'total_volume')::FLOAT,
+        last_session = EXCLUDED.last_session,
+        weight_unit = EXCLUDED.weight_unit,
+        updated_at = NOW()
+    -- Already counted (a retry, or a refresh that saw the session): don't count it twice
+    WHERE user_exercise_aggregates.last_session->>'session_id' IS DISTINCT FROM EXCLUDED.last_session->>'session_id';
+$$;
+
+-- Insert a new session and fold it into the aggregate in one transaction, so a
+-- concurrent refresh_user_exercise_aggregate either sees neither or both
+CREATE OR REPLACE FUNCTION record_workout_session(
+    p_session JSONB,
+    p_max_weight FLOAT,
+    p_max_reps INTEGER,
+    p_estimated_1rm FLOAT,
+    p_last_session JSONB
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Explicit columns: a key missing from p_session gets the column default, not NULL
+    INSERT INTO workout_sessions (
+        session_id, user_id, exercise_id, exercise_name, sets, total_sets, notes,
+        duration_minutes, total_volume, max_weight, max_reps, weight_unit,
+        completed, created_at, updated_at
+    ) VALUES (
+        p_session->>'session_id',
+        p_session->>'user_id',
+        p_session->>'exercise_id',
+        p_session->>'exercise_name',
+        p_session->'sets',
+        (p_session->>'total_sets')::INTEGER,
+        p_session->>'notes',
+        (p_session->>'duration_minutes')::INTEGER,
+        (p_session->>'total_volume')::FLOAT,
+        (p_session->>'max_weight')::FLOAT,
+        (p_session->>'max_reps')::INTEGER,
+        COALESCE(p_session->>'weight_unit', 'kg'),
+        COALESCE((p_session->>'completed')::BOOLEAN, TRUE),
+        COALESCE((p_session->>'created_at')::TIMESTAMP, NOW()),
+        (p_session->>'updated_at')::TIMESTAMP
+    );
+
+    PERFORM apply_workout_session(
+        p_session->>'user_id',
+        p_session->>'exercise_id',
+        COALESCE((p_session->>'total_volume')::FLOAT, 0),
+        p_max_weight,
+        p_max_reps,
+        p_estimated_1rm,
+        p_last_session,
+        p_session->>'weight_unit'
+    );
+END;
+$$;
+
+-- Recompute the aggregate from the user's sessions for one exercise (after an edit or delete)
+CREATE OR REPLACE FUNCTION refresh_user_exercise_aggregate(p_user_id TEXT, p_exercise_id TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM user_exercise_aggregates WHERE user_id = p_user_id AND exercise_id = p_exercise_id;
+
+    WITH sessions AS (
+        SELECT * FROM workout_sessions WHERE user_id = p_user_id AND exercise_id = p_exercise_id
+    ), ranked AS (
+        SELECT *, ROW_NUMBER() OVER (ORDER BY created_at DESC) AS rn FROM sessions
+    ), all_sets AS (
+        SELECT (s->>'weight')::FLOAT AS weight, (s->>'reps')::INTEGER AS reps
+        FROM sessions, jsonb_array_elements(sessions.sets) AS s
+    )
+    INSERT INTO user_exercise_aggregates (user_id, exercise_id, total_sessions, total_volume, personal_best, max_reps, estimated_1rm, last_session, previous_volume, weight_unit, updated_at)
+    SELECT
+        p_user_id,
+        p_exercise_id,
+        (SELECT COUNT(*) FROM sessions),
+        (SELECT COALESCE(SUM(total_volume), 0) FROM sessions),
+        (SELECT MAX(weight) FROM all_sets),
+        (SELECT MAX(reps) FROM all_sets),
+        (SELECT MAX(weight * (1 + reps / 30.0)) FROM all_sets),
+        (SELECT jsonb_build_object('session_id', session_id, 'sets', sets, 'total_volume', total_volume,
+                                   'weight_unit', weight_unit, 'created_at', created_at)
+         FROM ranked WHERE rn = 1),
+        (SELECT total_volume FROM ranked WHERE rn = 2),
+        (SELECT weight_unit FROM ranked WHERE rn = 1),
+        NOW()
+    WHERE EXISTS (SELECT 1 FROM sessions);
+END;
+$$;
+
+-- Backfill from existing sessions
+SELECT refresh_user_exercise_aggregate(user_id, exercise_id)
+FROM (SELECT DISTINCT user_id, exercise_id FROM workout_sessions) AS pairs;
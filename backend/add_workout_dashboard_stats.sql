@@ -0,0 +1,52 @@
+-- Workout dashboard summary in one call
+-- Lifetime totals and the favorite exercise come from user_exercise_aggregates
+-- (one row per exercise the user has logged); weekly/monthly counts and the
+-- latest workout are index range scans on (user_id, created_at). The cost
+-- stays flat as a user's history grows.
+CREATE INDEX IF NOT EXISTS idx_workout_sessions_user_created ON workout_sessions(user_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION workout_dashboard_stats(p_user_id TEXT, p_week_start TIMESTAMP, p_month_start TIMESTAMP)
+RETURNS TABLE (
+    total_workouts BIGINT,
+    total_volume_lifted FLOAT,
+    workouts_this_week BIGINT,
+    workouts_this_month BIGINT,
+    favorite_exercise_id TEXT,
+    favorite_exercise_name TEXT,
+    favorite_exercise_count INTEGER,
+    recent_exercise_id TEXT,
+    recent_exercise_name TEXT,
+    recent_created_at TIMESTAMP,
+    weight_unit TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        (SELECT COALESCE(SUM(total_sessions), 0) FROM user_exercise_aggregates WHERE user_id = p_user_id),
+        (SELECT COALESCE(SUM(total_volume), 0) FROM user_exercise_aggregates WHERE user_id = p_user_id),
+        (SELECT COUNT(*) FROM workout_sessions WHERE user_id = p_user_id AND created_at >= p_week_start),
+        (SELECT COUNT(*) FROM workout_sessions WHERE user_id = p_user_id AND created_at >= p_month_start),
+        favorite.exercise_id,
+        favorite.name,
+        favorite.total_sessions,
+        recent.exercise_id,
+        recent.exercise_name,
+        recent.created_at,
+        recent.weight_unit
+    FROM (SELECT 1) AS one
+    LEFT JOIN LATERAL (
+        SELECT a.exercise_id, e.name, a.total_sessions
+        FROM user_exercise_aggregates a LEFT JOIN exercises e ON e.exercise_id = a.exercise_id
+        WHERE a.user_id = p_user_id AND a.total_sessions > 0
+        ORDER BY a.total_sessions DESC, a.exercise_id
+        LIMIT 1
+    ) AS favorite ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT exercise_id, exercise_name, created_at, weight_unit
+        FROM workout_sessions
+        WHERE user_id = p_user_id
+        ORDER BY created_at DESC
+        LIMIT 1
+    ) AS recent ON TRUE;
+$$;
@@ -0,0 +1,24 @@
+-- Bring existing tables in line with the columns server.py reads and writes
+-- (create_tables.sql already has these for fresh installs)
+
+ALTER TABLE workout_sessions
+ADD COLUMN IF NOT EXISTS exercise_name TEXT,
+ADD COLUMN IF NOT EXISTS total_sets INTEGER,
+ADD COLUMN IF NOT EXISTS weight_unit TEXT DEFAULT 'kg',
+ADD COLUMN IF NOT EXISTS completed BOOLEAN DEFAULT TRUE,
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+
+ALTER TABLE chat_history
+ADD COLUMN IF NOT EXISTS chat_id TEXT,
+ADD COLUMN IF NOT EXISTS user_message TEXT,
+ADD COLUMN IF NOT EXISTS assistant_message TEXT,
+ADD COLUMN IF NOT EXISTS timestamp TIMESTAMP DEFAULT NOW();
+
+ALTER TABLE chat_history ALTER COLUMN message_id SET DEFAULT gen_random_uuid()::text;
+ALTER TABLE chat_history ALTER COLUMN role DROP NOT NULL;
+ALTER TABLE chat_history ALTER COLUMN content DROP NOT NULL;
+
+-- Older rows only have message_id; history pages on (created_at, chat_id), so chat_id must be set and unique
+UPDATE chat_history SET chat_id = message_id WHERE chat_id IS NULL;
+ALTER TABLE chat_history ALTER COLUMN chat_id SET DEFAULT gen_random_uuid()::text;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_chat_history_chat_id ON chat_history(chat_id);
@@ -0,0 +1,206 @@
+"""
+Content-addressed blob storage for uploaded images.
+
+A blob is stored once under the SHA-256 of its bytes, so identical uploads
+share one object and rows only keep the 64-character key. Keys never change
+content, so a blob can be cached for as long as its URL is valid.
+
+Blobs are users' food photos. A key alone is not enough to fetch one: URLs
+are signed and expire (BLOB_URL_EXPIRY_SECONDS), and responses are cached
+privately. A signed URL is a capability - whoever holds it can read the photo
+until it expires - so never log or share one.
+
+Backends (BLOB_BACKEND):
+
+- local: files under BLOB_DIR, served by the API at /api/blobs/{key} with an
+  HMAC signature (BLOB_URL_SECRET, falling back to JWT_SECRET)
+- s3: any S3-compatible bucket through boto3 (S3_BUCKET, S3_PREFIX,
+  S3_ENDPOINT_URL); URLs are presigned. S3_PUBLIC_BASE_URL serves objects
+  unsigned instead and is only safe for a bucket that is not publicly listed
+  and whose URLs are treated as capabilities
+
+Storage calls block, so the async methods run them on a worker thread.
+"""
+import asyncio
+import hashlib
+import hmac
+import math
+import os
+import re
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Tuple
+
+BLOB_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+BLOB_URL_EXPIRY_SECONDS = int(os.getenv('BLOB_URL_EXPIRY_SECONDS', str(24 * 3600)))
+
+# Content types we accept, by magic bytes
+_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+
+def sniff_content_type(data: bytes) -> str:
+    for signature, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'application/octet-stream'
+
+
+def blob_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_blob_key(key: str) -> bool:
+    return bool(key and BLOB_KEY_PATTERN.match(key))
+
+
+class BlobStore(ABC):
+    """Interface shared by every backend."""
+
+    @abstractmethod
+    def _put(self, key: str, data: bytes, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        ...
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    def verify(self, key: str, expires: int, sig: str) -> bool:
+        """Whether a /api/blobs URL is valid; backends whose URLs point elsewhere accept none."""
+        return False
+
+    async def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        """Store bytes (no-op if already present) and return their content key."""
+        key = blob_key(data)
+        await asyncio.to_thread(self._put, key, data, content_type or sniff_content_type(data))
+        return key
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Return (bytes, content type) for a key, or None."""
+        if not is_blob_key(key):
+            return None
+        return await asyncio.to_thread(self._get, key)
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str, base_url: str = '', url_secret: str = '',
+                 url_expiry_seconds: int = BLOB_URL_EXPIRY_SECONDS):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip('/')
+        self.url_secret = url_secret.encode()
+        self.url_expiry_seconds = url_expiry_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.root / key[:2] / key[2:4] / key
+
+    def _put(self, key, data, content_type):
+        path = self.path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _get(self, key):
+        path = self.path(key)
+        if not path.exists():
+            return None
+        data = path.read_bytes()
+        return data, sniff_content_type(data)
+
+    def signature(self, key: str, expires: int) -> str:
+        return hmac.new(self.url_secret, f"{key}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+    def url(self, key: str) -> str:
+        # Expiry rounded up to a whole window, so a photo keeps one URL (and its browser cache) per window
+        window = self.url_expiry_seconds
+        expires = math.ceil((time.time() + window) / window) * window
+        return f"{self.base_url}/api/blobs/{key}?expires={expires}&sig={self.signature(key, expires)}"
+
+    def verify(self, key: str, expires: int, sig: str) -> bool:
+        """Whether a URL's signature matches and has not expired."""
+        return expires > time.time() and hmac.compare_digest(self.signature(key, expires), sig)
+
+
+class S3BlobStore(BlobStore):
+    def __init__(self, bucket: str, prefix: str = '', endpoint_url: Optional[str] = None,
+                 public_base_url: Optional[str] = None, url_expiry_seconds: int = 7 * 24 * 3600):
+        import boto3
+
+        self.client = boto3.client('s3', endpoint_url=endpoint_url or None)
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.public_base_url = (public_base_url or '').rstrip('/')
+        self.url_expiry_seconds = url_expiry_seconds
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _put(self, key, data, content_type):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return
+        except ClientError:
+            pass
+        self.client.put_object(
+            Bucket=self.bucket, Key=self.object_key(key), Body=data, ContentType=content_type,
+            CacheControl='private, max-age=31536000, immutable'
+        )
+
+    def _get(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError:
+            return None
+        return response['Body'].read(), response.get('ContentType') or 'application/octet-stream'
+
+    def url(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{self.object_key(key)}"
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': self.object_key(key)}, ExpiresIn=self.url_expiry_seconds
+        )
+
+
+def create_blob_store() -> BlobStore:
+    """Build the configured backend (BLOB_BACKEND=local|s3)."""
+    backend = os.getenv('BLOB_BACKEND', 'local').lower()
+    if backend == 's3':
+        return S3BlobStore(
+            os.environ['S3_BUCKET'],
+            prefix=os.getenv('S3_PREFIX', 'blobs'),
+            endpoint_url=os.getenv('S3_ENDPOINT_URL'),
+            public_base_url=os.getenv('S3_PUBLIC_BASE_URL'),
+            url_expiry_seconds=BLOB_URL_EXPIRY_SECONDS,
+        )
+    return LocalBlobStore(
+        os.getenv('BLOB_DIR', str(Path(__file__).parent / 'blobs')),
+        base_url=os.getenv('BLOB_PUBLIC_BASE_URL', ''),
+        url_secret=os.getenv('BLOB_URL_SECRET') or os.getenv('JWT_SECRET', 'your-secret-key-change-in-production'),
+    )
@@ -0,0 +1,172 @@
+"""
+Bounded conversation context for the fitness coach.
+
+Each message to the coach carries:
+- the latest CHAT_CONTEXT_TURNS turns verbatim
+- a stored rolling summary of everything older
+- verbatim as well, older turns that are not in the summary yet
+
+The whole prompt (system message, summary, turns and the new message) must
+fit in CHAT_CONTEXT_MAX_TOKENS. The oldest verbatim turns are dropped first,
+then the summary is cut, so prompt size, and with it latency and cost, stays
+flat however long a user has been chatting.
+
+Once CHAT_SUMMARY_BATCH turns have fallen out of the verbatim window, a
+background call folds them into the summary (`chat_summaries` table). The
+call runs at the lowest LLM priority and never on the request path.
+
+Tokens are estimated at ~4 characters each; the budget is a guard rail, not
+an exact count.
+"""
+import os
+from typing import Awaitable, Callable, List, Optional
+
+from chat_writer import chat_writer
+
+CHAT_CONTEXT_TURNS = int(os.getenv('CHAT_CONTEXT_TURNS', '6'))
+CHAT_SUMMARY_BATCH = int(os.getenv('CHAT_SUMMARY_BATCH', '6'))
+CHAT_CONTEXT_MAX_TOKENS = int(os.getenv('CHAT_CONTEXT_MAX_TOKENS', '3000'))
+
+SUMMARY_SYSTEM_MESSAGE = (
+    "You maintain a running summary of a conversation between a user and their AI fitness coach. "
+    "Keep facts that matter for future advice: goals, injuries, preferences, routines, progress and open questions. "
+    "Write at most 150 words of plain prose. Return only the summary."
+)
+
+SummarizeFn = Callable[[Optional[str], List[dict]], Awaitable[str]]
+
+
+class ContextTooLarge(ValueError):
+    pass
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return len(text) // 4 + 1 if text else 0
+
+
+def turn_tokens(turn: dict) -> int:
+    return estimate_tokens(turn.get("user_message")) + estimate_tokens(turn.get("assistant_message"))
+
+
+def render_summary_request(previous_summary: Optional[str], turns: List[dict]) -> str:
+    """Prompt that folds `turns` (oldest first) into the previous summary."""
+    lines = [f"Current summary: {previous_summary or '(none yet)'}", "", "New conversation turns:"]
+    for turn in turns:
+        lines.append(f"User: {turn['user_message']}")
+        lines.append(f"Coach: {turn.get('assistant_message') or ''}")
+    lines.append("")
+    lines.append("Write the updated summary.")
+    return "\n".join(lines)
+
+
+class ChatContext:
+    def __init__(self, summary: Optional[str], turns: List[dict]):
+        self.summary = summary
+        self.turns = turns  # oldest first
+
+    def messages(self, system_message: str, user_message: str) -> List[dict]:
+        """OpenAI-style message list for a new user message."""
+        if self.summary:
+            system_message = f"{system_message}\n\nSummary of earlier conversation:\n{self.summary}"
+        messages = [{"role": "system", "content": system_message}]
+        for turn in self.turns:
+            messages.append({"role": "user", "content": turn["user_message"]})
+            if turn.get("assistant_message"):
+                messages.append({"role": "assistant", "content": turn["assistant_message"]})
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def system_message(self, system_message: str) -> str:
+        """The same context as one system message, for clients that only take a system and a user message."""
+        parts = [system_message]
+        if self.summary:
+            parts.append(f"Summary of earlier conversation:\n{self.summary}")
+        if self.turns:
+            transcript = "\n".join(
+                f"User: {turn['user_message']}\nCoach: {turn.get('assistant_message') or ''}" for turn in self.turns
+            )
+            parts.append(f"Most recent messages:\n{transcript}")
+        return "\n\n".join(parts)
+
+
+def fit_budget(system_message: str, user_message: str, summary: Optional[str], turns: List[dict],
+               max_tokens: int) -> ChatContext:
+    """Keep the newest turns that fit next to the summary, then cut the summary if it alone is too big."""
+    budget = max_tokens - estimate_tokens(system_message) - estimate_tokens(user_message)
+    if budget < 0:
+        raise ContextTooLarge("Message is too long")
+
+    used = estimate_tokens(summary)
+    kept = []
+    for turn in reversed(turns):
+        cost = turn_tokens(turn)
+        if used + cost > budget:
+            break
+        kept.append(turn)
+        used += cost
+    kept.reverse()
+
+    if summary and used > budget:
+        summary = summary[:max(0, budget * 4)].rstrip() or None
+    return ChatContext(summary, kept)
+
+
+class ChatContextManager:
+    def __init__(self, turns: int = None, summary_batch: int = None, max_tokens: int = None):
+        self.turns = turns if turns is not None else CHAT_CONTEXT_TURNS
+        self.summary_batch = summary_batch if summary_batch is not None else CHAT_SUMMARY_BATCH
+        self.max_tokens = max_tokens if max_tokens is not None else CHAT_CONTEXT_MAX_TOKENS
+        self._summarizing = set()  # user ids with a summary update in flight
+        self.summaries = 0
+
+    async def load(self, repos, user_id: str, system_message: str, user_message: str) -> ChatContext:
+        """Summary plus latest turns for a user, trimmed to the token budget. Raises ContextTooLarge."""
+        summary_row = await repos.chat_summaries.get(user_id)
+        window = self.turns + 2 * self.summary_batch
+        recent, _ = await repos.chat_history.list_page(user_id, window)
+        # The last reply may still be queued for writing
+        recent = chat_writer.merge_pending(user_id, recent, window)
+        # Turns that left the verbatim window but are not in the summary yet stay verbatim
+        through = (summary_row["summarized_through"], summary_row["summarized_chat_id"]) if summary_row else None
+        turns = recent[:self.turns] + [
+            turn for turn in recent[self.turns:]
+            if through is None or (turn["created_at"], turn["chat_id"]) > through
+        ]
+        summary = summary_row["summary"] if summary_row else None
+        return fit_budget(system_message, user_message, summary, list(reversed(turns)), self.max_tokens)
+
+    async def maybe_summarize(self, repos, user_id: str, summarize: SummarizeFn) -> bool:
+        """Fold turns older than the verbatim window into the summary once a batch has built up."""
+        if user_id in self._summarizing:
+            return False
+        self._summarizing.add(user_id)
+        try:
+            row = await repos.chat_summaries.get(user_id)
+            through = (row["summarized_through"], row["summarized_chat_id"]) if row else None
+            # Newest first; a window of two batches also picks up turns left over by a failed update
+            window = self.turns + 2 * self.summary_batch
+            recent, _ = await repos.chat_history.list_page(user_id, window)
+            recent = chat_writer.merge_pending(user_id, recent, window)
+            pending = [
+                turn for turn in recent[self.turns:]
+                if through is None or (turn["created_at"], turn["chat_id"]) > through
+            ]
+            if len(pending) < self.summary_batch:
+                return False
+
+            pending.reverse()
+            summary = await summarize(row["summary"] if row else None, pending)
+            if not summary:
+                return False
+            await repos.chat_summaries.upsert(
+                user_id, summary, pending[-1]["created_at"], pending[-1]["chat_id"],
+                (row["turn_count"] if row else 0) + len(pending)
+            )
+            self.summaries += 1
+            return True
+        finally:
+            self._summarizing.discard(user_id)
+
+
+# Singleton instance
+chat_context = ChatContextManager()
@@ -0,0 +1,158 @@
+"""
+Write-behind queue for chat history rows.
+
+A coach reply used to wait for its `chat_history` insert before the response
+went out. Rows are now queued in memory and written in one bulk insert per
+CHAT_WRITE_INTERVAL_SECONDS, or as soon as CHAT_WRITE_BATCH_SIZE rows are
+waiting. The queue is flushed on shutdown.
+
+A failed batch stays queued and is retried with exponential backoff. After
+CHAT_WRITE_MAX_RETRIES failed attempts its rows are written one by one,
+so a single bad row (or one that already landed before a timeout) cannot
+block the rest. A row that still fails is dropped and logged.
+
+Rows get their chat_id and created_at when queued, so readers can merge
+`pending()` rows with stored ones in the same (created_at, chat_id) order.
+The queue is per process: other workers see a row once it is flushed.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+WriteFn = Callable[[List[dict]], Awaitable[None]]
+
+
+class ChatHistoryWriter:
+    def __init__(self, flush_interval: float = None, batch_size: int = None, max_retries: int = None):
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv('CHAT_WRITE_INTERVAL_SECONDS', '1'))
+        self.batch_size = batch_size if batch_size is not None else int(os.getenv('CHAT_WRITE_BATCH_SIZE', '100'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('CHAT_WRITE_MAX_RETRIES', '5'))
+        self._queue: List[dict] = []  # rows not yet written, oldest first
+        self._writing: List[dict] = []  # rows in the batch being written right now
+        self._attempts = 0  # failed attempts for the batch at the head of the queue
+        self._write_fn: Optional[WriteFn] = None
+        self._lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task = None
+        self.queued = 0
+        self.written = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    def start(self, write_fn: WriteFn):
+        """Start the background writer; `write_fn(rows)` inserts a list of rows."""
+        self._write_fn = write_fn
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Last chance: one attempt per batch, then row by row
+        while self._queue:
+            if not await self.flush() and self._attempts:
+                # The batch went back to the head of the queue; no time to wait for retries
+                batch = self._queue[:self.batch_size]
+                del self._queue[:len(batch)]
+                self._attempts = 0
+                await self._write_rows_individually(batch)
+
+    def add(self, row: dict) -> dict:
+        """Queue a row for insertion; fills in chat_id and created_at when missing."""
+        row = dict(row)
+        row.setdefault("chat_id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.utcnow().isoformat())
+        self._queue.append(row)
+        self.queued += 1
+        if len(self._queue) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return row
+
+    def pending(self, user_id: str) -> List[dict]:
+        """Rows for this user that are not in the database yet, newest first."""
+        rows = [row for row in self._writing + self._queue if row["user_id"] == user_id]
+        return sorted(rows, key=lambda row: (row["created_at"], row["chat_id"]), reverse=True)
+
+    def merge_pending(self, user_id: str, rows: List[dict], limit: int) -> List[dict]:
+        """The newest `limit` of stored `rows` (newest first) and this user's pending rows."""
+        pending = self.pending(user_id)
+        if not pending:
+            return rows[:limit]
+        merged = {row["chat_id"]: row for row in rows}
+        merged.update((row["chat_id"], row) for row in pending)
+        ordered = sorted(merged.values(), key=lambda row: (row["created_at"], row["chat_id"]), reverse=True)
+        return ordered[:limit]
+
+    def discard(self, user_id: str):
+        self._queue = [row for row in self._queue if row["user_id"] != user_id]
+
+    async def flush(self) -> bool:
+        """Write the oldest batch; returns False if the write failed."""
+        async with self._lock:
+            if not self._queue:
+                return True
+            self._writing = self._queue[:self.batch_size]
+            del self._queue[:len(self._writing)]
+            try:
+                await self._write_fn(self._writing)
+                self.written += len(self._writing)
+                self._attempts = 0
+                return True
+            except Exception as e:
+                self.failed_batches += 1
+                self._attempts += 1
+                print(f"Chat history write failed ({len(self._writing)} rows, attempt {self._attempts}): {e}")
+                if self._attempts >= self.max_retries:
+                    await self._write_rows_individually(self._writing)
+                    self._attempts = 0
+                else:
+                    # Back to the front of the queue, in order, for the retry
+                    self._queue[:0] = self._writing
+                return False
+            finally:
+                self._writing = []
+
+    async def _write_rows_individually(self, rows: List[dict]):
+        for row in rows:
+            try:
+                await self._write_fn([row])
+                self.written += 1
+            except Exception as e:
+                self.dropped += 1
+                print(f"Dropping chat history row {row['chat_id']}: {e}")
+
+    async def _run(self):
+        failures = 0
+        while True:
+            # Back off exponentially while writes keep failing
+            delay = min(self.flush_interval * (2 ** failures), 30.0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue:
+                if not await self.flush():
+                    failures += 1
+                    break
+                failures = 0
+
+    def stats(self) -> dict:
+        return {
+            "pending_rows": len(self._queue) + len(self._writing),
+            "queued": self.queued,
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+        }
+
+
+# Singleton instance
+chat_writer = ChatHistoryWriter()
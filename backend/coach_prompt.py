@@ -0,0 +1,101 @@
+"""
+Fitness coach system prompt, compiled once per profile and language.
+
+The prompt only depends on a few profile fields and the reply language, so
+it is built once per user and language and kept in an LRU cache
+(COACH_PROMPT_CACHE_SIZE entries) together with the profile fingerprint it
+was built from. A profile edit changes the fingerprint, so a stale prompt is
+never served, and `invalidate(user_id)` drops the user's entries straight away.
+
+The text is byte-stable: the static instructions come first and never vary,
+then the profile and the language line are formatted the same way every
+time. Identical prefixes across users and messages are what provider-side
+prompt caching matches on.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Optional
+
+PROFILE_FIELDS = ('name', 'age', 'gender', 'weight', 'height', 'goal_weight', 'activity_level')
+
+# Shared by every user: keep it first and unchanged so the prefix can be cached
+COACH_INSTRUCTIONS = (
+    "You are FitFlow's AI Fitness Coach. You provide personalized fitness advice, workout recommendations, nutrition guidance, and motivation.\n\n"
+    "Guidelines:\n"
+    "- Provide actionable, science-based fitness advice\n"
+    "- Be encouraging and motivational\n"
+    "- Keep responses concise and easy to understand\n"
+    "- Tailor advice to the user's profile and goals\n"
+    "- Suggest specific exercises, meal ideas, or habits when appropriate\n"
+    "- If asked about medical concerns, recommend consulting a healthcare professional"
+)
+
+
+def normalize_language(language: Optional[str]) -> str:
+    return (language or "english").strip().lower() or "english"
+
+
+def profile_fingerprint(user: dict) -> str:
+    profile = [user.get(field) for field in PROFILE_FIELDS]
+    return hashlib.sha256(json.dumps(profile, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def build_coach_prompt(user: dict, language: str) -> str:
+    """System prompt for a profile; `language` must already be normalized."""
+    def value(field):
+        v = user.get(field)
+        return 'N/A' if v is None else v
+
+    prompt = COACH_INSTRUCTIONS + "\n\n"
+    prompt += "User Profile:\n"
+    prompt += f"- Name: {user.get('name') or 'Unknown'}\n"
+    prompt += f"- Age: {value('age')} years\n"
+    prompt += f"- Gender: {value('gender')}\n"
+    prompt += f"- Weight: {value('weight')} kg\n"
+    prompt += f"- Height: {value('height')} cm\n"
+    prompt += f"- Goal Weight: {value('goal_weight')} kg\n"
+    prompt += f"- Activity Level: {value('activity_level')}"
+
+    # Add language instruction if needed
+    if language != "english":
+        prompt += f"\n\nIMPORTANT: Respond in {language.upper()} language. Translate all your responses to {language}."
+    return prompt
+
+
+class CoachPromptCache:
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size if max_size is not None else int(os.getenv('COACH_PROMPT_CACHE_SIZE', '10000'))
+        self._entries: OrderedDict = OrderedDict()  # (user_id, language) -> (profile fingerprint, prompt)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user: dict, language: Optional[str]) -> str:
+        language = normalize_language(language)
+        key = (user['user_id'], language)
+        fingerprint = profile_fingerprint(user)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        prompt = build_coach_prompt(user, language)
+        self._entries[key] = (fingerprint, prompt)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return prompt
+
+    def invalidate(self, user_id: str):
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Singleton instance
+coach_prompts = CoachPromptCache()
@@ -28,6 +28,8 @@ CREATE TABLE IF NOT EXISTS food_scans (
     fat FLOAT NOT NULL,
     portion_size TEXT,
     image_base64 TEXT,
+    image_hash TEXT,
+    thumbnails JSONB,
     scanned_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -70,11 +72,12 @@ CREATE TABLE IF NOT EXISTS measurements (
 
 -- Chat history table
 CREATE TABLE IF NOT EXISTS chat_history (
-    message_id TEXT PRIMARY KEY,
+    chat_id TEXT PRIMARY KEY,
     user_id TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
-    role TEXT NOT NULL,
-    content TEXT NOT NULL,
+    user_message TEXT NOT NULL,
+    assistant_message TEXT,
     language TEXT DEFAULT 'english',
+    timestamp TIMESTAMP DEFAULT NOW(),
     created_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -111,13 +114,51 @@ CREATE TABLE IF NOT EXISTS workout_sessions (
     session_id TEXT PRIMARY KEY,
     user_id TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
     exercise_id TEXT NOT NULL REFERENCES exercises(exercise_id),
+    exercise_name TEXT,
     sets JSONB NOT NULL,
+    total_sets INTEGER,
     notes TEXT,
     duration_minutes INTEGER,
     total_volume FLOAT,
     max_weight FLOAT,
     max_reps INTEGER,
-    created_at TIMESTAMP DEFAULT NOW()
+    weight_unit TEXT DEFAULT 'kg',
+    completed BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP
+);
+
+-- Per-user per-exercise workout aggregates (maintained by add_user_exercise_aggregates.sql functions)
+CREATE TABLE IF NOT EXISTS user_exercise_aggregates (
+    user_id TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    exercise_id TEXT NOT NULL REFERENCES exercises(exercise_id),
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    total_volume FLOAT NOT NULL DEFAULT 0,
+    personal_best FLOAT,
+    max_reps INTEGER,
+    estimated_1rm FLOAT,
+    last_session JSONB,
+    previous_volume FLOAT,
+    weight_unit TEXT DEFAULT 'kg',
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (user_id, exercise_id)
+);
+
+-- Rolling summary of each user's older coach chat turns (see chat_context.py)
+CREATE TABLE IF NOT EXISTS chat_summaries (
+    user_id TEXT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    summary TEXT NOT NULL,
+    summarized_through TIMESTAMP NOT NULL,
+    summarized_chat_id TEXT NOT NULL,
+    turn_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Application metadata (e.g. the seeded exercise catalog hash)
+CREATE TABLE IF NOT EXISTS app_metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Create indexes
@@ -128,3 +169,8 @@ CREATE INDEX IF NOT EXISTS idx_measurements_user_id ON measurements(user_id);
 CREATE INDEX IF NOT EXISTS idx_chat_history_user_id ON chat_history(user_id);
 CREATE INDEX IF NOT EXISTS idx_meal_plans_user_id ON meal_plans(user_id);
 CREATE INDEX IF NOT EXISTS idx_workout_sessions_user_id ON workout_sessions(user_id);
+CREATE INDEX IF NOT EXISTS idx_workout_sessions_user_created ON workout_sessions(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_food_scans_user_cursor ON food_scans(user_id, scanned_at DESC, scan_id DESC);
+CREATE INDEX IF NOT EXISTS idx_measurements_user_cursor ON measurements(user_id, recorded_at DESC, measurement_id DESC);
+CREATE INDEX IF NOT EXISTS idx_chat_history_user_cursor ON chat_history(user_id, created_at DESC, chat_id DESC);
+CREATE INDEX IF NOT EXISTS idx_workout_sessions_user_exercise_cursor ON workout_sessions(user_id, exercise_id, created_at DESC, session_id DESC);
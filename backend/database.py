@@ -0,0 +1,520 @@
+"""
+Awaitable data access layer for the FitFlow API.
+
+The Supabase Python client is synchronous: every `.execute()` blocks on a
+PostgREST round trip. Routes must never call it directly from the event loop,
+so each query is built and executed on a bounded thread pool and awaited.
+Concurrent requests then overlap their database I/O instead of running one
+after another.
+
+Two interchangeable backends implement the same `Database` interface:
+
+- SupabaseDatabase: the production backend (PostgREST over HTTP)
+- SQLiteDatabase: an in-process stand-in built from the same schema files,
+  for benchmarks, load tests and integration tests with no network
+
+Select the backend with DATABASE_BACKEND=supabase|sqlite (and SQLITE_PATH).
+
+Reads must name their columns: wildcard selects are rejected so a handler
+never pulls blobs (profile pictures, images, meal plan days) it throws away.
+Writes do not echo rows back; update/delete return the affected row count.
+"""
+import asyncio
+import functools
+import json
+import os
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, List
+
+from postgrest.types import CountMethod, ReturnMethod
+
+# Upper bound on PostgREST calls in flight per process
+DB_MAX_WORKERS = int(os.getenv('DB_MAX_WORKERS', '16'))
+
+# Schema files applied (in order) to build the SQLite stand-in
+SCHEMA_DIR = Path(__file__).parent
+SQLITE_SCHEMA_FILES = [
+    "create_tables.sql",
+    "add_email_verification.sql",
+]
+
+
+def check_columns(columns: str) -> str:
+    """Guard against wildcard selects: every access path lists its columns."""
+    if not columns or any(c.strip() == '*' for c in columns.split(',')):
+        raise ValueError("Wildcard selects are not allowed; pass the explicit columns this access path needs")
+    return columns
+
+
+class Database(ABC):
+    """Interface shared by every backend. All query methods are awaitable."""
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        self.executor = executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking callable on the database thread pool and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    @abstractmethod
+    def _select(self, table: str, columns: str, filters: Optional[dict], gte: Optional[dict],
+                order: Optional[str], desc: bool, limit: Optional[int]) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def _insert(self, table: str, data) -> None:
+        ...
+
+    @abstractmethod
+    def _update(self, table: str, data: dict, filters: dict) -> int:
+        ...
+
+    @abstractmethod
+    def _upsert(self, table: str, data, on_conflict: Optional[str]) -> None:
+        ...
+
+    @abstractmethod
+    def _delete(self, table: str, filters: dict) -> int:
+        ...
+
+    @abstractmethod
+    def _select_page(self, table: str, columns: str, filters: dict, order: str, tiebreak: str,
+                     limit: int, before: Optional[tuple]) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def _rpc(self, function: str, params: dict):
+        ...
+
+    async def fetch_one(self, table: str, filters: dict, columns: str) -> Optional[dict]:
+        """Return the first row matching all equality filters, or None."""
+        rows = await self.run(self._select, table, check_columns(columns), filters, None, None, False, 1)
+        return rows[0] if rows else None
+
+    async def fetch_all(
+        self,
+        table: str,
+        filters: Optional[dict],
+        columns: str,
+        order: Optional[str] = None,
+        desc: bool = False,
+        limit: Optional[int] = None,
+        gte: Optional[dict] = None
+    ) -> List[dict]:
+        """Return all rows matching equality (and optional >=) filters."""
+        return await self.run(self._select, table, check_columns(columns), filters, gte, order, desc, limit)
+
+    async def fetch_page(
+        self,
+        table: str,
+        filters: dict,
+        columns: str,
+        order: str,
+        tiebreak: str,
+        limit: int,
+        before: Optional[tuple] = None
+    ) -> List[dict]:
+        """
+        Keyset page, newest first: up to `limit` rows ordered by (order, tiebreak)
+        descending, starting strictly after the `before` = (order value, tiebreak value) key.
+        """
+        return await self.run(self._select_page, table, check_columns(columns), filters, order, tiebreak, limit, before)
+
+    async def insert(self, table: str, data) -> None:
+        """Insert one row (dict) or many rows (list of dicts)."""
+        await self.run(self._insert, table, data)
+
+    async def update(self, table: str, data: dict, filters: dict) -> int:
+        """Update rows matching the filters and return how many were updated."""
+        return await self.run(self._update, table, data, filters)
+
+    async def upsert(self, table: str, data, on_conflict: Optional[str] = None) -> None:
+        """Insert or update rows, resolving conflicts on the given columns."""
+        await self.run(self._upsert, table, data, on_conflict)
+
+    async def delete(self, table: str, filters: dict) -> int:
+        """Delete rows matching the filters and return how many were deleted."""
+        return await self.run(self._delete, table, filters)
+
+    async def rpc(self, function: str, params: dict):
+        """Call a database function (see the add_*.sql files) and return its result."""
+        return await self.run(self._rpc, function, params)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class SupabaseDatabase(Database):
+    def __init__(self, client, max_workers: int = DB_MAX_WORKERS):
+        super().__init__(ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supabase-db"))
+        self.client = client
+
+    def _apply_filters(self, query, filters: Optional[dict] = None, gte: Optional[dict] = None):
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        for column, value in (gte or {}).items():
+            query = query.gte(column, value)
+        return query
+
+    def _select(self, table, columns, filters, gte, order, desc, limit):
+        # PostgREST wants a bare comma-separated list in `select=`
+        columns = ",".join(c.strip() for c in columns.split(','))
+        query = self._apply_filters(self.client.table(table).select(columns), filters, gte)
+        if order:
+            query = query.order(order, desc=desc)
+        if limit:
+            query = query.limit(limit)
+        response = query.execute()
+        return response.data if isinstance(response.data, list) else []
+
+    def _select_page(self, table, columns, filters, order, tiebreak, limit, before):
+        columns = ",".join(c.strip() for c in columns.split(','))
+        query = self._apply_filters(self.client.table(table).select(columns), filters)
+        if before:
+            # Quoted: timestamps contain PostgREST's reserved ':' and '.'
+            value, key = (json.dumps(str(v)) for v in before)
+            query = query.or_(f"{order}.lt.{value},and({order}.eq.{value},{tiebreak}.lt.{key})")
+        response = query.order(order, desc=True).order(tiebreak, desc=True).limit(limit).execute()
+        return response.data if isinstance(response.data, list) else []
+
+    def _insert(self, table, data):
+        self.client.table(table).insert(data, returning=ReturnMethod.minimal).execute()
+
+    def _update(self, table, data, filters):
+        query = self.client.table(table).update(data, count=CountMethod.exact, returning=ReturnMethod.minimal)
+        return self._apply_filters(query, filters).execute().count or 0
+
+    def _upsert(self, table, data, on_conflict):
+        self.client.table(table).upsert(data, on_conflict=on_conflict or '', returning=ReturnMethod.minimal).execute()
+
+    def _delete(self, table, filters):
+        query = self.client.table(table).delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+        return self._apply_filters(query, filters).execute().count or 0
+
+    def _rpc(self, function, params):
+        data = self.client.rpc(function, params).execute().data
+        # Functions returning a single row come back as an object or a one-item list
+        if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict):
+            return data[0]
+        return data
+
+
+def translate_schema_to_sqlite(sql: str) -> List[str]:
+    """Translate the Postgres schema files into SQLite statements."""
+    sql = re.sub(r'--[^\n]*', '', sql)
+    statements = []
+    for statement in sql.split(';'):
+        statement = statement.strip()
+        if not statement:
+            continue
+        statement = re.sub(r'\bJSONB\b', 'TEXT', statement)
+        statement = re.sub(r"DEFAULT NOW\(\)", "DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))", statement)
+        statement = re.sub(r"DEFAULT gen_random_uuid\(\)::text", "DEFAULT (lower(hex(randomblob(16))))", statement)
+        alter = re.match(r'ALTER TABLE\s+(\w+)\s+(.*)', statement, re.S | re.I)
+        if alter:
+            # SQLite takes one ADD COLUMN per statement and has no IF NOT EXISTS
+            table, actions = alter.groups()
+            for action in re.split(r',\s*(?=ADD\s)', actions, flags=re.I):
+                column = re.match(r'ADD COLUMN IF NOT EXISTS\s+(.*)', action.strip(), re.S | re.I)
+                if column:
+                    statements.append(f"ALTER TABLE {table} ADD COLUMN {column.group(1)}")
+            continue
+        if re.match(r'CREATE (TABLE|INDEX|UNIQUE INDEX)', statement, re.I):
+            statements.append(statement)
+    return statements
+
+
+class SQLiteDatabase(Database):
+    """
+    In-process SQLite stand-in for Supabase built from the same schema files.
+    JSONB columns round-trip as Python lists/dicts and BOOLEAN columns as bools,
+    so rows look the same as PostgREST responses.
+    """
+
+    def __init__(self, path: str = ':memory:', schema_files: Optional[List[str]] = None):
+        # A single worker thread owns the connection, which serializes access
+        super().__init__(ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-db"))
+        self.path = path
+        self.json_columns = {}
+        self.bool_columns = {}
+        self.columns = {}
+        self.primary_keys = {}
+        self.conn = self.executor.submit(self._connect, schema_files or SQLITE_SCHEMA_FILES).result()
+
+    def _connect(self, schema_files: List[str]):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        for filename in schema_files:
+            for statement in translate_schema_to_sqlite((SCHEMA_DIR / filename).read_text()):
+                try:
+                    conn.execute(statement)
+                except sqlite3.OperationalError as e:
+                    # Re-applying a migration to an existing database file
+                    if "duplicate column name" not in str(e):
+                        raise
+        conn.commit()
+        self._load_table_info(conn, schema_files)
+        return conn
+
+    def _load_table_info(self, conn, schema_files: List[str]):
+        raw_sql = "\n".join((SCHEMA_DIR / f).read_text() for f in schema_files)
+        for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+            info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+            self.columns[table] = [row["name"] for row in info]
+            self.primary_keys[table] = [row["name"] for row in info if row["pk"]]
+            self.bool_columns[table] = {row["name"] for row in info if row["type"].upper() == "BOOLEAN"}
+            self.json_columns[table] = {
+                column for column in self.columns[table]
+                if re.search(rf'\b{column}\s+JSONB\b', self._table_sql(raw_sql, table), re.I)
+            }
+
+    @staticmethod
+    def _table_sql(raw_sql: str, table: str) -> str:
+        match = re.search(rf'CREATE TABLE IF NOT EXISTS {table}\s*\((.*?)\);', raw_sql, re.S | re.I)
+        alters = re.findall(rf'ALTER TABLE {table}\s+(.*?);', raw_sql, re.S | re.I)
+        return (match.group(1) if match else "") + "\n".join(alters)
+
+    def _column(self, table: str, column: str) -> str:
+        if column not in self.columns.get(table, ()):
+            raise ValueError(f"Unknown column '{column}' on table '{table}'")
+        return f'"{column}"'
+
+    def _encode(self, value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def _decode(self, table: str, row: sqlite3.Row) -> dict:
+        data = dict(row)
+        for column in self.json_columns.get(table, ()):
+            if isinstance(data.get(column), str):
+                data[column] = json.loads(data[column])
+        for column in self.bool_columns.get(table, ()):
+            if data.get(column) is not None:
+                data[column] = bool(data[column])
+        return data
+
+    def _where(self, table: str, filters: Optional[dict], gte: Optional[dict] = None):
+        clauses, params = [], []
+        for column, value in (filters or {}).items():
+            clauses.append(f"{self._column(table, column)} = ?")
+            params.append(self._encode(value))
+        for column, value in (gte or {}).items():
+            clauses.append(f"{self._column(table, column)} >= ?")
+            params.append(self._encode(value))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _projection(self, table: str, columns: str) -> str:
+        return ", ".join(self._column(table, c.strip()) for c in columns.split(','))
+
+    def _select(self, table, columns, filters, gte, order, desc, limit):
+        where, params = self._where(table, filters, gte)
+        sql = f'SELECT {self._projection(table, columns)} FROM "{table}"{where}'
+        if order:
+            sql += f" ORDER BY {self._column(table, order)} {'DESC' if desc else 'ASC'}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [self._decode(table, row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def _select_page(self, table, columns, filters, order, tiebreak, limit, before):
+        where, params = self._where(table, filters)
+        order, tiebreak = self._column(table, order), self._column(table, tiebreak)
+        if before:
+            where += (" AND " if where else " WHERE ") + f"({order} < ? OR ({order} = ? AND {tiebreak} < ?))"
+            params += [before[0], before[0], before[1]]
+        sql = (f'SELECT {self._projection(table, columns)} FROM "{table}"{where} '
+               f'ORDER BY {order} DESC, {tiebreak} DESC LIMIT {int(limit)}')
+        return [self._decode(table, row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def _insert_sql(self, table: str, row: dict, conflict_columns: Optional[List[str]] = None) -> tuple:
+        columns = [self._column(table, c) for c in row]
+        sql = f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})'
+        if conflict_columns is not None:
+            target = ", ".join(self._column(table, c) for c in conflict_columns)
+            updates = [c for c in row if c not in conflict_columns]
+            if updates:
+                assignments = ", ".join(f"{self._column(table, c)} = excluded.{self._column(table, c)}" for c in updates)
+                sql += f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+            else:
+                sql += f" ON CONFLICT ({target}) DO NOTHING"
+        return sql, [self._encode(v) for v in row.values()]
+
+    def _write(self, sql: str, params) -> int:
+        # Each write is one transaction: committed as a whole or rolled back, like a PostgREST call
+        with self.conn:
+            return self.conn.execute(sql, params).rowcount
+
+    def _insert(self, table, data):
+        with self.conn:
+            for row in (data if isinstance(data, list) else [data]):
+                self.conn.execute(*self._insert_sql(table, row))
+
+    def _update(self, table, data, filters):
+        assignments = ", ".join(f"{self._column(table, c)} = ?" for c in data)
+        where, params = self._where(table, filters)
+        return self._write(f'UPDATE "{table}" SET {assignments}{where}', [self._encode(v) for v in data.values()] + params)
+
+    def _upsert(self, table, data, on_conflict):
+        conflict_columns = [c.strip() for c in on_conflict.split(',')] if on_conflict else self.primary_keys[table]
+        with self.conn:
+            for row in (data if isinstance(data, list) else [data]):
+                self.conn.execute(*self._insert_sql(table, row, conflict_columns))
+
+    def _delete(self, table, filters):
+        where, params = self._where(table, filters)
+        return self._write(f'DELETE FROM "{table}"{where}', params)
+
+    def _rpc(self, function, params):
+        # Each Postgres function has a Python twin named _fn_<function>
+        handler = getattr(self, f"_fn_{function}", None)
+        if handler is None:
+            raise ValueError(f"Unknown database function '{function}'")
+        with self.conn:
+            return handler(**params)
+
+    def _fn_increment_user_stats(self, p_user_id, p_date, p_steps=0, p_calories_burned=0,
+                                 p_calories_consumed=0, p_active_minutes=0, p_water_intake=0):
+        """SQLite twin of add_increment_user_stats.sql: one atomic upsert statement."""
+        counters = ["steps", "calories_burned", "calories_consumed", "active_minutes", "water_intake"]
+        deltas = [p_steps, p_calories_burned, p_calories_consumed, p_active_minutes, p_water_intake]
+        now = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+        sql = (
+            f'INSERT INTO user_stats (user_id, date, {", ".join(counters)}, sleep_hours, updated_at) '
+            f'VALUES (?, ?, {", ".join("?" for _ in counters)}, 0, {now}) '
+            f'ON CONFLICT (user_id, date) DO UPDATE SET '
+            + ", ".join(f"{c} = COALESCE(user_stats.{c}, 0) + excluded.{c}" for c in counters)
+            + f", updated_at = {now} RETURNING *"
+        )
+        row = self.conn.execute(sql, [p_user_id, p_date] + deltas).fetchone()
+        return self._decode("user_stats", row)
+
+    def _fn_apply_workout_session(self, p_user_id, p_exercise_id, p_total_volume, p_max_weight, p_max_reps,
+                                  p_estimated_1rm, p_last_session, p_weight_unit):
+        """SQLite twin of apply_workout_session in add_user_exercise_aggregates.sql."""
+        now = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+        a = "user_exercise_aggregates"
+        self.conn.execute(
+            f"INSERT INTO {a} (user_id, exercise_id, total_sessions, total_volume, personal_best, max_reps, "
+            f"estimated_1rm, last_session, previous_volume, weight_unit, updated_at) "
+            f"VALUES (?, ?, 1, ?, ?, ?, ?, ?, NULL, ?, {now}) "
+            f"ON CONFLICT (user_id, exercise_id) DO UPDATE SET "
+            f"total_sessions = {a}.total_sessions + 1, "
+            f"total_volume = {a}.total_volume + excluded.total_volume, "
+            # SQLite's multi-argument MAX() is NULL if any argument is; Postgres' GREATEST skips NULLs
+            f"personal_best = MAX(COALESCE({a}.personal_best, excluded.personal_best), excluded.personal_best), "
+            f"max_reps = MAX(COALESCE({a}.max_reps, excluded.max_reps), excluded.max_reps), "
+            f"estimated_1rm = MAX(COALESCE({a}.estimated_1rm, excluded.estimated_1rm), excluded.estimated_1rm), "
+            f"previous_volume = json_extract({a}.last_session, '$.total_volume'), "
+            f"last_session = excluded.last_session, "
+            f"weight_unit = excluded.weight_unit, "
+            f"updated_at = {now} "
+            f"WHERE json_extract({a}.last_session, '$.session_id') IS NOT json_extract(excluded.last_session, '$.session_id')",
+            [p_user_id, p_exercise_id, p_total_volume, p_max_weight, p_max_reps, p_estimated_1rm,
+             self._encode(p_last_session), p_weight_unit]
+        )
+
+    def _fn_record_workout_session(self, p_session, p_max_weight, p_max_reps, p_estimated_1rm, p_last_session):
+        """SQLite twin of record_workout_session in add_user_exercise_aggregates.sql (one transaction via _rpc)."""
+        self.conn.execute(*self._insert_sql("workout_sessions", p_session))
+        self._fn_apply_workout_session(
+            p_session["user_id"], p_session["exercise_id"], p_session.get("total_volume") or 0,
+            p_max_weight, p_max_reps, p_estimated_1rm, p_last_session, p_session.get("weight_unit")
+        )
+
+    def _fn_refresh_user_exercise_aggregate(self, p_user_id, p_exercise_id):
+        """SQLite twin of refresh_user_exercise_aggregate in add_user_exercise_aggregates.sql."""
+        params = {"user_id": p_user_id, "exercise_id": p_exercise_id}
+        self.conn.execute(
+            "DELETE FROM user_exercise_aggregates WHERE user_id = :user_id AND exercise_id = :exercise_id", params
+        )
+        self.conn.execute(
+            """
+            WITH sessions AS (
+                SELECT * FROM workout_sessions WHERE user_id = :user_id AND exercise_id = :exercise_id
+            ), ranked AS (
+                SELECT *, ROW_NUMBER() OVER (ORDER BY created_at DESC) AS rn FROM sessions
+            ), all_sets AS (
+                SELECT json_extract(s.value, '$.weight') AS weight, json_extract(s.value, '$.reps') AS reps
+                FROM sessions, json_each(sessions.sets) AS s
+            )
+            INSERT INTO user_exercise_aggregates (user_id, exercise_id, total_sessions, total_volume, personal_best,
+                max_reps, estimated_1rm, last_session, previous_volume, weight_unit, updated_at)
+            SELECT
+                :user_id,
+                :exercise_id,
+                (SELECT COUNT(*) FROM sessions),
+                (SELECT COALESCE(SUM(total_volume), 0) FROM sessions),
+                (SELECT MAX(weight) FROM all_sets),
+                (SELECT MAX(reps) FROM all_sets),
+                (SELECT MAX(weight * (1 + reps / 30.0)) FROM all_sets),
+                (SELECT json_object('session_id', session_id, 'sets', json(sets), 'total_volume', total_volume,
+                                    'weight_unit', weight_unit, 'created_at', created_at)
+                 FROM ranked WHERE rn = 1),
+                (SELECT total_volume FROM ranked WHERE rn = 2),
+                (SELECT weight_unit FROM ranked WHERE rn = 1),
+                strftime('%Y-%m-%dT%H:%M:%f', 'now')
+            WHERE EXISTS (SELECT 1 FROM sessions)
+            """,
+            params
+        )
+
+    def _fn_workout_dashboard_stats(self, p_user_id, p_week_start, p_month_start):
+        """SQLite twin of add_workout_dashboard_stats.sql (correlated subqueries instead of LATERAL)."""
+        row = self.conn.execute(
+            """
+            SELECT
+                (SELECT COALESCE(SUM(total_sessions), 0) FROM user_exercise_aggregates WHERE user_id = :user_id)
+                    AS total_workouts,
+                (SELECT COALESCE(SUM(total_volume), 0) FROM user_exercise_aggregates WHERE user_id = :user_id)
+                    AS total_volume_lifted,
+                (SELECT COUNT(*) FROM workout_sessions WHERE user_id = :user_id AND created_at >= :week_start)
+                    AS workouts_this_week,
+                (SELECT COUNT(*) FROM workout_sessions WHERE user_id = :user_id AND created_at >= :month_start)
+                    AS workouts_this_month,
+                favorite.exercise_id AS favorite_exercise_id,
+                favorite.name AS favorite_exercise_name,
+                favorite.total_sessions AS favorite_exercise_count,
+                recent.exercise_id AS recent_exercise_id,
+                recent.exercise_name AS recent_exercise_name,
+                recent.created_at AS recent_created_at,
+                recent.weight_unit AS weight_unit
+            FROM (SELECT 1) AS one
+            LEFT JOIN (
+                SELECT a.exercise_id, e.name, a.total_sessions
+                FROM user_exercise_aggregates a LEFT JOIN exercises e ON e.exercise_id = a.exercise_id
+                WHERE a.user_id = :user_id AND a.total_sessions > 0
+                ORDER BY a.total_sessions DESC, a.exercise_id
+                LIMIT 1
+            ) AS favorite ON 1
+            LEFT JOIN (
+                SELECT exercise_id, exercise_name, created_at, weight_unit
+                FROM workout_sessions
+                WHERE user_id = :user_id
+                ORDER BY created_at DESC
+                LIMIT 1
+            ) AS recent ON 1
+            """,
+            {"user_id": p_user_id, "week_start": p_week_start, "month_start": p_month_start}
+        ).fetchone()
+        return dict(row)
+
+    def close(self):
+        self.executor.submit(self.conn.close).result()
+        super().close()
+
+
+def create_database() -> Database:
+    """Build the configured backend (DATABASE_BACKEND=supabase|sqlite)."""
+    backend = os.getenv('DATABASE_BACKEND', 'supabase').lower()
+    if backend == 'sqlite':
+        return SQLiteDatabase(os.getenv('SQLITE_PATH', ':memory:'))
+    from supabase import create_client
+    return SupabaseDatabase(create_client(os.environ.get('SUPABASE_URL'), os.environ.get('SUPABASE_KEY')))
@@ -0,0 +1,136 @@
+"""
+In-process index of the exercise catalog.
+
+The catalog is read on almost every screen and only changes on deploy, so
+each process loads it once into an immutable `ExerciseIndex`. The index is
+keyed by exercise id and by lowercase category. Every list response is
+serialized up front together with its ETag, so a request costs a dict
+lookup, and a client that already holds the current catalog gets a 304.
+
+Search uses an inverted index built at the same time: each term from the
+name, category, target muscles and description points at the exercises
+that contain it, weighted by field. Query terms match as prefixes through
+a sorted term list, so search-as-you-type never scans the catalog.
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+import re
+from types import MappingProxyType
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+ALL_CATEGORIES = "all"
+
+# Relevance of a term by the field it came from
+FIELD_WEIGHTS = {"name": 8.0, "category": 4.0, "target_muscles": 4.0, "description": 1.0}
+# A query term that is a whole word scores more than one that is only a prefix
+EXACT_MATCH_BOOST = 2.0
+STOP_WORDS = frozenset({"a", "an", "and", "the", "of", "to", "for", "with", "on", "in", "your", "that"})
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOP_WORDS]
+
+
+class ExerciseIndex:
+    """Immutable snapshot of the catalog. Treat returned exercises as read-only."""
+
+    def __init__(self, exercises: List[dict]):
+        self.exercises = tuple(exercises)
+        self.by_id = MappingProxyType({e["exercise_id"]: e for e in self.exercises})
+
+        by_category = {}
+        for exercise in self.exercises:
+            by_category.setdefault((exercise.get("category") or "").lower(), []).append(exercise)
+        self.by_category = MappingProxyType({k: tuple(v) for k, v in by_category.items()})
+
+        responses = {ALL_CATEGORIES: self._serialize(self.exercises)}
+        for category, exercises in self.by_category.items():
+            responses[category] = self._serialize(exercises)
+        self._responses = MappingProxyType(responses)
+        self._empty_response = self._serialize(())
+
+        postings = {}  # term -> {exercise_id: weight}
+        for exercise in self.exercises:
+            for field, weight in FIELD_WEIGHTS.items():
+                value = exercise.get(field) or ""
+                text = " ".join(value) if isinstance(value, list) else value
+                for term in tokenize(text):
+                    scores = postings.setdefault(term, {})
+                    scores[exercise["exercise_id"]] = max(scores.get(exercise["exercise_id"], 0.0), weight)
+        self._postings = MappingProxyType(postings)
+        self._terms = tuple(sorted(postings))
+
+    @staticmethod
+    def _serialize(exercises) -> Tuple[bytes, str]:
+        body = json.dumps({"exercises": list(exercises)}, separators=(",", ":")).encode("utf-8")
+        return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, exercise_id: str) -> Optional[dict]:
+        return self.by_id.get(exercise_id)
+
+    def _prefix_scores(self, query_term: str) -> dict:
+        """Best score per exercise over all indexed terms starting with `query_term`."""
+        scores = {}
+        for i in range(bisect.bisect_left(self._terms, query_term), len(self._terms)):
+            term = self._terms[i]
+            if not term.startswith(query_term):
+                break
+            boost = EXACT_MATCH_BOOST if term == query_term else 1.0
+            for exercise_id, weight in self._postings[term].items():
+                scores[exercise_id] = max(scores.get(exercise_id, 0.0), weight * boost)
+        return scores
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """Exercises matching every query term (as a prefix), best match first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        totals = None
+        for term in terms:
+            scores = self._prefix_scores(term)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {eid: totals[eid] + score for eid, score in scores.items() if eid in totals}
+            if not totals:
+                return []
+        # Ties go to the shorter (closer) name
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], len(self.by_id[item[0]]["name"]), self.by_id[item[0]]["name"]))
+        return [self.by_id[exercise_id] for exercise_id, _ in ranked[:limit]]
+
+    def list_response(self, category: Optional[str] = None) -> Tuple[bytes, str]:
+        """Pre-serialized `{"exercises": [...]}` body and its ETag for a category (or all)."""
+        key = (category or ALL_CATEGORIES).lower()
+        return self._responses.get(key, self._empty_response)
+
+
+class ExerciseCache:
+    def __init__(self):
+        self._index: Optional[ExerciseIndex] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, loader: Callable[[], Awaitable[List[dict]]]) -> ExerciseIndex:
+        """Return the index, loading the catalog through `loader` on first use."""
+        if self._index is None:
+            async with self._lock:
+                if self._index is None:
+                    self._index = ExerciseIndex(await loader())
+        return self._index
+
+    async def reload(self, loader: Callable[[], Awaitable[List[dict]]]) -> ExerciseIndex:
+        self._index = ExerciseIndex(await loader())
+        return self._index
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header covers the given ETag (weak or strong)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+# Singleton instance
+exercise_cache = ExerciseCache()
@@ -0,0 +1,100 @@
+"""
+Image processing for food scans (Pillow).
+
+Decoding and encoding are CPU-bound and synchronous; async callers run them
+on a worker thread (`asyncio.to_thread`) so the event loop keeps serving
+requests.
+"""
+import asyncio
+import io
+import os
+from typing import Dict, Tuple
+
+from PIL import Image, ImageOps
+
+# Images sent to the vision model: longest edge and JPEG quality
+MODEL_IMAGE_MAX_DIMENSION = int(os.getenv('MODEL_IMAGE_MAX_DIMENSION', '1024'))
+MODEL_IMAGE_JPEG_QUALITY = int(os.getenv('MODEL_IMAGE_JPEG_QUALITY', '85'))
+
+# Longest edge of each thumbnail, in pixels
+THUMBNAIL_SIZES = [int(s) for s in os.getenv('THUMBNAIL_SIZES', '160,480').split(',')]
+THUMBNAIL_FORMATS = {
+    # format key -> (Pillow format, encoder options)
+    'webp': ('WEBP', {'quality': 75, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+
+def open_image(data: bytes) -> Image.Image:
+    """Decode and apply the EXIF orientation, so pixels are stored upright."""
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    return image
+
+
+def normalize_for_model(data: bytes, max_dimension: int = None) -> bytes:
+    """
+    Upright, downsized JPEG for the vision model. Phone photos are often 4000px
+    and several MB; the model does not need more than ~1000px to read a plate.
+    Raises PIL.UnidentifiedImageError if the bytes are not an image.
+    """
+    max_dimension = max_dimension or MODEL_IMAGE_MAX_DIMENSION
+    with Image.open(io.BytesIO(data)) as original:
+        orientation = original.getexif().get(0x0112, 1)  # EXIF Orientation
+        if original.format == 'JPEG' and orientation == 1 and max(original.size) <= max_dimension:
+            return data  # already small and upright: don't re-encode
+        image = open_image(data)
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=MODEL_IMAGE_JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def difference_hash(data: bytes) -> int:
+    """
+    64-bit perceptual hash (dHash): one bit per horizontally adjacent pixel
+    pair of a 9x8 grayscale thumbnail. Similar images differ in few bits.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft('L', (64, 64))  # JPEG: decode at reduced scale
+        pixels = list(image.convert('L').resize((9, 8), Image.BILINEAR).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def prepare_for_model(data: bytes) -> Tuple[bytes, int]:
+    """Normalized model image and its perceptual hash, in one worker-thread call."""
+    normalized = normalize_for_model(data)
+    return normalized, difference_hash(normalized)
+
+
+def encode(image: Image.Image, fmt: str) -> bytes:
+    pil_format, options = THUMBNAIL_FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def make_thumbnails(data: bytes) -> Dict[str, Dict[str, bytes]]:
+    """Encode every thumbnail size in every format: {"160": {"webp": b"...", "jpeg": b"..."}, ...}."""
+    source = open_image(data)
+    thumbnails = {}
+    for size in THUMBNAIL_SIZES:
+        image = source.copy()
+        image.thumbnail((size, size), Image.LANCZOS)
+        thumbnails[str(size)] = {fmt: encode(image, fmt) for fmt in THUMBNAIL_FORMATS}
+    return thumbnails
+
+
+async def store_thumbnails(blob_store, data: bytes) -> Dict[str, Dict[str, str]]:
+    """Encode thumbnails on a worker thread and store them; returns their blob keys by size and format."""
+    encoded = await asyncio.to_thread(make_thumbnails, data)
+    return {
+        size: {fmt: await blob_store.put(thumbnail, f"image/{fmt}") for fmt, thumbnail in formats.items()}
+        for size, formats in encoded.items()
+    }
@@ -0,0 +1,174 @@
+"""
+Shared provider connections for LLM calls.
+
+Without a shared HTTP client, calls can pay for connection setup (DNS, TCP,
+TLS) to the provider. At startup this module creates one pooled
+`httpx.AsyncClient` with keep-alive connections and installs it as litellm's
+async session (`litellm.aclient_session`). Our own litellm calls (`stream()`)
+go through it. Whether `LlmChat` does depends on the emergentintegrations
+version: it only benefits if it calls litellm without passing its own client.
+`pool_stats()` (under "llm_pool" in /api/metrics) shows which is the case. It
+counts requests sent through the pooled client next to the LLM calls made.
+If `requests` stays well below `llm_calls`, `LlmChat` bypasses the pool and
+each of its calls sets up its own connection.
+
+The warm-up opens a first connection to the host real calls use: LLM_WARMUP_URL
+if set, otherwise LLM_API_BASE. The default config (Emergent key, neither
+variable set) has no known host to warm up, so nothing is warmed and the first
+call pays for the handshake; set LLM_API_BASE to the key's proxy to change that.
+
+`LlmChat` objects keep their conversation's message history, so they cannot
+be shared between requests. `chat()` builds them from the shared model
+configuration, and every call's latency is recorded per purpose for
+/api/metrics.
+
+`LlmChat` only returns whole completions; `stream()` calls litellm directly
+with `stream=True` and yields text as it arrives. That needs credentials
+litellm can use on its own: either LLM_API_BASE (the proxy the Emergent key
+is routed through) or a direct provider key in LLM_API_KEY. With neither,
+`can_stream()` is False and callers should use `chat()` instead of making a
+request that is bound to fail.
+"""
+import importlib.util
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List
+
+from emergentintegrations.llm.chat import LlmChat
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LlmClientPool:
+    def __init__(self):
+        self.provider = os.getenv('LLM_PROVIDER', 'openai')
+        self.model = os.getenv('LLM_MODEL', 'gpt-4o')
+        self.max_connections = int(os.getenv('LLM_MAX_CONNECTIONS', '20'))
+        self.keepalive_seconds = float(os.getenv('LLM_KEEPALIVE_SECONDS', '120'))
+        self.timeout_seconds = float(os.getenv('LLM_TIMEOUT_SECONDS', '120'))
+        self.api_base = os.getenv('LLM_API_BASE') or None
+        self.warmup_url = os.getenv('LLM_WARMUP_URL', self.api_base or '')
+        self.api_key = os.getenv('LLM_API_KEY') or None
+        self.http_client = None
+        self._latencies: Dict[str, deque] = {}  # purpose -> recent call durations, seconds
+        self._first_tokens: Dict[str, deque] = {}  # purpose -> recent times to first streamed token
+        self._calls: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self.pooled_requests = 0
+
+    async def start(self):
+        import httpx
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_seconds,
+            ),
+            timeout=httpx.Timeout(self.timeout_seconds, connect=10.0),
+            event_hooks={"request": [self._count_request]},
+        )
+        try:
+            import litellm
+            litellm.aclient_session = self.http_client
+        except ImportError:
+            print("litellm not installed; LLM calls will not use the pooled HTTP client")
+        await self.warm_up()
+
+    async def warm_up(self):
+        """Open a keep-alive connection to the provider before the first real call."""
+        if not self.warmup_url or self.http_client is None:
+            return
+        started = time.perf_counter()
+        try:
+            # Any response (even 401) leaves a warm connection in the pool
+            await self.http_client.get(self.warmup_url, timeout=10.0)
+            print(f"LLM connection warmed up in {time.perf_counter() - started:.3f}s")
+        except Exception as e:
+            print(f"LLM warm-up failed: {e}")
+
+    async def stop(self):
+        if self.http_client is not None:
+            try:
+                import litellm
+                if litellm.aclient_session is self.http_client:
+                    litellm.aclient_session = None
+            except ImportError:
+                pass
+            await self.http_client.aclose()
+            self.http_client = None
+
+    def chat(self, session_id: str, system_message: str) -> LlmChat:
+        """A new conversation on the shared model configuration."""
+        return LlmChat(
+            api_key=os.environ.get('EMERGENT_LLM_KEY', ''),  # read per call: .env loads after import
+            session_id=session_id,
+            system_message=system_message
+        ).with_model(self.provider, self.model)
+
+    def can_stream(self) -> bool:
+        """Whether `stream()` has a base URL and key it can reach the model with."""
+        if not (self.api_base or self.api_key):
+            return False
+        return importlib.util.find_spec("litellm") is not None
+
+    async def stream(self, messages: List[dict]) -> AsyncIterator[str]:
+        """Yield the completion for OpenAI-style `messages` piece by piece; check `can_stream()` first."""
+        import litellm
+
+        response = await litellm.acompletion(
+            model=f"{self.provider}/{self.model}",
+            messages=messages,
+            # A direct provider key, or the Emergent key when calls go through its proxy
+            api_key=self.api_key or os.environ.get('EMERGENT_LLM_KEY', ''),
+            api_base=self.api_base,
+            stream=True,
+        )
+        async for chunk in response:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                yield text
+
+    def record(self, purpose: str, seconds: float, ok: bool = True, first_token: float = None):
+        self._latencies.setdefault(purpose, deque(maxlen=500)).append(seconds)
+        if first_token is not None:
+            self._first_tokens.setdefault(purpose, deque(maxlen=500)).append(first_token)
+        self._calls[purpose] = self._calls.get(purpose, 0) + 1
+        if not ok:
+            self._errors[purpose] = self._errors.get(purpose, 0) + 1
+
+    async def _count_request(self, request):
+        self.pooled_requests += 1
+
+    def pool_stats(self) -> dict:
+        """Requests that went through the pooled client, against all LLM calls (warm-up included)."""
+        return {
+            "active": self.http_client is not None,
+            "requests": self.pooled_requests,
+            "llm_calls": sum(self._calls.values()),
+            "warmup_url": self.warmup_url or None,
+        }
+
+    def stats(self) -> dict:
+        stats = {}
+        for purpose, samples in self._latencies.items():
+            stats[purpose] = {
+                "calls": self._calls.get(purpose, 0),
+                "errors": self._errors.get(purpose, 0),
+                "p50_seconds": round(percentile(samples, 0.5), 3),
+                "p95_seconds": round(percentile(samples, 0.95), 3),
+                "max_seconds": round(max(samples), 3),
+            }
+            first_tokens = self._first_tokens.get(purpose)
+            if first_tokens:
+                stats[purpose]["p50_first_token_seconds"] = round(percentile(first_tokens, 0.5), 3)
+                stats[purpose]["p95_first_token_seconds"] = round(percentile(first_tokens, 0.95), 3)
+        return stats
+
+
+# Singleton instance
+llm_clients = LlmClientPool()
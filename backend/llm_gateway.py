@@ -0,0 +1,166 @@
+"""
+Admission control for LLM calls.
+
+Every model call (food scan, coach chat, meal plan) takes a slot from one
+gateway before it goes out, so a burst cannot run more than
+LLM_MAX_CONCURRENCY requests against the provider at once.
+
+When all slots are busy, callers wait in a queue that is ordered by:
+
+1. priority class: scans before chat before meal plans, background chat
+   summaries last
+2. round-robin between users within a class, so one user with many
+   requests cannot starve the others
+
+Overload fails fast instead of piling up: a caller is rejected at once when
+LLM_MAX_QUEUED callers are already waiting, or when that user already has
+LLM_MAX_QUEUED_PER_USER waiting, and a caller still queued after
+LLM_QUEUE_TIMEOUT_SECONDS gives up. Both raise `LlmGatewaySaturated`
+(the API answers 429).
+
+Limits are per process; divide the provider's budget by the worker count.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+# Priority classes, most urgent first
+PRIORITY_SCAN = 0
+PRIORITY_CHAT = 1
+PRIORITY_MEAL_PLAN = 2
+PRIORITY_SUMMARY = 3
+PRIORITY_NAMES = {PRIORITY_SCAN: "scan", PRIORITY_CHAT: "chat", PRIORITY_MEAL_PLAN: "meal_plan", PRIORITY_SUMMARY: "summary"}
+
+
+class LlmGatewaySaturated(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LlmGateway:
+    def __init__(self, max_concurrency: int = None, max_queued: int = None,
+                 max_queued_per_user: int = None, queue_timeout: float = None):
+        self.max_concurrency = max_concurrency if max_concurrency is not None else int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+        self.max_queued = max_queued if max_queued is not None else int(os.getenv('LLM_MAX_QUEUED', '64'))
+        self.max_queued_per_user = max_queued_per_user if max_queued_per_user is not None else int(os.getenv('LLM_MAX_QUEUED_PER_USER', '4'))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', '30'))
+        self.in_flight = 0
+        # priority -> user_id -> waiters (futures) in arrival order; the user order is the round-robin order
+        self._queues: Dict[int, OrderedDict] = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self._queued = 0
+        self._queued_by_user: Dict[str, int] = {}
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, priority: int):
+        """Hold one of the concurrency slots for the duration of an LLM call."""
+        await self.acquire(user_id, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, user_id: str, priority: int):
+        if self.in_flight < self.max_concurrency and not self._queued:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if self._queued >= self.max_queued or self._queued_by_user.get(user_id, 0) >= self.max_queued_per_user:
+            self.rejected += 1
+            raise LlmGatewaySaturated("AI service is busy, try again shortly", retry_after=self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(user_id, deque()).append(waiter)
+        self._queued += 1
+        self._queued_by_user[user_id] = self._queued_by_user.get(user_id, 0) + 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._remove(priority, user_id, waiter)
+            self.timed_out += 1
+            raise LlmGatewaySaturated("AI service is busy, try again shortly", retry_after=self._retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as we were cancelled
+            else:
+                self._remove(priority, user_id, waiter)
+            raise
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def release(self):
+        """Hand the slot to the next waiter, or free it."""
+        waiter = self._next_waiter()
+        if waiter is not None:
+            waiter.set_result(None)  # in_flight is unchanged: the slot moves to the waiter
+        else:
+            self.in_flight -= 1
+
+    def _next_waiter(self):
+        for priority in sorted(self._queues):
+            users = self._queues[priority]
+            if not users:
+                continue
+            while users:
+                user_id, waiters = users.popitem(last=False)
+                waiter = waiters.popleft()
+                if waiters:
+                    users[user_id] = waiters  # back of the line for this user's next request
+                self._dequeued(user_id)
+                # A waiter that timed out or was cancelled may still be here: skip it, its caller is gone
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def _remove(self, priority: int, user_id: str, waiter):
+        waiters = self._queues[priority].get(user_id)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._queues[priority][user_id]
+            self._dequeued(user_id)
+
+    def _dequeued(self, user_id: str):
+        self._queued -= 1
+        remaining = self._queued_by_user[user_id] - 1
+        if remaining:
+            self._queued_by_user[user_id] = remaining
+        else:
+            del self._queued_by_user[user_id]
+
+    def _retry_after(self) -> int:
+        # Rough: queued calls drain in batches of max_concurrency, a few seconds each
+        return max(1, min(60, 5 * (self._queued // max(1, self.max_concurrency) + 1)))
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": self._queued,
+            "queued_by_priority": {
+                name: sum(len(waiters) for waiters in self._queues[priority].values())
+                for priority, name in PRIORITY_NAMES.items()
+            },
+            "queued_users": len(self._queued_by_user),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.admitted, 4) if self.admitted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+        }
+
+
+# Singleton instance
+llm_gateway = LlmGateway()
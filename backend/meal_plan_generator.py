@@ -0,0 +1,170 @@
+"""
+AI meal plan generation, fanned out over chunks of days.
+
+One completion for a whole 7- or 14-day plan is slow (output tokens are
+generated one after another) and can hit the output limit. The plan is split
+into chunks of MEAL_PLAN_DAYS_PER_CALL days instead. Up to
+MEAL_PLAN_CONCURRENCY chunks are generated at the same time. By default that
+is a quarter of the gateway's LLM_MAX_CONCURRENCY: gateway priorities only
+order the queue, so a plan holding most of the slots would stall scans and
+chat behind it.
+
+Each chunk is checked before it is used: every requested day is present,
+with all five meals and numeric macros. A chunk that fails the check is
+asked for again (MEAL_PLAN_CHUNK_RETRIES). The chunks are then merged into
+the usual `days` list.
+
+Chunks cannot see each other, so each prompt asks for varied meals within
+the user's own preferences. Plans are capped at MEAL_PLAN_MAX_DAYS days, which
+bounds the number of calls one request can make.
+"""
+import asyncio
+import json
+import os
+import re
+from typing import Awaitable, Callable, List
+
+from llm_gateway import llm_gateway
+
+MEAL_PLAN_DAYS_PER_CALL = int(os.getenv('MEAL_PLAN_DAYS_PER_CALL', '2'))
+# 0: derive from the gateway's slot count
+MEAL_PLAN_CONCURRENCY = int(os.getenv('MEAL_PLAN_CONCURRENCY', '0'))
+MEAL_PLAN_CHUNK_RETRIES = int(os.getenv('MEAL_PLAN_CHUNK_RETRIES', '1'))
+MEAL_PLAN_MAX_DAYS = int(os.getenv('MEAL_PLAN_MAX_DAYS', '14'))
+
+MEAL_KEYS = ("breakfast", "morning_snack", "lunch", "afternoon_snack", "dinner")
+MACRO_KEYS = ("calories", "protein", "carbs", "fat")
+
+SYSTEM_MESSAGE = "You are a nutrition expert AI that creates detailed meal plans based on user requirements."
+
+# Sends one prompt to the model and returns the raw reply
+SendFn = Callable[[str], Awaitable[str]]
+
+
+class InvalidMealPlan(ValueError):
+    pass
+
+
+def build_prompt(day_numbers: List[int], duration: int, calorie_target: int, dietary_preferences, allergies) -> str:
+    first, last = day_numbers[0], day_numbers[-1]
+    days = f"day {first}" if first == last else f"days {first} to {last}"
+    return f"""Create {days} of a {duration}-day meal plan for a person with the following details:
+- Daily calorie target: {calorie_target} kcal
+- Dietary preferences: {dietary_preferences or 'None'}
+- Allergies: {allergies or 'None'}
+
+The other days of the plan are written separately, so choose varied meals that still follow the preferences above, and do not repeat a meal within these days.
+
+For each day, provide meals for these categories:
+1. Breakfast
+2. Morning Snack
+3. Lunch
+4. Afternoon Snack
+5. Dinner
+
+For each meal, include:
+- Meal name
+- Calories (kcal)
+- Protein (g)
+- Carbs (g)
+- Fat (g)
+- Brief description
+- Key ingredients (list)
+
+Return the response in this exact JSON format, with one entry per day (day_number {first} to {last}):
+{{
+  "days": [
+    {{
+      "day_number": {first},
+      "meals": {{
+        "breakfast": {{"name": "...", "calories": 350, "protein": 15, "carbs": 45, "fat": 10, "description": "...", "ingredients": ["..."]}},
+        "morning_snack": {{"name": "...", "calories": 150, "protein": 5, "carbs": 20, "fat": 5, "description": "...", "ingredients": ["..."]}},
+        "lunch": {{"name": "...", "calories": 450, "protein": 25, "carbs": 50, "fat": 15, "description": "...", "ingredients": ["..."]}},
+        "afternoon_snack": {{"name": "...", "calories": 150, "protein": 5, "carbs": 20, "fat": 5, "description": "...", "ingredients": ["..."]}},
+        "dinner": {{"name": "...", "calories": 400, "protein": 30, "carbs": 40, "fat": 12, "description": "...", "ingredients": ["..."]}}
+      }}
+    }}
+  ]
+}}
+
+Make sure the total daily calories are close to {calorie_target} kcal. Return ONLY the JSON, no additional text."""
+
+
+def extract_json(response_text: str) -> dict:
+    """Parse a model reply that may wrap its JSON in a markdown code block or extra text."""
+    text = response_text.strip()
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0].strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        json_match = re.search(r'\{[\s\S]*\}', text)
+        if json_match:
+            try:
+                return json.loads(json_match.group())
+            except json.JSONDecodeError:
+                pass
+        raise InvalidMealPlan(f"Failed to parse AI response as JSON: {str(e)}")
+
+
+def validate_days(data: dict, day_numbers: List[int]) -> List[dict]:
+    """The requested days from a parsed reply, with numeric macros; raises InvalidMealPlan."""
+    days = data.get("days") if isinstance(data, dict) else None
+    if not isinstance(days, list) or len(days) < len(day_numbers):
+        raise InvalidMealPlan(f"Expected {len(day_numbers)} days")
+
+    validated = []
+    # Positional: the model does not always number chunk days the way it was asked to
+    for day_number, day in zip(day_numbers, days):
+        meals = day.get("meals") if isinstance(day, dict) else None
+        if not isinstance(meals, dict) or any(key not in meals for key in MEAL_KEYS):
+            raise InvalidMealPlan(f"Day {day_number} is missing meals")
+        clean_meals = {}
+        for key in MEAL_KEYS:
+            meal = meals[key]
+            if not isinstance(meal, dict) or not meal.get("name"):
+                raise InvalidMealPlan(f"Day {day_number} {key} is incomplete")
+            try:
+                macros = {macro: float(meal[macro]) for macro in MACRO_KEYS}
+            except (KeyError, TypeError, ValueError):
+                raise InvalidMealPlan(f"Day {day_number} {key} has invalid macros")
+            clean_meals[key] = {**meal, **macros}
+        if sum(meal["calories"] for meal in clean_meals.values()) <= 0:
+            raise InvalidMealPlan(f"Day {day_number} has no calories")
+        validated.append({"day_number": day_number, "meals": clean_meals})
+    return validated
+
+
+async def generate_days(send: SendFn, duration: int, calorie_target: int, dietary_preferences=None,
+                        allergies=None, days_per_call: int = None, concurrency: int = None) -> List[dict]:
+    """Generate and validate every chunk of days concurrently; returns the merged days in order."""
+    if not 1 <= duration <= MEAL_PLAN_MAX_DAYS:
+        raise ValueError(f"Meal plans can be 1 to {MEAL_PLAN_MAX_DAYS} days long")
+    days_per_call = max(1, days_per_call or MEAL_PLAN_DAYS_PER_CALL)
+    concurrency = concurrency or MEAL_PLAN_CONCURRENCY or llm_gateway.max_concurrency // 4
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    chunks = [list(range(start, min(start + days_per_call, duration + 1)))
+              for start in range(1, duration + 1, days_per_call)]
+
+    async def generate_chunk(day_numbers: List[int]) -> List[dict]:
+        prompt = build_prompt(day_numbers, duration, calorie_target, dietary_preferences, allergies)
+        async with semaphore:
+            for attempt in range(MEAL_PLAN_CHUNK_RETRIES + 1):
+                response = await send(prompt)
+                try:
+                    return validate_days(extract_json(response), day_numbers)
+                except InvalidMealPlan:
+                    # The last failure reaches the endpoint, which answers 500
+                    if attempt == MEAL_PLAN_CHUNK_RETRIES:
+                        raise
+
+    tasks = [asyncio.ensure_future(generate_chunk(chunk)) for chunk in chunks]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        # One chunk failed: don't keep paying for the others
+        for task in tasks:
+            task.cancel()
+    return [day for chunk in results for day in chunk]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Move inline food scan images (food_scans.image_base64) into the blob store
+and create thumbnails for scans that have none.
+
+Run once after add_food_scan_image_hash.sql and add_food_scan_thumbnails.sql.
+Each image is written to the configured blob store (BLOB_BACKEND) and the row
+keeps only its hash. Safe to re-run: finished rows are skipped.
+"""
+import asyncio
+import base64
+import binascii
+
+from dotenv import load_dotenv
+
+from blob_store import create_blob_store
+from database import create_database
+from images import store_thumbnails
+from pagination import decode_cursor
+from repositories import Repositories
+
+PAGE_SIZE = 100
+
+
+async def migrate(repos: Repositories, blob_store) -> tuple:
+    moved = thumbnailed = 0
+    before = None
+    while True:
+        scans, next_cursor = await repos.food_scans.list_image_page(PAGE_SIZE, before)
+        for scan in scans:
+            data = None
+            if not scan.get("image_hash") and scan.get("image_base64"):
+                try:
+                    data = base64.b64decode(scan["image_base64"].split("base64,")[-1], validate=True)
+                except (binascii.Error, ValueError):
+                    print(f"Skipping scan {scan['scan_id']}: image is not valid base64")
+                    continue
+                scan["image_hash"] = await blob_store.put(data)
+                await repos.food_scans.move_image_to_blob(scan["scan_id"], scan["image_hash"])
+                moved += 1
+            if scan.get("image_hash") and not scan.get("thumbnails"):
+                if data is None:
+                    blob = await blob_store.get(scan["image_hash"])
+                    data = blob[0] if blob else None
+                try:
+                    thumbnails = await store_thumbnails(blob_store, data) if data else None
+                except Exception as e:
+                    print(f"Skipping thumbnails for scan {scan['scan_id']}: {e}")
+                    thumbnails = None
+                if thumbnails:
+                    await repos.food_scans.set_thumbnails(scan["scan_id"], thumbnails)
+                    thumbnailed += 1
+        if not next_cursor:
+            return moved, thumbnailed
+        before = decode_cursor(next_cursor)
+
+
+async def main():
+    repos = Repositories(create_database())
+    try:
+        moved, thumbnailed = await migrate(repos, create_blob_store())
+        print(f"Moved {moved} food scan images to the blob store, created thumbnails for {thumbnailed}")
+    finally:
+        repos.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
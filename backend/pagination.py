@@ -0,0 +1,45 @@
+"""
+Opaque keyset cursors for history endpoints.
+
+History pages are ordered newest first on (timestamp column, id). A cursor
+encodes the key of the last row a client received; the next page starts
+strictly after it, so paging never skips or repeats rows and the database
+never scans the pages before it (no OFFSET).
+"""
+import base64
+import json
+from typing import List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def clamp_limit(limit: Optional[int], default: int = DEFAULT_PAGE_SIZE) -> int:
+    return max(1, min(limit or default, MAX_PAGE_SIZE))
+
+
+def encode_cursor(row: dict, order: str, tiebreak: str) -> str:
+    payload = json.dumps([row[order], row[tiebreak]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return the (timestamp, id) key in a cursor; raises ValueError for a malformed one."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(value, str) or not isinstance(key, str):
+        raise ValueError("Invalid cursor")
+    return value, key
+
+
+def page(rows: List[dict], limit: int, order: str, tiebreak: str) -> Tuple[List[dict], Optional[str]]:
+    """Split a `limit + 1` fetch into the page and the cursor for the next one (None on the last page)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1], order, tiebreak)
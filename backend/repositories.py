@@ -0,0 +1,369 @@
+"""
+Repository layer for the FitFlow API.
+
+Each repository owns one table and exposes the queries the routes need, so
+route handlers never address tables by raw string. Repositories only talk to
+the awaitable `Database` interface and work unchanged on the Supabase and the
+SQLite backends.
+
+Every read names its columns. The column sets below are the projections for
+each access path; pick the narrowest one that covers what the handler returns.
+"""
+from datetime import datetime
+from typing import Optional, List, Tuple
+
+from database import Database
+from pagination import page
+
+# users
+# Slim record for authentication and request context - never the profile picture
+USER_COLUMNS = "user_id, name, email, age, gender, height, weight, activity_level, goal_weight, theme, weight_unit"
+USER_PICTURE_COLUMNS = "user_id, profile_picture"
+USER_LOGIN_COLUMNS = "user_id, name, email, password"
+USER_PASSWORD_COLUMNS = "user_id, password"
+USER_VERIFICATION_COLUMNS = "user_id, name, email_verified"
+USER_EXISTS_COLUMNS = "user_id"
+USER_WEIGHT_UNIT_COLUMNS = "user_id, weight_unit"
+
+# food_scans
+FOOD_SCAN_HISTORY_COLUMNS = "scan_id, food_name, calories, protein, carbs, fat, portion_size, image_hash, thumbnails, scanned_at"
+FOOD_SCAN_IMAGE_COLUMNS = "scan_id, image_hash, image_base64, thumbnails, scanned_at"
+FOOD_SCAN_MACRO_COLUMNS = "calories, protein, carbs, fat"
+
+# user_stats
+USER_STATS_COLUMNS = "steps, calories_burned, calories_consumed, active_minutes, water_intake, sleep_hours"
+USER_STATS_DATE_COLUMNS = "date"
+
+# goals
+GOAL_COLUMNS = "goal_id, user_id, goal_type, target_value, current_progress, unit, created_at"
+
+# measurements
+MEASUREMENT_COLUMNS = "measurement_id, user_id, weight, body_fat, bmi, recorded_at"
+
+# chat_history
+CHAT_HISTORY_COLUMNS = "chat_id, user_id, user_message, assistant_message, language, timestamp, created_at"
+CHAT_SUMMARY_COLUMNS = "user_id, summary, summarized_through, summarized_chat_id, turn_count"
+
+# meal_plans
+MEAL_PLAN_SUMMARY_COLUMNS = "plan_id, name, duration, start_date, created_at, type, calorie_target"
+MEAL_PLAN_COLUMNS = MEAL_PLAN_SUMMARY_COLUMNS + ", user_id, dietary_preferences, allergies, days"
+MEAL_PLAN_DAYS_COLUMNS = "plan_id, days"
+
+# exercises
+EXERCISE_COLUMNS = "exercise_id, name, category, description, target_muscles, instructions, tips, safety_tips, image_url"
+EXERCISE_NAME_COLUMNS = "exercise_id, name"
+EXERCISE_ID_COLUMNS = "exercise_id"
+
+# workout_sessions
+WORKOUT_SESSION_COLUMNS = (
+    "session_id, user_id, exercise_id, exercise_name, sets, total_sets, notes, duration_minutes, "
+    "total_volume, max_weight, max_reps, weight_unit, completed, created_at, updated_at"
+)
+WORKOUT_SESSION_LAST_COLUMNS = "exercise_id, sets, total_volume"
+WORKOUT_SESSION_EXERCISE_COLUMNS = "session_id, exercise_id"
+WORKOUT_SESSION_HISTORY_COLUMNS = "session_id, created_at, sets, total_sets, total_volume, weight_unit"
+
+# user_exercise_aggregates
+USER_EXERCISE_AGGREGATE_COLUMNS = (
+    "total_sessions, total_volume, personal_best, max_reps, estimated_1rm, last_session, previous_volume, weight_unit"
+)
+
+
+class Repository:
+    table = None
+    # Keyset for history pages, newest first: (timestamp column, id column)
+    cursor_columns = None
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def delete_for_user(self, user_id: str) -> int:
+        return await self.db.delete(self.table, {'user_id': user_id})
+
+    async def _page(self, filters: dict, columns: str, limit: int,
+                    before: Optional[tuple]) -> Tuple[List[dict], Optional[str]]:
+        """One history page and the cursor for the next (None on the last page)."""
+        order, tiebreak = self.cursor_columns
+        rows = await self.db.fetch_page(self.table, filters, columns, order, tiebreak, limit + 1, before)
+        return page(rows, limit, order, tiebreak)
+
+
+class UserRepository(Repository):
+    table = 'users'
+
+    async def get(self, user_id: str, columns: str = USER_COLUMNS) -> Optional[dict]:
+        return await self.db.fetch_one(self.table, {'user_id': user_id}, columns)
+
+    async def get_by_email(self, email: str, columns: str) -> Optional[dict]:
+        return await self.db.fetch_one(self.table, {'email': email}, columns)
+
+    async def create(self, user: dict) -> None:
+        await self.db.insert(self.table, user)
+
+    async def update(self, user_id: str, data: dict) -> int:
+        return await self.db.update(self.table, data, {'user_id': user_id})
+
+    async def delete(self, user_id: str) -> int:
+        return await self.db.delete(self.table, {'user_id': user_id})
+
+
+class FoodScanRepository(Repository):
+    table = 'food_scans'
+    cursor_columns = ('scanned_at', 'scan_id')
+
+    async def create(self, scan: dict) -> None:
+        await self.db.insert(self.table, scan)
+
+    async def list_page(self, user_id: str, limit: int, before: Optional[tuple] = None):
+        return await self._page({'user_id': user_id}, FOOD_SCAN_HISTORY_COLUMNS, limit, before)
+
+    async def list_since(self, user_id: str, since: str, columns: str = FOOD_SCAN_MACRO_COLUMNS) -> List[dict]:
+        return await self.db.fetch_all(
+            self.table, {'user_id': user_id}, columns, order='scanned_at', desc=True, gte={'scanned_at': since}
+        )
+
+    async def delete(self, user_id: str, scan_id: str) -> int:
+        return await self.db.delete(self.table, {'scan_id': scan_id, 'user_id': user_id})
+
+    async def list_image_page(self, limit: int, before: Optional[tuple] = None):
+        """Image columns of all scans, page by page (for moving inline images to the blob store)."""
+        return await self._page({}, FOOD_SCAN_IMAGE_COLUMNS, limit, before)
+
+    async def move_image_to_blob(self, scan_id: str, image_hash: str) -> int:
+        return await self.db.update(self.table, {'image_hash': image_hash, 'image_base64': None}, {'scan_id': scan_id})
+
+    async def set_thumbnails(self, scan_id: str, thumbnails: dict) -> int:
+        return await self.db.update(self.table, {'thumbnails': thumbnails}, {'scan_id': scan_id})
+
+
+class UserStatsRepository(Repository):
+    table = 'user_stats'
+
+    async def get_for_date(self, user_id: str, date: str, columns: str = USER_STATS_COLUMNS) -> Optional[dict]:
+        return await self.db.fetch_one(self.table, {'user_id': user_id, 'date': date}, columns)
+
+    async def create(self, stats: dict) -> None:
+        await self.db.insert(self.table, stats)
+
+    async def update_for_date(self, user_id: str, date: str, data: dict) -> int:
+        return await self.db.update(self.table, data, {'user_id': user_id, 'date': date})
+
+    async def upsert(self, stats: dict) -> None:
+        await self.db.upsert(self.table, stats, on_conflict='user_id,date')
+
+    async def increment(self, user_id: str, date: str, deltas: dict) -> dict:
+        """Atomically add `deltas` (counter -> amount) to the day's row, creating it if needed."""
+        params = {'p_user_id': user_id, 'p_date': date}
+        params.update({f'p_{field}': int(round(amount)) for field, amount in deltas.items()})
+        return await self.db.rpc('increment_user_stats', params)
+
+    async def list_dates(self, user_id: str) -> List[dict]:
+        return await self.db.fetch_all(self.table, {'user_id': user_id}, USER_STATS_DATE_COLUMNS, order='date', desc=True)
+
+
+class GoalRepository(Repository):
+    table = 'goals'
+
+    async def create(self, goal: dict) -> None:
+        await self.db.insert(self.table, goal)
+
+    async def list_for_user(self, user_id: str) -> List[dict]:
+        return await self.db.fetch_all(self.table, {'user_id': user_id}, GOAL_COLUMNS)
+
+    async def update_progress(self, user_id: str, goal_id: str, current_progress: float) -> int:
+        return await self.db.update(
+            self.table, {'current_progress': current_progress}, {'goal_id': goal_id, 'user_id': user_id}
+        )
+
+
+class MeasurementRepository(Repository):
+    table = 'measurements'
+    cursor_columns = ('recorded_at', 'measurement_id')
+
+    async def create(self, measurement: dict) -> None:
+        await self.db.insert(self.table, measurement)
+
+    async def latest(self, user_id: str) -> Optional[dict]:
+        rows = await self.db.fetch_all(
+            self.table, {'user_id': user_id}, MEASUREMENT_COLUMNS, order='recorded_at', desc=True, limit=1
+        )
+        return rows[0] if rows else None
+
+    async def list_page(self, user_id: str, limit: int, before: Optional[tuple] = None):
+        return await self._page({'user_id': user_id}, MEASUREMENT_COLUMNS, limit, before)
+
+
+class ChatHistoryRepository(Repository):
+    table = 'chat_history'
+    cursor_columns = ('created_at', 'chat_id')
+
+    async def create(self, chat: dict) -> None:
+        await self.db.insert(self.table, chat)
+
+    async def create_many(self, chats: List[dict]) -> None:
+        await self.db.insert(self.table, chats)
+
+    async def list_page(self, user_id: str, limit: int, before: Optional[tuple] = None):
+        return await self._page({'user_id': user_id}, CHAT_HISTORY_COLUMNS, limit, before)
+
+
+class ChatSummaryRepository(Repository):
+    table = 'chat_summaries'
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        return await self.db.fetch_one(self.table, {'user_id': user_id}, CHAT_SUMMARY_COLUMNS)
+
+    async def upsert(self, user_id: str, summary: str, summarized_through: str, summarized_chat_id: str,
+                     turn_count: int) -> None:
+        await self.db.upsert(self.table, {
+            'user_id': user_id,
+            'summary': summary,
+            'summarized_through': summarized_through,
+            'summarized_chat_id': summarized_chat_id,
+            'turn_count': turn_count,
+            'updated_at': datetime.utcnow().isoformat(),
+        }, on_conflict='user_id')
+
+
+class MealPlanRepository(Repository):
+    table = 'meal_plans'
+
+    async def create(self, plan: dict) -> None:
+        await self.db.insert(self.table, plan)
+
+    async def get(self, user_id: str, plan_id: str, columns: str = MEAL_PLAN_COLUMNS) -> Optional[dict]:
+        return await self.db.fetch_one(self.table, {'plan_id': plan_id, 'user_id': user_id}, columns)
+
+    async def list_for_user(self, user_id: str) -> List[dict]:
+        return await self.db.fetch_all(
+            self.table, {'user_id': user_id}, MEAL_PLAN_SUMMARY_COLUMNS, order='created_at', desc=True
+        )
+
+    async def update_days(self, user_id: str, plan_id: str, days: list) -> int:
+        return await self.db.update(self.table, {'days': days}, {'plan_id': plan_id, 'user_id': user_id})
+
+    async def delete(self, user_id: str, plan_id: str) -> int:
+        return await self.db.delete(self.table, {'plan_id': plan_id, 'user_id': user_id})
+
+
+class ExerciseRepository(Repository):
+    table = 'exercises'
+
+    async def get(self, exercise_id: str, columns: str = EXERCISE_COLUMNS) -> Optional[dict]:
+        return await self.db.fetch_one(self.table, {'exercise_id': exercise_id}, columns)
+
+    async def list_all(self) -> List[dict]:
+        return await self.db.fetch_all(self.table, None, EXERCISE_COLUMNS)
+
+    async def create(self, exercise: dict) -> None:
+        await self.db.insert(self.table, exercise)
+
+    async def list_ids(self) -> List[str]:
+        rows = await self.db.fetch_all(self.table, None, EXERCISE_ID_COLUMNS)
+        return [row['exercise_id'] for row in rows]
+
+    async def upsert_many(self, exercises: List[dict]) -> None:
+        await self.db.upsert(self.table, exercises, on_conflict='exercise_id')
+
+
+class WorkoutSessionRepository(Repository):
+    table = 'workout_sessions'
+    cursor_columns = ('created_at', 'session_id')
+
+    async def create(self, session: dict) -> None:
+        await self.db.insert(self.table, session)
+
+    async def get(self, user_id: str, session_id: str, columns: str = WORKOUT_SESSION_COLUMNS) -> Optional[dict]:
+        return await self.db.fetch_one(self.table, {'session_id': session_id, 'user_id': user_id}, columns)
+
+    async def list_page(self, user_id: str, limit: int, before: Optional[tuple] = None,
+                        exercise_id: Optional[str] = None, columns: str = WORKOUT_SESSION_COLUMNS):
+        filters = {'user_id': user_id}
+        if exercise_id:
+            filters['exercise_id'] = exercise_id
+        return await self._page(filters, columns, limit, before)
+
+    async def latest_for_exercise(self, user_id: str, exercise_id: str) -> Optional[dict]:
+        rows = await self.db.fetch_all(
+            self.table, {'user_id': user_id, 'exercise_id': exercise_id}, WORKOUT_SESSION_LAST_COLUMNS,
+            order='created_at', desc=True, limit=1
+        )
+        return rows[0] if rows else None
+
+    async def update(self, user_id: str, session_id: str, data: dict) -> int:
+        return await self.db.update(self.table, data, {'session_id': session_id, 'user_id': user_id})
+
+    async def dashboard_stats(self, user_id: str, week_start: str, month_start: str) -> dict:
+        """Totals, window counts, favorite and latest workout in one call (add_workout_dashboard_stats.sql)."""
+        return await self.db.rpc('workout_dashboard_stats', {
+            'p_user_id': user_id, 'p_week_start': week_start, 'p_month_start': month_start
+        })
+
+    async def delete(self, user_id: str, session_id: str) -> int:
+        return await self.db.delete(self.table, {'session_id': session_id, 'user_id': user_id})
+
+
+class UserExerciseAggregateRepository(Repository):
+    """Per-user per-exercise stats, kept current by the add_user_exercise_aggregates.sql functions."""
+    table = 'user_exercise_aggregates'
+
+    async def get(self, user_id: str, exercise_id: str) -> Optional[dict]:
+        return await self.db.fetch_one(
+            self.table, {'user_id': user_id, 'exercise_id': exercise_id}, USER_EXERCISE_AGGREGATE_COLUMNS
+        )
+
+    async def record_session(self, session: dict) -> None:
+        """Insert a new workout session and fold it into its aggregate, atomically."""
+        sets = session.get('sets') or []
+        await self.db.rpc('record_workout_session', {
+            'p_session': session,
+            'p_max_weight': max((s['weight'] for s in sets), default=None),
+            'p_max_reps': max((s['reps'] for s in sets), default=None),
+            # Epley formula: weight * (1 + reps/30)
+            'p_estimated_1rm': max((s['weight'] * (1 + s['reps'] / 30) for s in sets), default=None),
+            'p_last_session': {
+                'session_id': session['session_id'],
+                'sets': sets,
+                'total_volume': session.get('total_volume') or 0,
+                'weight_unit': session.get('weight_unit'),
+                'created_at': session.get('created_at'),
+            },
+        })
+
+    async def refresh(self, user_id: str, exercise_id: str) -> None:
+        """Recompute an aggregate from scratch after a session was edited or deleted."""
+        await self.db.rpc('refresh_user_exercise_aggregate', {'p_user_id': user_id, 'p_exercise_id': exercise_id})
+
+
+class AppMetadataRepository(Repository):
+    table = 'app_metadata'
+
+    async def get(self, key: str) -> Optional[str]:
+        row = await self.db.fetch_one(self.table, {'key': key}, 'key, value')
+        return row['value'] if row else None
+
+    async def set(self, key: str, value: str) -> None:
+        await self.db.upsert(self.table, {'key': key, 'value': value, 'updated_at': datetime.utcnow().isoformat()},
+                             on_conflict='key')
+
+
+class Repositories:
+    """All repositories bound to one database backend."""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.users = UserRepository(db)
+        self.food_scans = FoodScanRepository(db)
+        self.user_stats = UserStatsRepository(db)
+        self.goals = GoalRepository(db)
+        self.measurements = MeasurementRepository(db)
+        self.chat_history = ChatHistoryRepository(db)
+        self.chat_summaries = ChatSummaryRepository(db)
+        self.meal_plans = MealPlanRepository(db)
+        self.exercises = ExerciseRepository(db)
+        self.workout_sessions = WorkoutSessionRepository(db)
+        self.exercise_aggregates = UserExerciseAggregateRepository(db)
+        self.app_metadata = AppMetadataRepository(db)
+
+    def close(self):
+        self.db.close()
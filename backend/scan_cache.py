@@ -0,0 +1,89 @@
+"""
+In-process cache of food scan analyses keyed by perceptual hash.
+
+People rescan the same plate or packaged item, and every scan is a full
+vision-model call. Each analysis is stored under the 64-bit difference hash
+(dHash) of the normalized image; a new scan whose hash is within
+SCAN_CACHE_MAX_DISTANCE bits (Hamming distance) of a cached one reuses that
+result without calling the model.
+
+Exact hash matches are a dict lookup; near matches scan the entries, which
+is a few thousand integer XORs at the default size. LRU eviction bounds
+memory at SCAN_CACHE_MAX_SIZE entries. Results carry no user data, so the
+cache is shared by all users of the process.
+"""
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ScanResultCache:
+    def __init__(self, max_size: int = None, max_distance: int = None, enabled: bool = None):
+        self.max_size = max_size if max_size is not None else int(os.getenv('SCAN_CACHE_MAX_SIZE', '5000'))
+        self.max_distance = max_distance if max_distance is not None else int(os.getenv('SCAN_CACHE_MAX_DISTANCE', '6'))
+        self.enabled = enabled if enabled is not None else os.getenv('SCAN_CACHE_ENABLED', 'true').lower() == 'true'
+        self._entries = OrderedDict()  # image hash -> analysis result
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def _find(self, image_hash: int) -> Optional[Tuple[int, dict]]:
+        result = self._entries.get(image_hash)
+        if result is not None:
+            return image_hash, result
+        best = None
+        for cached_hash, result in self._entries.items():
+            distance = hamming_distance(image_hash, cached_hash)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, cached_hash, result)
+                if distance == 1:
+                    break
+        return best and best[1:]
+
+    def get(self, image_hash: int, bypass: bool = False) -> Optional[dict]:
+        """The cached analysis for a visually matching image, or None."""
+        if not self.enabled or bypass:
+            self.bypasses += 1
+            return None
+        found = self._find(image_hash)
+        if found is None:
+            self.misses += 1
+            return None
+        cached_hash, result = found
+        self._entries.move_to_end(cached_hash)
+        self.hits += 1
+        if cached_hash != image_hash:
+            self.near_hits += 1
+        return dict(result)
+
+    def set(self, image_hash: int, result: dict):
+        if not self.enabled:
+            return
+        self._entries[image_hash] = dict(result)
+        self._entries.move_to_end(image_hash)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Singleton instance
+scan_cache = ScanResultCache()
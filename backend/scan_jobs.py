@@ -0,0 +1,163 @@
+"""
+Background food scan jobs.
+
+`POST /api/food/scan/jobs` answers 202 with a job id at once; the analysis
+runs on a fixed pool of SCAN_JOB_WORKERS tasks fed by a queue of at most
+SCAN_JOB_QUEUE_SIZE jobs (a full queue is a 429, not an ever-growing
+backlog). Clients poll the job or wait on its event stream.
+
+A client that retries the same image while its job is queued, running or
+recently finished gets the existing job back instead of a second model call.
+Finished jobs are kept for SCAN_JOB_TTL_SECONDS. Jobs live in this process
+only; the scan itself is stored in food_scans as usual.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+RunFn = Callable[[], Awaitable[dict]]
+
+
+class ScanJob:
+    def __init__(self, user_id: str, dedupe_key: Optional[str], run: RunFn):
+        self.job_id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.dedupe_key = dedupe_key
+        self.status = QUEUED
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+        self._run = run
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "status_code": self.status_code,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ScanJobQueue:
+    def __init__(self, workers: int = None, max_queued: int = None, ttl_seconds: float = None):
+        self.workers = workers if workers is not None else int(os.getenv('SCAN_JOB_WORKERS', '4'))
+        self.max_queued = max_queued if max_queued is not None else int(os.getenv('SCAN_JOB_QUEUE_SIZE', '100'))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('SCAN_JOB_TTL_SECONDS', '600'))
+        self._jobs: Dict[str, ScanJob] = {}
+        self._by_key: Dict[Tuple[str, str], ScanJob] = {}  # (user_id, dedupe_key) -> latest job
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.get_running_loop().create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._jobs.values():
+            if not job.finished:
+                self._finish(job, error="Server is shutting down", status_code=503)
+
+    def submit(self, user_id: str, dedupe_key: Optional[str], run: RunFn) -> Tuple[ScanJob, bool]:
+        """
+        Queue `run` as a job; returns (job, created). A live or recently
+        finished job for the same user and key is returned instead, unless it failed.
+        Raises asyncio.QueueFull when the queue is at capacity.
+        """
+        self._prune()
+        if dedupe_key is not None:
+            existing = self._by_key.get((user_id, dedupe_key))
+            if existing is not None and existing.status != FAILED:
+                self.deduplicated += 1
+                return existing, False
+
+        job = ScanJob(user_id, dedupe_key, run)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        self._jobs[job.job_id] = job
+        if dedupe_key is not None:
+            self._by_key[(user_id, dedupe_key)] = job
+        self.submitted += 1
+        return job, True
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def _finish(self, job: ScanJob, result: dict = None, error: str = None, status_code: int = None):
+        job.status = FAILED if error is not None else SUCCEEDED
+        job.result = result
+        job.error = error
+        job.status_code = status_code
+        job.finished_at = time.time()
+        job._run = None  # drop the image bytes held by the closure
+        if error is not None:
+            self.failed += 1
+        job.done.set()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job for job in self._jobs.values() if job.finished and job.finished_at < cutoff]
+        for job in expired:
+            del self._jobs[job.job_id]
+            if self._by_key.get((job.user_id, job.dedupe_key)) is job:
+                del self._by_key[(job.user_id, job.dedupe_key)]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = RUNNING
+                result = await job._run()
+                self._finish(job, result=result)
+            except asyncio.CancelledError:
+                self._finish(job, error="Server is shutting down", status_code=503)
+                raise
+            except Exception as e:
+                print(f"Scan job {job.job_id} failed: {e}")
+                # HTTPException carries its own status and message
+                self._finish(job, error=str(getattr(e, "detail", e)), status_code=getattr(e, "status_code", 500))
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": sum(1 for job in self._jobs.values() if job.status == RUNNING),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "failed": self.failed,
+        }
+
+
+# Singleton instance
+scan_jobs = ScanJobQueue()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Seed the built-in exercise catalog into the `exercises` table.
+
+Run once per deploy (`python seed_exercises.py`, add `--force` to reseed an
+unchanged catalog) and start the API with SEED_EXERCISES_ON_STARTUP=false.
+When the API seeds on startup instead, the stored catalog hash makes every
+start after the first a single metadata read.
+
+Seeding is idempotent: one bulk read of existing ids, one bulk upsert of the
+catalog, then the catalog hash is recorded in `app_metadata`.
+"""
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+from database import create_database
+from exercise_catalog import EXERCISES, CATALOG_HASH
+from repositories import Repositories
+
+CATALOG_HASH_KEY = "exercise_catalog_hash"
+
+
+async def seed_exercises(repos: Repositories, force: bool = False) -> bool:
+    """Bring the exercises table in line with the catalog; returns False if it already was."""
+    if not force and await repos.app_metadata.get(CATALOG_HASH_KEY) == CATALOG_HASH:
+        print(f"Exercise catalog up to date ({CATALOG_HASH[:12]})")
+        return False
+
+    existing_ids = set(await repos.exercises.list_ids())
+    new_count = sum(1 for exercise in EXERCISES if exercise["exercise_id"] not in existing_ids)
+    await repos.exercises.upsert_many(EXERCISES)
+    await repos.app_metadata.set(CATALOG_HASH_KEY, CATALOG_HASH)
+
+    print(f"Seeded {len(EXERCISES)} exercises ({new_count} new), catalog {CATALOG_HASH[:12]}")
+    return True
+
+
+async def main(force: bool):
+    repos = Repositories(create_database())
+    try:
+        await seed_exercises(repos, force=force)
+    finally:
+        repos.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main(force="--force" in sys.argv[1:]))
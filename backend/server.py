@@ -1,27 +1,81 @@
 from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Form, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime, timedelta
-from supabase import create_client, Client
 import os
 import jwt
 import bcrypt
 import uuid
 import base64
+import binascii
+import hmac
 import json
+import asyncio
+import time
 from dotenv import load_dotenv
-from emergentintegrations.llm.chat import LlmChat, UserMessage, ImageContent
+from emergentintegrations.llm.chat import UserMessage, ImageContent
 from email_service import email_service
 from utils import generate_verification_token, verify_token, get_token_expiry_time
+from database import create_database
+from user_cache import user_cache
+from stats_buffer import stats_buffer
+from seed_exercises import seed_exercises
+from exercise_index import exercise_cache, etag_matches
+from pagination import clamp_limit, decode_cursor, encode_cursor
+from blob_store import create_blob_store, is_blob_key, blob_key
+from images import store_thumbnails, prepare_for_model
+from scan_cache import scan_cache
+from scan_jobs import scan_jobs
+from llm_gateway import (
+    llm_gateway, LlmGatewaySaturated, PRIORITY_SCAN, PRIORITY_CHAT, PRIORITY_MEAL_PLAN, PRIORITY_SUMMARY, PRIORITY_NAMES
+)
+from llm_clients import llm_clients
+from coach_prompt import coach_prompts
+from chat_writer import chat_writer
+from chat_context import chat_context, ContextTooLarge, SUMMARY_SYSTEM_MESSAGE, render_summary_request
+from meal_plan_generator import generate_days, InvalidMealPlan, MEAL_PLAN_MAX_DAYS, SYSTEM_MESSAGE as MEAL_PLAN_SYSTEM_MESSAGE
+from PIL import UnidentifiedImageError
+from repositories import (
+    Repositories, USER_PICTURE_COLUMNS, USER_LOGIN_COLUMNS, USER_PASSWORD_COLUMNS, USER_VERIFICATION_COLUMNS,
+    USER_EXISTS_COLUMNS, USER_WEIGHT_UNIT_COLUMNS, MEAL_PLAN_DAYS_COLUMNS,
+    WORKOUT_SESSION_HISTORY_COLUMNS, WORKOUT_SESSION_EXERCISE_COLUMNS
+)
 
 # Load environment variables from .env file
 load_dotenv()
 
 app = FastAPI()
 
+# Largest food scan image accepted, in bytes (decoded)
+MAX_SCAN_UPLOAD_BYTES = int(os.getenv('MAX_SCAN_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+
+class ScanUploadLimitMiddleware:
+    """
+    Reject oversized scan uploads from their Content-Length before the body is
+    parsed. Base64 bodies are a third larger than the image, hence the allowance.
+    Bodies without a Content-Length are checked while the upload is read.
+    """
+    def __init__(self, app, paths: tuple, max_body_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            content_length = dict(scope["headers"]).get(b"content-length")
+            if content_length and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+                response = Response(
+                    json.dumps({"detail": "Image is too large"}), status_code=413, media_type="application/json"
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+# Added before CORS so it runs inside it and 413s still carry CORS headers
+app.add_middleware(ScanUploadLimitMiddleware, paths=("/api/food/scan", "/api/food/scan/jobs"), max_body_bytes=MAX_SCAN_UPLOAD_BYTES * 4 // 3 + 64 * 1024)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -31,36 +85,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Supabase Connection
-SUPABASE_URL = os.environ.get('SUPABASE_URL')
-SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Database Connection (Supabase by default, DATABASE_BACKEND=sqlite for a local stand-in)
+# Routes must go through `repos`, never call `.execute()` on the event loop
+repos = Repositories(create_database())
+blob_store = create_blob_store()
+
+# Shared secret for /api/metrics (X-Metrics-Token header); unset disables the endpoint
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Seconds between keep-alive comments on idle event streams
+SSE_KEEPALIVE_SECONDS = float(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+
+# Turn off when the deploy runs `python seed_exercises.py` itself
+SEED_EXERCISES_ON_STARTUP = os.getenv('SEED_EXERCISES_ON_STARTUP', 'true').lower() == 'true'
 
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
 
-# OpenAI API Configuration (using Emergent LLM Key)
-EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY', '')
-
 security = HTTPBearer()
 
-def get_supabase_data(response):
-    """Helper to extract data from Supabase response"""
-    if hasattr(response, 'data'):
-        if isinstance(response.data, list):
-            return response.data[0] if response.data else None
-        return response.data
-    return None
-
-def get_supabase_list(response):
-    """Helper to extract list from Supabase response"""
-    if hasattr(response, 'data'):
-        return response.data if isinstance(response.data, list) else []
-    return []
-
-
 # Models
 class UserRegister(BaseModel):
     name: str
@@ -188,10 +233,16 @@ def decode_jwt_token(token: str) -> dict:
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def parse_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     payload = decode_jwt_token(token)
-    user = get_supabase_data(supabase.table('users').select('*').eq('user_id', payload["user_id"]).execute())
+    user = await user_cache.get_or_load(payload["user_id"], repos.users.get)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
@@ -235,17 +286,32 @@ def calculate_daily_calories(weight: float, height: float, age: int, gender: str
         "daily_target": round(daily_calories, 2)
     }
 
-async def analyze_food_with_ai(image_base64: str) -> dict:
+async def send_llm_message(llm_chat, message, user_id: str, priority: int) -> str:
+    """Send one message through the LLM gateway; a saturated gateway is a 429"""
+    purpose = PRIORITY_NAMES[priority]
+    try:
+        async with llm_gateway.slot(user_id, priority):
+            started = time.perf_counter()
+            try:
+                response = await llm_chat.send_message(message)
+            except Exception:
+                llm_clients.record(purpose, time.perf_counter() - started, ok=False)
+                raise
+            llm_clients.record(purpose, time.perf_counter() - started)
+            return response
+    except LlmGatewaySaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def analyze_food_with_ai(image_base64: str, user_id: str) -> dict:
     """
     Analyze food image using OpenAI GPT-4o vision with Emergent LLM Key
     """
     try:
         # Create chat instance with Emergent LLM Key
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
+        chat = llm_clients.chat(
             session_id=f"food_analysis_{uuid.uuid4()}",
             system_message="You are a nutrition expert AI. Analyze food images and provide accurate nutritional information."
-        ).with_model("openai", "gpt-4o")
+        )
         
         prompt = '''Analyze this food image and provide ONLY a JSON response with the following structure:
 {
@@ -269,7 +335,7 @@ Provide realistic estimates based on the visible portion. Return ONLY valid JSON
         )
         
         # Send message and get response
-        response = await chat.send_message(user_message)
+        response = await send_llm_message(chat, user_message, user_id, PRIORITY_SCAN)
         
         # Debug: Print the raw response
         print(f"Raw AI response: '{response}'")
@@ -285,7 +351,8 @@ Provide realistic estimates based on the visible portion. Return ONLY valid JSON
                 "protein": 3.0,
                 "carbs": 20.0,
                 "fat": 5.0,
-                "portion_size": "1 serving"
+                "portion_size": "1 serving",
+                "fallback": True
             }
         
         # Parse the JSON response
@@ -311,7 +378,8 @@ Provide realistic estimates based on the visible portion. Return ONLY valid JSON
                 "protein": 2.0,
                 "carbs": 15.0,
                 "fat": 3.0,
-                "portion_size": "1 serving"
+                "portion_size": "1 serving",
+                "fallback": True
             }
         
         return {
@@ -322,901 +390,71 @@ Provide realistic estimates based on the visible portion. Return ONLY valid JSON
             "fat": float(food_data.get("fat", 0)),
             "portion_size": food_data.get("portion_size", "1 serving")
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error analyzing food: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to analyze food image: {str(e)}")
 
 
-# Initialize workout exercises in database
-def initialize_exercises():
-    """Initialize predefined workout exercises if not already present"""
-    exercises = [
-        # CHEST EXERCISES
-        {
-            "exercise_id": "bench-press",
-            "name": "Bench Press",
-            "category": "Chest",
-            "description": "A compound exercise that targets the chest, triceps, and shoulders",
-            "target_muscles": ["Chest", "Triceps", "Shoulders"],
-            "instructions": [
-                "Lie flat on a bench with your feet firmly on the ground",
-                "Grip the barbell slightly wider than shoulder-width",
-                "Lower the bar to your mid-chest in a controlled manner",
-                "Press the bar back up to the starting position"
-            ],
-            "tips": [
-                "Keep your shoulder blades retracted and depressed",
-                "Maintain a slight arch in your lower back",
-                "Control the descent - don't bounce the bar off your chest"
-            ],
-            "safety_tips": [
-                "Always use a spotter for heavy weights",
-                "Warm up properly before lifting",
-                "Don't lock out your elbows completely at the top"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "incline-bench-press",
-            "name": "Incline Bench Press",
-            "category": "Chest",
-            "description": "Targets the upper chest with an angled pressing motion",
-            "target_muscles": ["Upper Chest", "Shoulders", "Triceps"],
-            "instructions": [
-                "Set bench to 30-45 degree incline",
-                "Grip barbell slightly wider than shoulders",
-                "Lower bar to upper chest",
-                "Press back up to starting position"
-            ],
-            "tips": [
-                "Keep elbows at 45-degree angle",
-                "Press in slight arc toward face",
-                "Maintain tight core throughout"
-            ],
-            "safety_tips": [
-                "Don't set incline too steep (max 45 degrees)",
-                "Keep feet flat on ground for stability",
-                "Use spotter for heavy sets"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1532029837206-abbe2b7620e3?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "dumbbell-fly",
-            "name": "Dumbbell Fly",
-            "category": "Chest",
-            "description": "Isolation exercise for chest with full stretch and contraction",
-            "target_muscles": ["Chest", "Shoulders"],
-            "instructions": [
-                "Lie on flat bench with dumbbells above chest",
-                "Lower weights out to sides in wide arc",
-                "Keep slight bend in elbows",
-                "Bring weights back together above chest"
-            ],
-            "tips": [
-                "Focus on chest stretch at bottom",
-                "Control the weight - don't drop arms",
-                "Squeeze chest at top of movement"
-            ],
-            "safety_tips": [
-                "Don't go too heavy - focus on form",
-                "Maintain slight elbow bend throughout",
-                "Stop if you feel shoulder pain"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1581009146145-b5ef050c2e1e?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "push-ups",
-            "name": "Push-Ups",
-            "category": "Chest",
-            "description": "Bodyweight exercise building chest, triceps, and core strength",
-            "target_muscles": ["Chest", "Triceps", "Shoulders", "Core"],
-            "instructions": [
-                "Start in plank position with hands shoulder-width",
-                "Lower body until chest nearly touches floor",
-                "Keep elbows at 45-degree angle",
-                "Push back up to starting position"
-            ],
-            "tips": [
-                "Keep body in straight line",
-                "Engage core throughout movement",
-                "Full range of motion for best results"
-            ],
-            "safety_tips": [
-                "Don't let hips sag",
-                "Keep neck neutral",
-                "Modify on knees if needed"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1598971639058-fab3c3109a00?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "cable-crossover",
-            "name": "Cable Crossover",
-            "category": "Chest",
-            "description": "Cable exercise for complete chest development and peak contraction",
-            "target_muscles": ["Chest", "Front Shoulders"],
-            "instructions": [
-                "Set pulleys to high position",
-                "Grab handles and step forward",
-                "Pull handles down and across body",
-                "Squeeze chest at center"
-            ],
-            "tips": [
-                "Lean forward slightly",
-                "Focus on squeezing chest at peak",
-                "Control the return motion"
-            ],
-            "safety_tips": [
-                "Start with lighter weight",
-                "Don't overstretch shoulders",
-                "Maintain stable stance"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1534438327276-14e5300c3a48?w=400&h=400&fit=crop"
-        },
-        
-        # BACK EXERCISES
-        {
-            "exercise_id": "deadlift",
-            "name": "Deadlift",
-            "category": "Back",
-            "description": "A full-body compound exercise emphasizing the posterior chain",
-            "target_muscles": ["Lower Back", "Hamstrings", "Glutes", "Traps", "Forearms"],
-            "instructions": [
-                "Stand with feet hip-width apart, bar over mid-foot",
-                "Bend down and grip the bar just outside your legs",
-                "Keep your back straight and chest up",
-                "Drive through your heels and extend your hips",
-                "Stand up fully, then lower the bar with control"
-            ],
-            "tips": [
-                "Keep the bar close to your body throughout",
-                "Engage your lats to protect your lower back",
-                "Think about pushing the floor away, not pulling the bar up"
-            ],
-            "safety_tips": [
-                "Never round your lower back",
-                "Don't jerk the weight off the floor",
-                "Use proper form over heavy weight"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1566241440091-ec10de8db2e1?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "barbell-row",
-            "name": "Barbell Row",
-            "category": "Back",
-            "description": "A horizontal pulling exercise that builds back thickness",
-            "target_muscles": ["Lats", "Rhomboids", "Traps", "Biceps"],
-            "instructions": [
-                "Bend forward at the hips with a flat back",
-                "Grip the barbell with hands shoulder-width apart",
-                "Pull the bar to your lower chest/upper abdomen",
-                "Squeeze your shoulder blades together at the top",
-                "Lower the bar with control"
-            ],
-            "tips": [
-                "Keep your torso at about 45 degrees",
-                "Lead with your elbows, not your hands",
-                "Don't use momentum - control the weight"
-            ],
-            "safety_tips": [
-                "Maintain a neutral spine throughout",
-                "Don't round your lower back",
-                "Avoid using too much body English"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1534438327276-14e5300c3a48?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "pull-ups",
-            "name": "Pull Ups",
-            "category": "Back",
-            "description": "A bodyweight exercise that builds back width and arm strength",
-            "target_muscles": ["Lats", "Biceps", "Upper Back", "Core"],
-            "instructions": [
-                "Hang from a pull-up bar with hands shoulder-width apart",
-                "Pull yourself up until your chin clears the bar",
-                "Lower yourself back down with control",
-                "Repeat for desired reps"
-            ],
-            "tips": [
-                "Engage your core to prevent swinging",
-                "Pull your elbows down and back",
-                "Focus on using your back, not just your arms"
-            ],
-            "safety_tips": [
-                "Don't kip or swing excessively",
-                "Lower yourself fully for complete range of motion",
-                "Use assistance bands if needed"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1598971639058-fab3c3109a00?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "lat-pulldown",
-            "name": "Lat Pulldown",
-            "category": "Back",
-            "description": "Machine exercise for building lat width and upper back strength",
-            "target_muscles": ["Lats", "Biceps", "Rear Delts", "Traps"],
-            "instructions": [
-                "Sit at lat pulldown machine with knees secured",
-                "Grab bar with wide overhand grip",
-                "Pull bar down to upper chest",
-                "Squeeze shoulder blades together",
-                "Return to starting position with control"
-            ],
-            "tips": [
-                "Lean back slightly during pull",
-                "Focus on pulling elbows down and back",
-                "Don't use momentum or body swing"
-            ],
-            "safety_tips": [
-                "Don't pull bar behind neck",
-                "Keep core engaged",
-                "Use weight you can control"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1584380931214-dbb5b72e7fd0?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "seated-cable-row",
-            "name": "Seated Cable Row",
-            "category": "Back",
-            "description": "Horizontal pulling exercise for mid-back development",
-            "target_muscles": ["Mid Back", "Lats", "Biceps", "Rear Delts"],
-            "instructions": [
-                "Sit at cable row machine with feet on platform",
-                "Grab handle with both hands",
-                "Pull handle to lower chest",
-                "Squeeze shoulder blades together",
-                "Return arms to extended position"
-            ],
-            "tips": [
-                "Keep torso upright and stable",
-                "Drive elbows back past body",
-                "Maintain neutral spine"
-            ],
-            "safety_tips": [
-                "Don't round lower back",
-                "Control the weight on return",
-                "Keep chest up throughout"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "t-bar-row",
-            "name": "T-Bar Row",
-            "category": "Back",
-            "description": "Angled rowing movement for overall back thickness",
-            "target_muscles": ["Mid Back", "Lats", "Traps", "Biceps"],
-            "instructions": [
-                "Straddle T-bar with bent knees",
-                "Grab handles with overhand grip",
-                "Pull weight toward chest",
-                "Squeeze back at top",
-                "Lower with control"
-            ],
-            "tips": [
-                "Keep back flat and chest up",
-                "Pull with elbows, not hands",
-                "Use full range of motion"
-            ],
-            "safety_tips": [
-                "Don't round spine",
-                "Start light to learn form",
-                "Brace core throughout"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1517836357463-d25dfeac3438?w=400&h=400&fit=crop"
-        },
-        
-        # LEG EXERCISES
-        {
-            "exercise_id": "squat",
-            "name": "Squat",
-            "category": "Legs",
-            "description": "A fundamental lower body compound exercise targeting quads, hamstrings, and glutes",
-            "target_muscles": ["Quadriceps", "Hamstrings", "Glutes", "Core"],
-            "instructions": [
-                "Stand with feet shoulder-width apart",
-                "Keep your chest up and core tight",
-                "Lower yourself by bending at the hips and knees",
-                "Descend until thighs are parallel to the ground",
-                "Push through your heels to return to standing"
-            ],
-            "tips": [
-                "Keep your knees tracking over your toes",
-                "Maintain a neutral spine throughout the movement",
-                "Drive through your heels, not your toes"
-            ],
-            "safety_tips": [
-                "Never let your knees cave inward",
-                "Don't round your lower back",
-                "Use a weight appropriate for your strength level"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1574680096145-d05b474e2155?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "leg-press",
-            "name": "Leg Press",
-            "category": "Legs",
-            "description": "Machine exercise for overall leg development with back support",
-            "target_muscles": ["Quadriceps", "Glutes", "Hamstrings"],
-            "instructions": [
-                "Sit in leg press machine with feet shoulder-width on platform",
-                "Release safety locks",
-                "Lower platform by bending knees to 90 degrees",
-                "Press back up to starting position",
-                "Don't lock knees at top"
-            ],
-            "tips": [
-                "Keep lower back pressed against pad",
-                "Push through entire foot, not just toes",
-                "Control descent for better results"
-            ],
-            "safety_tips": [
-                "Never lock knees fully",
-                "Don't let lower back lift off pad",
-                "Use appropriate weight"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1434682881908-b43d0467b798?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "leg-curl",
-            "name": "Leg Curl",
-            "category": "Legs",
-            "description": "Isolation exercise targeting the hamstrings",
-            "target_muscles": ["Hamstrings", "Calves"],
-            "instructions": [
-                "Lie face down on leg curl machine",
-                "Place ankles under padded lever",
-                "Curl legs up toward glutes",
-                "Squeeze hamstrings at top",
-                "Lower with control"
-            ],
-            "tips": [
-                "Keep hips pressed down",
-                "Full range of motion",
-                "Don't use momentum"
-            ],
-            "safety_tips": [
-                "Don't hyperextend knees",
-                "Keep movement controlled",
-                "Adjust pad to fit properly"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1517836357463-d25dfeac3438?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "leg-extension",
-            "name": "Leg Extension",
-            "category": "Legs",
-            "description": "Isolation exercise for quadriceps development",
-            "target_muscles": ["Quadriceps"],
-            "instructions": [
-                "Sit in leg extension machine",
-                "Place ankles under padded lever",
-                "Extend legs until fully straight",
-                "Squeeze quads at top",
-                "Lower with control"
-            ],
-            "tips": [
-                "Keep back against pad",
-                "Control both up and down phases",
-                "Squeeze at full extension"
-            ],
-            "safety_tips": [
-                "Don't hyperextend knees",
-                "Use moderate weight",
-                "Stop if knee pain occurs"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "lunges",
-            "name": "Lunges",
-            "category": "Legs",
-            "description": "Unilateral leg exercise for balance and strength",
-            "target_muscles": ["Quadriceps", "Glutes", "Hamstrings"],
-            "instructions": [
-                "Stand with feet hip-width apart",
-                "Step forward with one leg",
-                "Lower hips until both knees at 90 degrees",
-                "Push back to starting position",
-                "Alternate legs"
-            ],
-            "tips": [
-                "Keep front knee over ankle",
-                "Maintain upright torso",
-                "Push through front heel"
-            ],
-            "safety_tips": [
-                "Don't let front knee pass toes",
-                "Keep core engaged",
-                "Start with bodyweight"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1574680096145-d05b474e2155?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "bulgarian-split-squat",
-            "name": "Bulgarian Split Squat",
-            "category": "Legs",
-            "description": "Single-leg exercise for quad and glute development",
-            "target_muscles": ["Quadriceps", "Glutes", "Hamstrings"],
-            "instructions": [
-                "Place rear foot on bench behind you",
-                "Front foot forward in lunge position",
-                "Lower body by bending front knee",
-                "Push back up through front heel",
-                "Complete reps then switch legs"
-            ],
-            "tips": [
-                "Keep torso upright",
-                "Front knee tracks over toes",
-                "Control the descent"
-            ],
-            "safety_tips": [
-                "Start with bodyweight first",
-                "Use bench at knee height",
-                "Keep front knee stable"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1581009146145-b5ef050c2e1e?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "calf-raises",
-            "name": "Calf Raises",
-            "category": "Legs",
-            "description": "Isolation exercise for calf muscle development",
-            "target_muscles": ["Calves"],
-            "instructions": [
-                "Stand with balls of feet on raised surface",
-                "Lower heels below platform",
-                "Rise up onto toes as high as possible",
-                "Squeeze calves at top",
-                "Lower with control"
-            ],
-            "tips": [
-                "Full range of motion",
-                "Pause at top for squeeze",
-                "Keep knees slightly bent"
-            ],
-            "safety_tips": [
-                "Hold onto support for balance",
-                "Don't bounce at bottom",
-                "Control the movement"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1434682881908-b43d0467b798?w=400&h=400&fit=crop"
-        },
-        
-        # SHOULDER EXERCISES
-        {
-            "exercise_id": "overhead-press",
-            "name": "Overhead Press",
-            "category": "Shoulders",
-            "description": "A vertical pressing movement targeting the shoulders and triceps",
-            "target_muscles": ["Shoulders", "Triceps", "Upper Chest", "Core"],
-            "instructions": [
-                "Stand with feet shoulder-width apart",
-                "Hold the barbell at shoulder height",
-                "Press the bar overhead until arms are fully extended",
-                "Lower the bar back to shoulder height with control"
-            ],
-            "tips": [
-                "Keep your core tight and glutes engaged",
-                "Press the bar in a slight arc, not straight up",
-                "Don't lean back excessively"
-            ],
-            "safety_tips": [
-                "Avoid excessive lower back arching",
-                "Start with lighter weights to master form",
-                "Ensure full shoulder mobility before heavy pressing"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1571019614242-c5c5dee9f50b?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "lateral-raise",
-            "name": "Lateral Raise",
-            "category": "Shoulders",
-            "description": "Isolation exercise for side deltoid development",
-            "target_muscles": ["Side Deltoids", "Traps"],
-            "instructions": [
-                "Stand with dumbbells at sides",
-                "Raise arms out to sides until shoulder height",
-                "Keep slight bend in elbows",
-                "Lower with control"
-            ],
-            "tips": [
-                "Lead with elbows, not hands",
-                "Don't swing or use momentum",
-                "Keep shoulders down"
-            ],
-            "safety_tips": [
-                "Use lighter weight for proper form",
-                "Don't raise above shoulder height",
-                "Control the descent"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1532029837206-abbe2b7620e3?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "front-raise",
-            "name": "Front Raise",
-            "category": "Shoulders",
-            "description": "Isolation for front deltoid development",
-            "target_muscles": ["Front Deltoids", "Upper Chest"],
-            "instructions": [
-                "Stand with dumbbells in front of thighs",
-                "Raise arms straight in front to shoulder height",
-                "Keep slight bend in elbows",
-                "Lower back down with control"
-            ],
-            "tips": [
-                "Keep core tight",
-                "Don't swing weights up",
-                "Maintain neutral wrist position"
-            ],
-            "safety_tips": [
-                "Start light",
-                "Don't raise above shoulder level",
-                "Keep shoulders down"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1581009146145-b5ef050c2e1e?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "rear-delt-fly",
-            "name": "Rear Delt Fly",
-            "category": "Shoulders",
-            "description": "Isolation exercise for rear deltoid and upper back",
-            "target_muscles": ["Rear Deltoids", "Upper Back"],
-            "instructions": [
-                "Bend forward at hips with dumbbells",
-                "Raise arms out to sides in reverse fly motion",
-                "Squeeze shoulder blades together",
-                "Lower with control"
-            ],
-            "tips": [
-                "Keep back flat",
-                "Focus on rear delts, not traps",
-                "Don't use momentum"
-            ],
-            "safety_tips": [
-                "Maintain neutral spine",
-                "Use lighter weights",
-                "Keep slight elbow bend"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1534438327276-14e5300c3a48?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "shrugs",
-            "name": "Shrugs",
-            "category": "Shoulders",
-            "description": "Isolation exercise for trapezius development",
-            "target_muscles": ["Traps", "Upper Back"],
-            "instructions": [
-                "Stand holding dumbbells or barbell",
-                "Raise shoulders straight up toward ears",
-                "Hold briefly at top",
-                "Lower back down slowly"
-            ],
-            "tips": [
-                "Don't roll shoulders",
-                "Lift straight up and down",
-                "Squeeze traps at top"
-            ],
-            "safety_tips": [
-                "Don't use excessive weight",
-                "Keep arms straight",
-                "Control the movement"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1566241440091-ec10de8db2e1?w=400&h=400&fit=crop"
-        },
-        
-        # ARM EXERCISES
-        {
-            "exercise_id": "bicep-curl",
-            "name": "Bicep Curl",
-            "category": "Arms",
-            "description": "Classic isolation exercise for biceps development",
-            "target_muscles": ["Biceps", "Forearms"],
-            "instructions": [
-                "Stand with dumbbells at sides, palms forward",
-                "Curl weights up toward shoulders",
-                "Keep elbows stationary at sides",
-                "Lower with control"
-            ],
-            "tips": [
-                "Don't swing or use momentum",
-                "Keep elbows pinned to sides",
-                "Squeeze biceps at top"
-            ],
-            "safety_tips": [
-                "Control the weight throughout",
-                "Don't arch lower back",
-                "Use full range of motion"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1581009146145-b5ef050c2e1e?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "hammer-curl",
-            "name": "Hammer Curl",
-            "category": "Arms",
-            "description": "Bicep curl variation targeting brachialis and forearms",
-            "target_muscles": ["Biceps", "Brachialis", "Forearms"],
-            "instructions": [
-                "Stand with dumbbells at sides, palms facing in",
-                "Curl weights up keeping neutral grip",
-                "Keep elbows at sides",
-                "Lower with control"
-            ],
-            "tips": [
-                "Maintain neutral wrist throughout",
-                "Don't swing weights",
-                "Focus on controlled movement"
-            ],
-            "safety_tips": [
-                "Keep elbows stationary",
-                "Use appropriate weight",
-                "Full range of motion"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1532029837206-abbe2b7620e3?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "tricep-pushdown",
-            "name": "Tricep Pushdown",
-            "category": "Arms",
-            "description": "Cable isolation exercise for triceps development",
-            "target_muscles": ["Triceps"],
-            "instructions": [
-                "Stand at cable machine with rope or bar attachment",
-                "Start with elbows at 90 degrees",
-                "Push down until arms fully extended",
-                "Return to starting position with control"
-            ],
-            "tips": [
-                "Keep elbows pinned to sides",
-                "Squeeze triceps at bottom",
-                "Don't lean forward"
-            ],
-            "safety_tips": [
-                "Keep core engaged",
-                "Don't use too much weight",
-                "Control the return phase"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1571019614242-c5c5dee9f50b?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "dips",
-            "name": "Dips",
-            "category": "Arms",
-            "description": "Bodyweight or weighted exercise for triceps and chest",
-            "target_muscles": ["Triceps", "Chest", "Shoulders"],
-            "instructions": [
-                "Grip parallel bars with arms extended",
-                "Lower body by bending elbows",
-                "Descend until upper arms parallel to ground",
-                "Push back up to starting position"
-            ],
-            "tips": [
-                "Lean forward for more chest, upright for triceps",
-                "Keep shoulders down",
-                "Control the descent"
-            ],
-            "safety_tips": [
-                "Don't go too deep if shoulder hurts",
-                "Build up to weighted dips gradually",
-                "Warm up shoulders first"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1598971639058-fab3c3109a00?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "skull-crushers",
-            "name": "Skull Crushers",
-            "category": "Arms",
-            "description": "Lying tricep extension for mass building",
-            "target_muscles": ["Triceps"],
-            "instructions": [
-                "Lie on bench with barbell extended above chest",
-                "Lower bar toward forehead by bending elbows",
-                "Keep upper arms stationary",
-                "Extend arms back to starting position"
-            ],
-            "tips": [
-                "Keep elbows in, don't flare out",
-                "Lower slowly and controlled",
-                "Full extension at top"
-            ],
-            "safety_tips": [
-                "Use spotter for heavy weight",
-                "Don't go too heavy initially",
-                "Control the weight"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1534438327276-14e5300c3a48?w=400&h=400&fit=crop"
-        },
-        
-        # CORE EXERCISES
-        {
-            "exercise_id": "plank",
-            "name": "Plank",
-            "category": "Core",
-            "description": "Isometric core strengthening exercise",
-            "target_muscles": ["Core", "Abs", "Lower Back"],
-            "instructions": [
-                "Start in forearm plank position",
-                "Keep body in straight line from head to heels",
-                "Hold position maintaining tight core",
-                "Breathe normally throughout"
-            ],
-            "tips": [
-                "Don't let hips sag",
-                "Keep shoulders over elbows",
-                "Squeeze glutes and core"
-            ],
-            "safety_tips": [
-                "Don't hold breath",
-                "Stop if lower back hurts",
-                "Build up time gradually"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "crunches",
-            "name": "Crunches",
-            "category": "Core",
-            "description": "Classic abdominal exercise for upper abs",
-            "target_muscles": ["Abs", "Core"],
-            "instructions": [
-                "Lie on back with knees bent, feet flat",
-                "Place hands behind head",
-                "Lift shoulders off ground using abs",
-                "Lower back down with control"
-            ],
-            "tips": [
-                "Focus on abs, not pulling neck",
-                "Exhale on the way up",
-                "Keep lower back on ground"
-            ],
-            "safety_tips": [
-                "Don't pull on neck",
-                "Keep chin away from chest",
-                "Control the movement"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1598971639058-fab3c3109a00?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "russian-twists",
-            "name": "Russian Twists",
-            "category": "Core",
-            "description": "Rotational core exercise for obliques",
-            "target_muscles": ["Obliques", "Abs", "Core"],
-            "instructions": [
-                "Sit with knees bent, feet off ground",
-                "Lean back slightly maintaining straight back",
-                "Rotate torso side to side",
-                "Touch ground on each side"
-            ],
-            "tips": [
-                "Keep core engaged throughout",
-                "Move with control, not momentum",
-                "Keep chest up"
-            ],
-            "safety_tips": [
-                "Don't round spine",
-                "Start without weight",
-                "Keep movements controlled"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1581009146145-b5ef050c2e1e?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "leg-raises",
-            "name": "Leg Raises",
-            "category": "Core",
-            "description": "Lower ab exercise for core strength",
-            "target_muscles": ["Lower Abs", "Hip Flexors"],
-            "instructions": [
-                "Lie flat on back with legs extended",
-                "Place hands under glutes for support",
-                "Raise legs up to 90 degrees",
-                "Lower with control without touching ground"
-            ],
-            "tips": [
-                "Keep lower back pressed to ground",
-                "Control the descent",
-                "Don't swing legs"
-            ],
-            "safety_tips": [
-                "Bend knees if too difficult",
-                "Keep core engaged",
-                "Don't arch lower back"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1517836357463-d25dfeac3438?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "cable-crunches",
-            "name": "Cable Crunches",
-            "category": "Core",
-            "description": "Weighted ab exercise using cable machine",
-            "target_muscles": ["Abs", "Core"],
-            "instructions": [
-                "Kneel at cable machine with rope attachment",
-                "Hold rope at head level",
-                "Crunch down bringing elbows toward knees",
-                "Return to starting position with control"
-            ],
-            "tips": [
-                "Focus on abs contracting",
-                "Keep hips stationary",
-                "Full range of motion"
-            ],
-            "safety_tips": [
-                "Don't use excessive weight",
-                "Keep movement controlled",
-                "Don't pull with arms"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1534438327276-14e5300c3a48?w=400&h=400&fit=crop"
-        },
-        
-        # ADDITIONAL EXERCISES TO REACH 35+
-        {
-            "exercise_id": "chest-press",
-            "name": "Chest Press",
-            "category": "Chest",
-            "description": "Machine-based chest exercise for controlled pressing motion",
-            "target_muscles": ["Chest", "Triceps", "Shoulders"],
-            "instructions": [
-                "Sit at chest press machine with back against pad",
-                "Grip handles at chest level",
-                "Press handles forward until arms extended",
-                "Return to starting position with control"
-            ],
-            "tips": [
-                "Keep back pressed against pad",
-                "Don't lock elbows completely",
-                "Control both pressing and return phases"
-            ],
-            "safety_tips": [
-                "Adjust seat height properly",
-                "Use appropriate weight",
-                "Keep core engaged"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b?w=400&h=400&fit=crop"
-        },
-        {
-            "exercise_id": "mountain-climbers",
-            "name": "Mountain Climbers",
-            "category": "Core",
-            "description": "Dynamic core and cardio exercise with alternating leg movements",
-            "target_muscles": ["Core", "Shoulders", "Legs"],
-            "instructions": [
-                "Start in plank position with hands under shoulders",
-                "Bring one knee toward chest",
-                "Quickly switch legs in running motion",
-                "Maintain plank position throughout"
-            ],
-            "tips": [
-                "Keep hips level",
-                "Maintain steady rhythm",
-                "Keep core tight throughout"
-            ],
-            "safety_tips": [
-                "Don't let hips sag",
-                "Keep hands firmly planted",
-                "Start slow and build speed"
-            ],
-            "image_url": "https://images.unsplash.com/photo-1598971639058-fab3c3109a00?w=400&h=400&fit=crop"
-        }
-    ]
-    
-    # Insert exercises if they don't exist
-    for exercise in exercises:
-        if not get_supabase_data(supabase.table('exercises').select('*').eq('exercise_id', exercise["exercise_id"]).execute()):
-            supabase.table('exercises').insert(exercise).execute()
-    
-    print(f"Initialized {len(exercises)} exercises in database")
+# Seed the exercise catalog (skipped when the stored catalog hash matches)
+@app.on_event("startup")
+async def startup_seed_exercises():
+    if SEED_EXERCISES_ON_STARTUP:
+        await seed_exercises(repos)
+    # Load the catalog index once per process; it only changes on deploy
+    await exercise_cache.reload(repos.exercises.list_all)
+
+@app.on_event("startup")
+async def startup_stats_buffer():
+    stats_buffer.start(repos.user_stats.increment)
+
+@app.on_event("startup")
+async def startup_chat_writer():
+    chat_writer.start(repos.chat_history.create_many)
 
-# Initialize exercises on startup
-initialize_exercises()
+@app.on_event("startup")
+async def startup_scan_jobs():
+    scan_jobs.start()
+
+@app.on_event("startup")
+async def startup_llm_clients():
+    await llm_clients.start()
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    await scan_jobs.stop()
+    await llm_clients.stop()
+    await stats_buffer.stop()
+    await chat_writer.stop()
+    repos.close()
 
 # Routes
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "service": "FitFlow API"}
 
+@app.get("/api/metrics")
+async def get_metrics(request: Request):
+    """In-process cache and buffer counters for this worker (internal: needs METRICS_TOKEN)."""
+    token = request.headers.get("x-metrics-token", "")
+    if not METRICS_TOKEN or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {
+        "llm_gateway": llm_gateway.stats(),
+        "llm_latency": llm_clients.stats(),
+        "llm_pool": llm_clients.pool_stats(),
+        "coach_prompts": coach_prompts.stats(),
+        "chat_writer": chat_writer.stats(),
+        "scan_cache": scan_cache.stats(),
+        "scan_jobs": scan_jobs.stats(),
+        "stats_buffer": stats_buffer.stats()
+    }
+
 @app.post("/api/auth/register")
 async def register(user_data: UserRegister):
     # Check if user already exists
-    existing_user = get_supabase_data(supabase.table('users').select('*').eq('email', user_data.email).execute())
+    existing_user = await repos.users.get_by_email(user_data.email, USER_EXISTS_COLUMNS)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -1238,7 +476,7 @@ async def register(user_data: UserRegister):
     }
     
     try:
-        supabase.table('users').insert(user).execute()
+        await repos.users.create(user)
     except Exception as e:
         print(f"Database error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create user account")
@@ -1275,7 +513,7 @@ async def register(user_data: UserRegister):
 
 @app.post("/api/auth/login")
 async def login(credentials: UserLogin):
-    user = get_supabase_data(supabase.table('users').select('*').eq('email', credentials.email).execute())
+    user = await repos.users.get_by_email(credentials.email, USER_LOGIN_COLUMNS)
     
     if not user or not verify_password(credentials.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
@@ -1382,7 +620,7 @@ async def verify_email(token: str):
         )
     
     # Find user by email
-    user = get_supabase_data(supabase.table('users').select('*').eq('email', email).execute())
+    user = await repos.users.get_by_email(email, USER_VERIFICATION_COLUMNS)
     
     if not user:
         return HTMLResponse(
@@ -1498,10 +736,10 @@ async def verify_email(token: str):
     
     # Update user as verified
     try:
-        supabase.table('users').update({
+        await repos.users.update(user['user_id'], {
             "email_verified": True,
             "verification_token": None  # Clear the token after use
-        }).eq('user_id', user['user_id']).execute()
+        })
         
         # Return success HTML page
         return HTMLResponse(
@@ -1621,7 +859,7 @@ async def resend_verification(email: EmailStr, background_tasks: BackgroundTasks
     Resend verification email for users who didn't receive it.
     """
     # Find user by email
-    user = get_supabase_data(supabase.table('users').select('*').eq('email', email).execute())
+    user = await repos.users.get_by_email(email, USER_VERIFICATION_COLUMNS)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1635,10 +873,10 @@ async def resend_verification(email: EmailStr, background_tasks: BackgroundTasks
     
     # Update user with new token
     try:
-        supabase.table('users').update({
+        await repos.users.update(user['user_id'], {
             "verification_token": new_token,
             "token_created_at": datetime.utcnow().isoformat()
-        }).eq('user_id', user['user_id']).execute()
+        })
     except Exception as e:
         print(f"Error updating verification token: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate new verification link")
@@ -1663,6 +901,9 @@ async def resend_verification(email: EmailStr, background_tasks: BackgroundTasks
 
 @app.get("/api/user/profile")
 async def get_profile(current_user: dict = Depends(get_current_user)):
+    # The profile picture is only loaded here, never on the shared auth path
+    picture = await repos.users.get(current_user["user_id"], USER_PICTURE_COLUMNS)
+    
     daily_calories = None
     if all([current_user.get('weight'), current_user.get('height'), current_user.get('age'), current_user.get('gender')]):
         daily_calories = calculate_daily_calories(
@@ -1682,7 +923,7 @@ async def get_profile(current_user: dict = Depends(get_current_user)):
         "activity_level": current_user.get("activity_level"),
         "goal_weight": current_user.get("goal_weight"),
         "daily_calories": daily_calories,
-        "profile_picture": current_user.get("profile_picture"),
+        "profile_picture": picture.get("profile_picture") if picture else None,
         "weight_unit": current_user.get("weight_unit", "kg")
     }
 
@@ -1691,7 +932,9 @@ async def update_profile(profile_data: UserProfile, current_user: dict = Depends
     update_data = {k: v for k, v in profile_data.dict().items() if v is not None}
     
     if update_data:
-        supabase.table('users').update(update_data).eq('user_id', current_user["user_id"]).execute()
+        await repos.users.update(current_user["user_id"], update_data)
+        user_cache.invalidate(current_user["user_id"])
+        coach_prompts.invalidate(current_user["user_id"])
     
     return {"message": "Profile updated successfully"}
 
@@ -1703,7 +946,7 @@ class ChangePasswordRequest(BaseModel):
 async def change_password(password_data: ChangePasswordRequest, current_user: dict = Depends(get_current_user)):
     """Change user password"""
     # Verify current password
-    user = get_supabase_data(supabase.table('users').select('*').eq('user_id', current_user["user_id"]).execute())
+    user = await repos.users.get(current_user["user_id"], USER_PASSWORD_COLUMNS)
     if not user or not bcrypt.checkpw(password_data.current_password.encode('utf-8'), user['password'].encode('utf-8')):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
@@ -1711,7 +954,8 @@ async def change_password(password_data: ChangePasswordRequest, current_user: di
     hashed_password = bcrypt.hashpw(password_data.new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     
     # Update password
-    supabase.table('users').update({"password": hashed_password}).eq('user_id', current_user["user_id"]).execute()
+    await repos.users.update(current_user["user_id"], {"password": hashed_password})
+    user_cache.invalidate(current_user["user_id"])
     
     return {"message": "Password changed successfully"}
 
@@ -1719,89 +963,213 @@ async def change_password(password_data: ChangePasswordRequest, current_user: di
 async def delete_account(current_user: dict = Depends(get_current_user)):
     """Delete user account and all associated data"""
     user_id = current_user["user_id"]
+    stats_buffer.discard(user_id)
+    chat_writer.discard(user_id)
     
-    # Delete user data from all collections
-    supabase.table('users').delete().eq('user_id', user_id).execute()
-    supabase.table('food_scans').delete().eq('user_id', user_id).execute()
-    supabase.table('user_stats').delete().eq('user_id', user_id).execute()
-    supabase.table('goals').delete().eq('user_id', user_id).execute()
-    supabase.table('measurements').delete().eq('user_id', user_id).execute()
-    supabase.table('chat_history').delete().eq('user_id', user_id).execute()
+    # Delete user data from all collections (independent tables, so in parallel)
+    await asyncio.gather(*[
+        repo.delete_for_user(user_id)
+        for repo in (repos.food_scans, repos.user_stats, repos.goals, repos.measurements, repos.chat_history, repos.chat_summaries)
+    ])
+    await repos.users.delete(user_id)
+    user_cache.invalidate(user_id)
+    coach_prompts.invalidate(user_id)
     
     return {"message": "Account deleted successfully"}
 
+async def create_scan_thumbnails(scan_id: str, image_bytes: bytes) -> Optional[dict]:
+    """Background task: store thumbnails for a scan and reference them from its row"""
+    try:
+        thumbnails = await store_thumbnails(blob_store, image_bytes)
+        await repos.food_scans.set_thumbnails(scan_id, thumbnails)
+        return thumbnails
+    except Exception as e:
+        print(f"Error creating thumbnails for scan {scan_id}: {str(e)}")
+        return None
+
+def thumbnail_urls(thumbnails: Optional[dict]) -> Optional[dict]:
+    if not thumbnails:
+        return None
+    return {size: {fmt: blob_store.url(key) for fmt, key in formats.items()} for size, formats in thumbnails.items()}
+
+async def read_upload(file: UploadFile, limit: int) -> bytes:
+    """Read an upload (already spooled to a temp file) in chunks, failing with 413 past `limit` bytes."""
+    if file.size is not None and file.size > limit:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    chunks = []
+    total = 0
+    while chunk := await file.read(1024 * 1024):
+        total += len(chunk)
+        if total > limit:
+            raise HTTPException(status_code=413, detail="Image is too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def decode_base64_image(image: str, limit: int) -> bytes:
+    # Remove data URL prefix if present
+    if 'base64,' in image:
+        image = image.split('base64,', 1)[1]
+    if len(image) * 3 // 4 > limit:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    try:
+        return base64.b64decode(image, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Image must be base64 encoded")
+
+async def read_scan_image(file: Optional[UploadFile], image: Optional[str]) -> bytes:
+    if file is not None:
+        return await read_upload(file, MAX_SCAN_UPLOAD_BYTES)
+    if image:
+        return decode_base64_image(image, MAX_SCAN_UPLOAD_BYTES)
+    raise HTTPException(status_code=400, detail="Provide an image file or a base64 image")
+
+async def process_food_scan(user_id: str, image_bytes: bytes, bypass_cache: bool = False) -> dict:
+    """Analyze an image, store the scan and count its calories; returns the scan response (thumbnails not included)"""
+    # Rotate, downsize and re-encode on a worker thread before the upload to the model
+    try:
+        model_image, perceptual_hash = await asyncio.to_thread(prepare_for_model, image_bytes)
+    except UnidentifiedImageError:
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+    
+    # Reuse the analysis of a visually matching earlier scan; otherwise ask the model
+    analysis_result = scan_cache.get(perceptual_hash, bypass=bypass_cache)
+    cached = analysis_result is not None
+    if not cached:
+        analysis_result = await analyze_food_with_ai(base64.b64encode(model_image).decode('ascii'), user_id)
+        if not analysis_result.get("fallback"):
+            scan_cache.set(perceptual_hash, analysis_result)
+    
+    # Store the image once by content hash; the row only keeps the key
+    image_hash = await blob_store.put(image_bytes)
+    
+    # Store the scan result
+    scan_id = str(uuid.uuid4())
+    scan_data = {
+        "scan_id": scan_id,
+        "user_id": user_id,
+        "food_name": analysis_result["food_name"],
+        "calories": analysis_result["calories"],
+        "protein": analysis_result["protein"],
+        "carbs": analysis_result["carbs"],
+        "fat": analysis_result["fat"],
+        "portion_size": analysis_result["portion_size"],
+        "image_hash": image_hash,
+        "scanned_at": datetime.utcnow().isoformat()
+    }
+    
+    await repos.food_scans.create(scan_data)
+    
+    # AUTO-TRACK: Update daily calories consumed
+    today = datetime.utcnow().date().isoformat()
+    await repos.user_stats.increment(user_id, today, {"calories_consumed": analysis_result["calories"]})
+    
+    return {
+        "scan_id": scan_id,
+        "food_name": analysis_result["food_name"],
+        "calories": analysis_result["calories"],
+        "protein": analysis_result["protein"],
+        "carbs": analysis_result["carbs"],
+        "fat": analysis_result["fat"],
+        "portion_size": analysis_result["portion_size"],
+        "image_url": blob_store.url(image_hash),
+        "cached": cached,
+        "auto_tracked": True  # Flag to show toast notification
+    }
+
 @app.post("/api/food/scan")
-async def scan_food(image: str = Form(...), current_user: dict = Depends(get_current_user)):
+async def scan_food(
+    background_tasks: BackgroundTasks,
+    file: Optional[UploadFile] = File(None),
+    image: Optional[str] = Form(None),
+    bypass_cache: bool = Form(False),
+    current_user: dict = Depends(get_current_user)
+):
     """
     Scan food image and analyze nutritional content
-    Expected format: base64 encoded image string
+    Expected format: multipart `file` with the raw image bytes, or (older
+    clients) an `image` field holding a base64 string / data URL
+    bypass_cache=true always asks the model (the fresh result still refreshes the cache)
     """
     try:
-        # Remove data URL prefix if present
-        if 'base64,' in image:
-            image_base64 = image.split('base64,')[1]
-        else:
-            image_base64 = image
-        
-        # Analyze food with AI
-        analysis_result = await analyze_food_with_ai(image_base64)
-        
-        # Store the scan result
-        scan_id = str(uuid.uuid4())
-        scan_data = {
-            "scan_id": scan_id,
-            "user_id": current_user["user_id"],
-            "food_name": analysis_result["food_name"],
-            "calories": analysis_result["calories"],
-            "protein": analysis_result["protein"],
-            "carbs": analysis_result["carbs"],
-            "fat": analysis_result["fat"],
-            "portion_size": analysis_result["portion_size"],
-            "image_base64": image_base64,
-            "scanned_at": datetime.utcnow().isoformat()
-        }
-        
-        supabase.table('food_scans').insert(scan_data).execute()
-        
-        # AUTO-TRACK: Update daily calories consumed
-        today = datetime.utcnow().date().isoformat()
-        stats = get_supabase_data(supabase.table('user_stats').select('*').eq('user_id', current_user["user_id"]).eq('date', today).execute())
-        
-        if stats:
-            # Increment calories_consumed
-            new_calories = stats.get("calories_consumed", 0) + analysis_result["calories"]
-            supabase.table('user_stats').update({"calories_consumed": new_calories, "updated_at": datetime.utcnow().isoformat()}).eq('user_id', current_user["user_id"]).eq('date', today).execute()
-        else:
-            # Create new stats entry
-            supabase.table('user_stats').insert({
-                "user_id": current_user["user_id"],
-                "date": today,
-                "steps": 0,
-                "calories_burned": 0,
-                "calories_consumed": analysis_result["calories"],
-                "active_minutes": 0,
-                "water_intake": 0,
-                "sleep_hours": 0,
-                "updated_at": datetime.utcnow().execute().isoformat()
-            })
-        
-        return {
-            "scan_id": scan_id,
-            "food_name": analysis_result["food_name"],
-            "calories": analysis_result["calories"],
-            "protein": analysis_result["protein"],
-            "carbs": analysis_result["carbs"],
-            "fat": analysis_result["fat"],
-            "portion_size": analysis_result["portion_size"],
-            "auto_tracked": True  # Flag to show toast notification
-        }
+        image_bytes = await read_scan_image(file, image)
+        result = await process_food_scan(current_user["user_id"], image_bytes, bypass_cache)
+        # Thumbnails are encoded after the response is sent
+        background_tasks.add_task(create_scan_thumbnails, result["scan_id"], image_bytes)
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in scan_food: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/food/scan/jobs", status_code=202)
+async def create_scan_job(
+    file: Optional[UploadFile] = File(None),
+    image: Optional[str] = Form(None),
+    bypass_cache: bool = Form(False),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Asynchronous scan: returns a job id right away. Poll GET /api/food/scan/jobs/{job_id}
+    or wait on /events. Resubmitting the same image returns the same job.
+    """
+    user_id = current_user["user_id"]
+    image_bytes = await read_scan_image(file, image)
+
+    async def run():
+        result = await process_food_scan(user_id, image_bytes, bypass_cache)
+        # A job is read after it finishes, so its result can include the thumbnails
+        thumbnails = await create_scan_thumbnails(result["scan_id"], image_bytes)
+        return {**result, "thumbnails": thumbnail_urls(thumbnails)}
+
+    dedupe_key = f"{await asyncio.to_thread(blob_key, image_bytes)}:{bypass_cache}"
+    try:
+        job, created = scan_jobs.submit(user_id, dedupe_key, run)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=429, detail="Too many scans in progress, try again shortly", headers={"Retry-After": "5"})
+    return JSONResponse(
+        {**job.to_dict(), "created": created},
+        status_code=202,
+        headers={"Location": f"/api/food/scan/jobs/{job.job_id}"}
+    )
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def get_user_scan_job(job_id: str, user_id: str):
+    job = scan_jobs.get(job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return job
+
+@app.get("/api/food/scan/jobs/{job_id}")
+async def get_scan_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    return get_user_scan_job(job_id, current_user["user_id"]).to_dict()
+
+@app.get("/api/food/scan/jobs/{job_id}/events")
+async def scan_job_events(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Server-sent events: the current state now, then a `done` event when the job finishes"""
+    job = get_user_scan_job(job_id, current_user["user_id"])
+
+    async def events():
+        yield sse_event("status", job.to_dict())
+        while not job.finished:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line; keeps proxies and mobile networks from dropping an idle stream
+                yield ": keep-alive\n\n"
+        yield sse_event("done", job.to_dict())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/food/history")
-async def get_food_history(limit: int = 20, current_user: dict = Depends(get_current_user)):
-    scans = get_supabase_list(supabase.table('food_scans').select('*').eq('user_id', current_user["user_id"]).order('scanned_at', desc=True).limit(limit).execute())
+async def get_food_history(limit: int = 20, cursor: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    scans, next_cursor = await repos.food_scans.list_page(current_user["user_id"], clamp_limit(limit), parse_cursor(cursor))
     
     # Format the response
     history = []
@@ -1814,17 +1182,35 @@ async def get_food_history(limit: int = 20, current_user: dict = Depends(get_cur
             "carbs": scan["carbs"],
             "fat": scan["fat"],
             "portion_size": scan["portion_size"],
-            "image_base64": scan["image_base64"],
+            "image_url": blob_store.url(scan["image_hash"]) if scan.get("image_hash") else None,
+            "thumbnails": thumbnail_urls(scan.get("thumbnails")),
             "scanned_at": scan["scanned_at"]
         })
     
-    return {"history": history}
+    return {"history": history, "next_cursor": next_cursor}
+
+@app.get("/api/blobs/{key}")
+async def get_blob(key: str, expires: int = 0, sig: str = ""):
+    """Serve a stored image through a signed URL from blob_store.url(); never log these URLs."""
+    if not is_blob_key(key) or not blob_store.verify(key, expires, sig):
+        raise HTTPException(status_code=404, detail="Not found")
+    blob = await blob_store.get(key)
+    if not blob:
+        raise HTTPException(status_code=404, detail="Not found")
+    data, content_type = blob
+    # Content never changes, but the URL only grants access until it expires
+    max_age = max(0, expires - int(time.time()))
+    return Response(
+        content=data,
+        media_type=content_type,
+        headers={"Cache-Control": f"private, max-age={max_age}, immutable", "ETag": f'"{key}"'}
+    )
 
 @app.get("/api/food/today")
 async def get_today_food(current_user: dict = Depends(get_current_user)):
     today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     
-    scans = get_supabase_list(supabase.table('food_scans').select('*').eq('user_id', current_user["user_id"]).gte('scanned_at', today_start.isoformat()).order('scanned_at', desc=True).execute())
+    scans = await repos.food_scans.list_since(current_user["user_id"], today_start.isoformat())
     
     total_calories = sum(scan["calories"] for scan in scans)
     total_protein = sum(scan["protein"] for scan in scans)
@@ -1844,9 +1230,9 @@ async def delete_food_scan(scan_id: str, current_user: dict = Depends(get_curren
     """
     Delete a food scan by scan_id
     """
-    result = supabase.table('food_scans').delete().eq('scan_id', scan_id).eq('user_id', current_user["user_id"]).execute()
+    deleted = await repos.food_scans.delete(current_user["user_id"], scan_id)
     
-    if not result.data:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Food scan not found")
     
     return {"message": "Food scan deleted successfully"}
@@ -1855,6 +1241,9 @@ async def delete_food_scan(scan_id: str, current_user: dict = Depends(get_curren
 async def update_daily_stats(stats: DailyStats, current_user: dict = Depends(get_current_user)):
     today = datetime.utcnow().date().isoformat()
     
+    # Absolute values replace whatever was incremented before them
+    await stats_buffer.flush(current_user["user_id"], today)
+    
     stats_data = {
         "user_id": current_user["user_id"],
         "date": today,
@@ -1867,7 +1256,7 @@ async def update_daily_stats(stats: DailyStats, current_user: dict = Depends(get
         "updated_at": datetime.utcnow().isoformat()
     }
     
-    supabase.table('user_stats').upsert({'user_id': current_user["user_id"], 'date': today, **stats_data}).execute()
+    await repos.user_stats.upsert(stats_data)
     
     return {"message": "Daily stats updated successfully"}
 
@@ -1875,25 +1264,19 @@ async def update_daily_stats(stats: DailyStats, current_user: dict = Depends(get
 async def get_daily_stats(current_user: dict = Depends(get_current_user)):
     today = datetime.utcnow().date().isoformat()
     
-    stats = get_supabase_data(supabase.table('user_stats').select('*').eq('user_id', current_user["user_id"]).eq('date', today).execute())
-    
-    if not stats:
-        return {
-            "steps": 0,
-            "calories_burned": 0,
-            "calories_consumed": 0,
-            "active_minutes": 0,
-            "water_intake": 0,
-            "sleep_hours": 0
-        }
+    # Stored row plus increments still waiting in the write-behind buffer
+    stats, pending = await stats_buffer.read(
+        current_user["user_id"], today, lambda: repos.user_stats.get_for_date(current_user["user_id"], today)
+    )
+    stats = stats or {}
     
     return {
-        "steps": stats.get("steps", 0),
-        "calories_burned": stats.get("calories_burned", 0),
-        "calories_consumed": stats.get("calories_consumed", 0),
-        "active_minutes": stats.get("active_minutes", 0),
-        "water_intake": stats.get("water_intake", 0),
-        "sleep_hours": stats.get("sleep_hours", 0)
+        "steps": (stats.get("steps") or 0) + pending.get("steps", 0),
+        "calories_burned": stats.get("calories_burned") or 0,
+        "calories_consumed": stats.get("calories_consumed") or 0,
+        "active_minutes": stats.get("active_minutes") or 0,
+        "water_intake": (stats.get("water_intake") or 0) + pending.get("water_intake", 0),
+        "sleep_hours": stats.get("sleep_hours") or 0
     }
 
 
@@ -1911,41 +1294,25 @@ async def increment_daily_stats(
     if field not in allowed_fields:
         raise HTTPException(status_code=400, detail=f"Field must be one of: {allowed_fields}")
     
-    # Get or create today's stats
-    stats = get_supabase_data(supabase.table('user_stats').select('*').eq('user_id', current_user["user_id"]).eq('date', today).execute())
+    # Buffered and merged with other deltas; written to user_stats by the next flush
+    stats_buffer.add(current_user["user_id"], today, field, amount)
     
-    if not stats:
-        # Create new stats entry
-        stats_data = {
-            "user_id": current_user["user_id"],
-            "date": today,
-            "steps": 0,
-            "calories_burned": 0,
-            "calories_consumed": 0,
-            "active_minutes": 0,
-            "water_intake": 0,
-            "sleep_hours": 0,
-            "updated_at": datetime.utcnow().isoformat()
-        }
-        stats_data[field] = amount
-        supabase.table('user_stats').insert(stats_data).execute()
-        new_value = amount
-    else:
-        # Increment existing value
-        current_value = stats.get(field, 0)
-        new_value = current_value + amount
-        supabase.table('user_stats').update({field: new_value, "updated_at": datetime.utcnow().isoformat()}).eq('user_id', current_user["user_id"]).eq('date', today).execute()
+    # Stored value plus everything still buffered, as before buffering
+    stored, pending = await stats_buffer.read(
+        current_user["user_id"], today, lambda: repos.user_stats.get_for_date(current_user["user_id"], today, field)
+    )
     
     return {
         "message": f"{field} updated successfully",
         "field": field,
-        "new_value": new_value
+        "new_value": ((stored or {}).get(field) or 0) + pending.get(field, 0),
+        "pending": pending.get(field, 0)
     }
 
 @app.get("/api/stats/streak")
 async def get_streak(current_user: dict = Depends(get_current_user)):
     # Get user's activity history
-    stats = get_supabase_list(supabase.table('user_stats').select('*').eq('user_id', current_user["user_id"]).order('date', desc=True).execute())
+    stats = await repos.user_stats.list_dates(current_user["user_id"])
     
     if not stats:
         return {"streak_days": 0}
@@ -1978,18 +1345,18 @@ async def create_goal(goal: Goal, current_user: dict = Depends(get_current_user)
         "unit": goal.unit,
         "created_at": datetime.utcnow().isoformat()
     }
-    supabase.table('goals').insert(goal_data).execute()
+    await repos.goals.create(goal_data)
     return {"message": "Goal created successfully", "goal_id": goal_id}
 
 @app.get("/api/goals")
 async def get_goals(current_user: dict = Depends(get_current_user)):
-    goals = get_supabase_list(supabase.table('goals').select('*').eq('user_id', current_user['user_id']).execute())
+    goals = await repos.goals.list_for_user(current_user['user_id'])
     return {"goals": goals}
 
 @app.put("/api/goals/{goal_id}")
 async def update_goal(goal_id: str, goal: Goal, current_user: dict = Depends(get_current_user)):
-    result = supabase.table('goals').update({'current_progress': goal.current_progress}).eq('goal_id', goal_id).eq('user_id', current_user['user_id']).execute()
-    if not result.data:
+    updated = await repos.goals.update_progress(current_user['user_id'], goal_id, goal.current_progress)
+    if not updated:
         raise HTTPException(status_code=404, detail="Goal not found")
     return {"message": "Goal updated successfully"}
 
@@ -2003,108 +1370,198 @@ async def add_measurement(measurement: Measurement, current_user: dict = Depends
         "weight": measurement.weight,
         "body_fat": measurement.body_fat,
         "bmi": measurement.bmi,
-        "date": datetime.utcnow().isoformat()
+        "recorded_at": datetime.utcnow().isoformat()
     }
-    supabase.table('measurements').insert(measurement_data).execute()
+    await repos.measurements.create(measurement_data)
     return {"message": "Measurement added successfully", "measurement_id": measurement_id}
 
 @app.get("/api/measurements/latest")
 async def get_latest_measurement(current_user: dict = Depends(get_current_user)):
-    measurement_list = get_supabase_list(supabase.table('measurements').select('*').eq('user_id', current_user['user_id']).order('recorded_at', desc=True).limit(1).execute())
-    measurement = measurement_list[0] if measurement_list else None
+    measurement = await repos.measurements.latest(current_user['user_id'])
     if not measurement:
         return {"measurement": None}
     return {"measurement": measurement}
 
 @app.get("/api/measurements/history")
-async def get_measurements_history(limit: int = 30, current_user: dict = Depends(get_current_user)):
-    measurements = get_supabase_list(supabase.table('measurements').select('*').eq('user_id', current_user['user_id']).order('measured_at', desc=True).execute())
-    return {"measurements": measurements}
+async def get_measurements_history(limit: int = 30, cursor: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    measurements, next_cursor = await repos.measurements.list_page(
+        current_user['user_id'], clamp_limit(limit), parse_cursor(cursor)
+    )
+    return {"measurements": measurements, "next_cursor": next_cursor}
 
 # AI Fitness Coach Chatbot
+async def load_chat_context(user_id: str, system_content: str, message: str):
+    try:
+        return await chat_context.load(repos, user_id, system_content, message)
+    except ContextTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def summarize_chat_history(user_id: str):
+    """Background task: fold older chat turns into the user's rolling summary"""
+    async def summarize(previous_summary, turns):
+        llm_chat = llm_clients.chat(session_id=f"chat_summary_{uuid.uuid4()}", system_message=SUMMARY_SYSTEM_MESSAGE)
+        summary = await send_llm_message(llm_chat, UserMessage(text=render_summary_request(previous_summary, turns)), user_id, PRIORITY_SUMMARY)
+        return summary.strip()
+    
+    try:
+        await chat_context.maybe_summarize(repos, user_id, summarize)
+    except Exception as e:
+        print(f"Error summarizing chat for {user_id}: {str(e)}")
+
 @app.post("/api/chat/fitness")
-async def chat_with_fitness_coach(chat: ChatMessage, current_user: dict = Depends(get_current_user)):
+async def chat_with_fitness_coach(chat: ChatMessage, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
     """Chat with AI Fitness Coach using OpenAI with multilingual support"""
     try:
-        # Get user profile for context
         user = current_user
-        user_name = user.get('name', 'Unknown')
-        user_age = user.get('age', 'N/A')
-        user_gender = user.get('gender', 'N/A')
-        user_weight = user.get('weight', 'N/A')
-        user_height = user.get('height', 'N/A')
-        user_goal_weight = user.get('goal_weight', 'N/A')
-        user_activity = user.get('activity_level', 'N/A')
-        
-        # Build system message
-        system_content = "You are FitFlow's AI Fitness Coach. You provide personalized fitness advice, workout recommendations, nutrition guidance, and motivation.\n\n"
-        system_content += "User Profile:\n"
-        system_content += f"- Name: {user_name}\n"
-        system_content += f"- Age: {user_age} years\n"
-        system_content += f"- Gender: {user_gender}\n"
-        system_content += f"- Weight: {user_weight} kg\n"
-        system_content += f"- Height: {user_height} cm\n"
-        system_content += f"- Goal Weight: {user_goal_weight} kg\n"
-        system_content += f"- Activity Level: {user_activity}\n\n"
-        system_content += "Guidelines:\n"
-        system_content += "- Provide actionable, science-based fitness advice\n"
-        system_content += "- Be encouraging and motivational\n"
-        system_content += "- Keep responses concise and easy to understand\n"
-        system_content += "- Tailor advice to the user's profile and goals\n"
-        system_content += "- Suggest specific exercises, meal ideas, or habits when appropriate\n"
-        system_content += "- If asked about medical concerns, recommend consulting a healthcare professional"
-        
-        # Add language instruction if needed
-        if chat.language and chat.language.lower() != "english":
-            lang_upper = chat.language.upper()
-            system_content += f"\n\nIMPORTANT: Respond in {lang_upper} language. Translate all your responses to {chat.language}."
-        
-        # Use session_id based on user_id for persistent chat history
-        session_id = f"fitness_coach_{user['user_id']}"
+        system_content = coach_prompts.get(user, chat.language)
         
-        # Create chat instance with Emergent LLM Key
-        llm_chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=session_id,
-            system_message=system_content
-        ).with_model("openai", "gpt-4o")
+        # Recent turns plus the rolling summary, within the token budget
+        context = await load_chat_context(user["user_id"], system_content, chat.message)
+        
+        # One conversation per call: the context above is the only history sent
+        llm_chat = llm_clients.chat(
+            session_id=f"fitness_coach_{user['user_id']}_{uuid.uuid4()}",
+            system_message=context.system_message(system_content)
+        )
         
         # Create user message
         user_msg = UserMessage(text=chat.message)
         
         # Send message and get response
-        assistant_message = await llm_chat.send_message(user_msg)
+        assistant_message = await send_llm_message(llm_chat, user_msg, user["user_id"], PRIORITY_CHAT)
         
-        # Save chat to history
-        supabase.table('chat_history').insert({
-            "chat_id": str(uuid.uuid4().execute()),
+        # Save chat to history (written in the background, in batches)
+        chat_writer.add({
             "user_id": user["user_id"],
             "user_message": chat.message,
             "assistant_message": assistant_message,
+            "language": chat.language or "english",
             "timestamp": datetime.utcnow().isoformat()
         })
+        background_tasks.add_task(summarize_chat_history, user["user_id"])
         
         return {
             "message": assistant_message,
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
+@app.post("/api/chat/fitness/stream")
+async def stream_chat_with_fitness_coach(chat: ChatMessage, current_user: dict = Depends(get_current_user)):
+    """
+    Chat with the AI Fitness Coach, streamed as server-sent events:
+    `token` events ({"text"}) as the reply is generated, then `done`
+    ({"message", "timestamp"}) once the chat is queued for saving, or `error` ({"detail"})
+    """
+    user = current_user
+    system_content = coach_prompts.get(user, chat.language)
+    context = await load_chat_context(user["user_id"], system_content, chat.message)
+    
+    # Take the LLM slot up front so saturation is a plain 429, not a broken stream
+    try:
+        await llm_gateway.acquire(user["user_id"], PRIORITY_CHAT)
+    except LlmGatewaySaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    slot = {"held": True}
+    
+    def release_slot():
+        if slot["held"]:
+            slot["held"] = False
+            llm_gateway.release()
+    
+    async def events():
+        parts = []
+        started = time.perf_counter()
+        first_token = None
+        ok = False
+        saved = {}
+        try:
+            try:
+                streamed = False
+                if llm_clients.can_stream():
+                    try:
+                        async for text in llm_clients.stream(context.messages(system_content, chat.message)):
+                            if first_token is None:
+                                first_token = time.perf_counter() - started
+                            parts.append(text)
+                            yield sse_event("token", {"text": text})
+                        streamed = True
+                    except Exception as e:
+                        if parts:
+                            raise
+                        print(f"Chat streaming failed, sending full reply: {e}")
+                if not streamed:
+                    # No streaming credentials configured (or the stream failed before any text): send the whole reply as one piece
+                    llm_chat = llm_clients.chat(
+                        session_id=f"fitness_coach_{user['user_id']}_{uuid.uuid4()}",
+                        system_message=context.system_message(system_content)
+                    )
+                    text = await llm_chat.send_message(UserMessage(text=chat.message))
+                    first_token = time.perf_counter() - started
+                    parts.append(text)
+                    yield sse_event("token", {"text": text})
+                ok = True
+            except Exception as e:
+                yield sse_event("error", {"detail": f"Chat error: {str(e)}"})
+        finally:
+            # Runs on success, on errors and when the client disconnects mid-reply
+            release_slot()
+            llm_clients.record("chat", time.perf_counter() - started, ok=ok, first_token=first_token)
+            if parts or ok:
+                # Save the reply, or as much of it as was generated
+                saved = chat_writer.add({
+                    "user_id": user["user_id"],
+                    "user_message": chat.message,
+                    "assistant_message": "".join(parts),
+                    "language": chat.language or "english",
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+        
+        if ok:
+            yield sse_event("done", {"message": saved["assistant_message"], "timestamp": saved["timestamp"]})
+    
+    # Run even if the client disconnects before the stream starts
+    after_stream = BackgroundTasks()
+    after_stream.add_task(release_slot)
+    after_stream.add_task(summarize_chat_history, user["user_id"])
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=after_stream
+    )
+
 @app.get("/api/chat/history")
-async def get_chat_history(limit: int = 20, current_user: dict = Depends(get_current_user)):
-    """Get chat history"""
-    chats = get_supabase_list(supabase.table('chat_history').select('*').eq('user_id', current_user['user_id']).order('created_at', desc=False).execute())
-    return {"chats": list(reversed(chats))}
+async def get_chat_history(limit: int = 20, cursor: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Get chat history: the latest `limit` messages newest first; `next_cursor` pages further back"""
+    limit = clamp_limit(limit)
+    before = parse_cursor(cursor)
+    chats, next_cursor = await repos.chat_history.list_page(current_user['user_id'], limit, before)
+    if before is None:
+        # The newest messages may still be queued for writing
+        merged = chat_writer.merge_pending(current_user['user_id'], chats, limit + 1)
+        if len(merged) > limit:
+            chats = merged[:limit]
+            next_cursor = encode_cursor(chats[-1], *repos.chat_history.cursor_columns)
+        else:
+            chats = merged
+    return {"chats": chats, "next_cursor": next_cursor}
 
 # ===== MEAL PLAN ENDPOINTS =====
 
 @app.post("/api/mealplan/generate")
 async def generate_meal_plan(plan_request: MealPlanGenerate, current_user: dict = Depends(get_current_user)):
     """Generate AI-powered meal plan"""
+    # Every two days cost an LLM call: keep requests bounded
+    if not 1 <= plan_request.duration <= MEAL_PLAN_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Meal plan duration must be between 1 and {MEAL_PLAN_MAX_DAYS} days")
     try:
-        user = get_supabase_data(supabase.table('users').select('*').eq('user_id', current_user["user_id"]).execute())
+        user = current_user
         
         # Calculate calorie target if not provided
         calorie_target = plan_request.calorie_target
@@ -2119,79 +1576,22 @@ async def generate_meal_plan(plan_request: MealPlanGenerate, current_user: dict
             else:
                 calorie_target = 2000  # Default fallback
         
-        # Prepare AI prompt
-        prompt = f"""Create a {plan_request.duration}-day meal plan for a person with the following details:
-- Daily calorie target: {calorie_target} kcal
-- Dietary preferences: {plan_request.dietary_preferences or 'None'}
-- Allergies: {plan_request.allergies or 'None'}
-
-For each day, provide meals for these categories:
-1. Breakfast
-2. Morning Snack
-3. Lunch
-4. Afternoon Snack
-5. Dinner
-
-For each meal, include:
-- Meal name
-- Calories (kcal)
-- Protein (g)
-- Carbs (g)
-- Fat (g)
-- Brief description
-- Key ingredients (list)
-
-Return the response in this exact JSON format:
-{{
-  "days": [
-    {{
-      "day_number": 1,
-      "meals": {{
-        "breakfast": {{"name": "...", "calories": 350, "protein": 15, "carbs": 45, "fat": 10, "description": "...", "ingredients": ["..."]}}
-        "morning_snack": {{"name": "...", "calories": 150, "protein": 5, "carbs": 20, "fat": 5, "description": "...", "ingredients": ["..."]}},
-        "lunch": {{"name": "...", "calories": 450, "protein": 25, "carbs": 50, "fat": 15, "description": "...", "ingredients": ["..."]}},
-        "afternoon_snack": {{"name": "...", "calories": 150, "protein": 5, "carbs": 20, "fat": 5, "description": "...", "ingredients": ["..."]}},
-        "dinner": {{"name": "...", "calories": 400, "protein": 30, "carbs": 40, "fat": 12, "description": "...", "ingredients": ["..."]}}
-      }}
-    }}
-  ]
-}}
-
-Make sure the total daily calories are close to {calorie_target} kcal. Return ONLY the JSON, no additional text."""
-        
-        # Call AI using Emergent LLM
-        llm_chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"meal_plan_{uuid.uuid4()}",
-            system_message="You are a nutrition expert AI that creates detailed meal plans based on user requirements."
-        ).with_model("openai", "gpt-4o")
-        
-        user_msg = UserMessage(text=prompt)
-        assistant_message = await llm_chat.send_message(user_msg)
-        
-        # Parse AI response
+        # One call per chunk of days, run concurrently
+        async def send_chunk(prompt: str) -> str:
+            llm_chat = llm_clients.chat(
+                session_id=f"meal_plan_{uuid.uuid4()}",
+                system_message=MEAL_PLAN_SYSTEM_MESSAGE
+            )
+            return await send_llm_message(llm_chat, UserMessage(text=prompt), user["user_id"], PRIORITY_MEAL_PLAN)
+
         try:
-            # Try to extract JSON from response
-            response_text = assistant_message.strip()
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            meal_plan_data = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            # Fallback: try to find JSON in the response
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                try:
-                    meal_plan_data = json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    print(f"Failed to parse AI response: {response_text[:500]}")
-                    raise HTTPException(status_code=500, detail=f"Failed to parse AI response as JSON: {str(e)}")
-            else:
-                print(f"No JSON found in AI response: {response_text[:500]}")
-                raise HTTPException(status_code=500, detail="No JSON found in AI response")
+            days = await generate_days(
+                send_chunk, plan_request.duration, calorie_target,
+                plan_request.dietary_preferences, plan_request.allergies
+            )
+        except InvalidMealPlan as e:
+            raise HTTPException(status_code=500, detail=f"Invalid AI meal plan: {str(e)}")
+        meal_plan_data = {"days": days}
         
         # Calculate daily totals for each day
         for day in meal_plan_data["days"]:
@@ -2221,7 +1621,7 @@ Make sure the total daily calories are close to {calorie_target} kcal. Return ON
             "days": meal_plan_data["days"]
         }
         
-        supabase.table('meal_plans').insert(meal_plan).execute()
+        await repos.meal_plans.create(meal_plan)
         
         return {
             "plan_id": plan_id,
@@ -2231,6 +1631,8 @@ Make sure the total daily calories are close to {calorie_target} kcal. Return ON
             "days": meal_plan_data["days"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Meal plan generation error: {str(e)}")
 
@@ -2262,7 +1664,7 @@ async def create_meal_plan(plan: MealPlanCreate, current_user: dict = Depends(ge
             "days": plan.days
         }
         
-        supabase.table('meal_plans').insert(meal_plan).execute()
+        await repos.meal_plans.create(meal_plan)
         
         return {
             "plan_id": plan_id,
@@ -2279,7 +1681,7 @@ async def create_meal_plan(plan: MealPlanCreate, current_user: dict = Depends(ge
 async def get_meal_plans(current_user: dict = Depends(get_current_user)):
     """Get all meal plans for user"""
     try:
-        plans = get_supabase_list(supabase.table('meal_plans').select('*').eq('user_id', current_user['user_id']).order('created_at', desc=True).execute())
+        plans = await repos.meal_plans.list_for_user(current_user['user_id'])
         
         # Return summary info only (without full day details)
         plans_summary = []
@@ -2303,7 +1705,7 @@ async def get_meal_plans(current_user: dict = Depends(get_current_user)):
 async def get_meal_plan(plan_id: str, current_user: dict = Depends(get_current_user)):
     """Get specific meal plan with full details"""
     try:
-        plan = get_supabase_data(supabase.table('meal_plans').select('*').eq('plan_id', plan_id).eq('user_id', current_user['user_id']).execute())
+        plan = await repos.meal_plans.get(current_user['user_id'], plan_id)
         
         if not plan:
             raise HTTPException(status_code=404, detail="Meal plan not found")
@@ -2319,9 +1721,9 @@ async def get_meal_plan(plan_id: str, current_user: dict = Depends(get_current_u
 async def delete_meal_plan(plan_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a meal plan"""
     try:
-        result = supabase.table('meal_plans').delete().eq('plan_id', plan_id).eq('user_id', current_user["user_id"]).execute()
+        deleted = await repos.meal_plans.delete(current_user["user_id"], plan_id)
         
-        if not result.data:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Meal plan not found")
         
         return {"message": "Meal plan deleted successfully"}
@@ -2347,7 +1749,7 @@ async def update_meal(
             raise HTTPException(status_code=400, detail=f"Invalid meal category. Must be one of: {', '.join(valid_categories)}")
         
         # Find the meal plan
-        plan = get_supabase_data(supabase.table('meal_plans').select('*').eq('plan_id', plan_id).eq('user_id', current_user['user_id']).execute())
+        plan = await repos.meal_plans.get(current_user['user_id'], plan_id, MEAL_PLAN_DAYS_COLUMNS)
         
         if not plan:
             raise HTTPException(status_code=404, detail="Meal plan not found")
@@ -2383,7 +1785,7 @@ async def update_meal(
             raise HTTPException(status_code=404, detail=f"Day {day_number} not found in meal plan")
         
         # Update the meal plan in database
-        supabase.table('meal_plans').update({"days": plan["days"]}).eq('plan_id', plan_id).eq('user_id', current_user["user_id"]).execute()
+        await repos.meal_plans.update_days(current_user["user_id"], plan_id, plan["days"])
         
         return {"message": "Meal updated successfully", "day": day}
         
@@ -2396,26 +1798,39 @@ async def update_meal(
 
 @app.get("/api/workouts/exercises")
 async def get_exercises(
+    request: Request,
     category: Optional[str] = None,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    """Get all workout exercises, optionally filtered by category"""
+    """Get all workout exercises, optionally filtered by category (case-insensitive)"""
     try:
-        current_user = decode_jwt_token(credentials.credentials)
-        
-        # Build query
-        query = {}
-        if category and category.lower() != 'all':
-            query["category"] = {"$regex": f"^{category}$", "$options": "i"}
+        decode_jwt_token(credentials.credentials)  # authentication only
         
-        exercises = get_supabase_list(supabase.table('exercises').select('*').execute())
-        return {"exercises": exercises}
+        # Served from the in-process catalog: pre-serialized body + ETag per category
+        index = await exercise_cache.get(repos.exercises.list_all)
+        body, etag = index.list_response(category)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching exercises: {str(e)}")
 
+@app.get("/api/workouts/exercises/search")
+async def search_exercises(
+    q: str,
+    limit: int = 20,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Search exercises by name, category, target muscles and description (prefix matching, ranked)"""
+    decode_jwt_token(credentials.credentials)  # authentication only
+    
+    index = await exercise_cache.get(repos.exercises.list_all)
+    return {"exercises": index.search(q, limit=max(1, min(limit, 50)))}
+
 @app.get("/api/workouts/exercises/{exercise_id}")
 async def get_exercise_detail(
     exercise_id: str,
@@ -2425,13 +1840,13 @@ async def get_exercise_detail(
     try:
         current_user = decode_jwt_token(credentials.credentials)
         
-        exercise = get_supabase_data(supabase.table('exercises').select('*').eq('exercise_id', exercise_id).execute())
+        index = await exercise_cache.get(repos.exercises.list_all)
+        exercise = index.get(exercise_id)
         if not exercise:
             raise HTTPException(status_code=404, detail="Exercise not found")
         
         # Get user's last workout for this exercise (auto-suggestion feature)
-        last_session_list = get_supabase_list(supabase.table('workout_sessions').select('*').eq('user_id', current_user['user_id']).eq('exercise_id', exercise_id).order('created_at', desc=True).limit(1).execute())
-        last_session_raw = last_session_list[0] if last_session_list else None
+        last_session_raw = await repos.workout_sessions.latest_for_exercise(current_user['user_id'], exercise_id)
         
         # Format last_session for auto-suggestion (simplified structure)
         if last_session_raw:
@@ -2448,8 +1863,7 @@ async def get_exercise_detail(
         else:
             last_session = None
         
-        exercise["last_session"] = last_session
-        return exercise
+        return {**exercise, "last_session": last_session}
         
     except HTTPException:
         raise
@@ -2466,12 +1880,14 @@ async def create_workout_session(
         current_user = decode_jwt_token(credentials.credentials)
         
         # Verify exercise exists
-        exercise = get_supabase_data(supabase.table('exercises').select('*').eq('exercise_id', session_data.exercise_id).execute())
+        index = await exercise_cache.get(repos.exercises.list_all)
+        exercise = index.get(session_data.exercise_id)
         if not exercise:
             raise HTTPException(status_code=404, detail="Exercise not found")
         
+        user = await repos.users.get(current_user["user_id"], USER_WEIGHT_UNIT_COLUMNS)
+        
         # Get user's weight unit preference
-        user = get_supabase_data(supabase.table('users').select('*').eq('user_id', current_user["user_id"]).execute())
         weight_unit = user.get("weight_unit", "kg") if user else "kg"
         
         # Calculate total volume (weight * reps * sets)
@@ -2495,30 +1911,13 @@ async def create_workout_session(
             "completed": True
         }
         
-        supabase.table('workout_sessions').insert(session).execute()
+        # Session row and aggregate update in one transaction
+        await repos.exercise_aggregates.record_session(session)
         
         # AUTO-TRACK: Update daily active minutes if duration provided
         if duration_minutes > 0:
             today = datetime.utcnow().date().isoformat()
-            stats = get_supabase_data(supabase.table('user_stats').select('*').eq('user_id', current_user["user_id"]).eq('date', today).execute())
-            
-            if stats:
-                # Increment active_minutes
-                new_active_minutes = stats.get("active_minutes", 0) + duration_minutes
-                supabase.table('user_stats').update({"active_minutes": new_active_minutes, "updated_at": datetime.utcnow().isoformat()}).eq('user_id', current_user["user_id"]).eq('date', today).execute()
-            else:
-                # Create new stats entry
-                supabase.table('user_stats').insert({
-                    "user_id": current_user["user_id"],
-                    "date": today,
-                    "steps": 0,
-                    "calories_burned": 0,
-                    "calories_consumed": 0,
-                    "active_minutes": duration_minutes,
-                    "water_intake": 0,
-                    "sleep_hours": 0,
-                    "updated_at": datetime.utcnow().execute().isoformat()
-                })
+            await repos.user_stats.increment(current_user["user_id"], today, {"active_minutes": duration_minutes})
         
         return {
             "message": "Workout session created successfully",
@@ -2538,22 +1937,18 @@ async def create_workout_session(
 async def get_workout_sessions(
     exercise_id: Optional[str] = None,
     limit: int = 20,
+    cursor: Optional[str] = None,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    """Get user's workout sessions, optionally filtered by exercise"""
+    """Get user's workout sessions (newest first), optionally filtered by exercise"""
     try:
         current_user = decode_jwt_token(credentials.credentials)
         
-        query = {"user_id": current_user["user_id"]}
-        if exercise_id:
-            query["exercise_id"] = exercise_id
-        
-        if 'exercise_id' in query:
-            sessions = get_supabase_list(supabase.table('workout_sessions').select('*').eq('user_id', current_user['user_id']).eq('exercise_id', query['exercise_id']).order('created_at', desc=True).execute())
-        else:
-            sessions = get_supabase_list(supabase.table('workout_sessions').select('*').eq('user_id', current_user['user_id']).order('created_at', desc=True).execute())
+        sessions, next_cursor = await repos.workout_sessions.list_page(
+            current_user["user_id"], clamp_limit(limit), parse_cursor(cursor), exercise_id
+        )
         
-        return {"sessions": sessions, "count": len(sessions)}
+        return {"sessions": sessions, "count": len(sessions), "next_cursor": next_cursor}
         
     except HTTPException:
         raise
@@ -2569,7 +1964,7 @@ async def get_session_detail(
     try:
         current_user = decode_jwt_token(credentials.credentials)
         
-        session = get_supabase_data(supabase.table('workout_sessions').select('*').eq('session_id', session_id).eq('user_id', current_user['user_id']).execute())
+        session = await repos.workout_sessions.get(current_user['user_id'], session_id)
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -2590,11 +1985,16 @@ async def delete_workout_session(
     try:
         current_user = decode_jwt_token(credentials.credentials)
         
-        result = supabase.table('workout_sessions').delete().eq('session_id', session_id).eq('user_id', current_user["user_id"]).execute()
+        session = await repos.workout_sessions.get(current_user["user_id"], session_id, WORKOUT_SESSION_EXERCISE_COLUMNS)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
         
-        if not result.data:
+        deleted = await repos.workout_sessions.delete(current_user["user_id"], session_id)
+        if not deleted:
             raise HTTPException(status_code=404, detail="Session not found")
         
+        await repos.exercise_aggregates.refresh(current_user["user_id"], session["exercise_id"])
+        
         return {"message": "Workout session deleted successfully"}
         
     except HTTPException:
@@ -2614,18 +2014,21 @@ async def update_workout_session(
         current_user = decode_jwt_token(credentials.credentials)
         
         # Verify session exists and belongs to user
-        existing_session = get_supabase_data(supabase.table('workout_sessions').select('*').eq('session_id', session_id).eq('user_id', current_user["user_id"]).execute())
+        existing_session, user = await asyncio.gather(
+            repos.workout_sessions.get(current_user["user_id"], session_id),
+            repos.users.get(current_user["user_id"], USER_WEIGHT_UNIT_COLUMNS)
+        )
+        index = await exercise_cache.get(repos.exercises.list_all)
+        exercise = index.get(session_data.exercise_id)
         
         if not existing_session:
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Verify exercise exists
-        exercise = get_supabase_data(supabase.table('exercises').select('*').eq('exercise_id', session_data.exercise_id).execute())
         if not exercise:
             raise HTTPException(status_code=404, detail="Exercise not found")
         
         # Get user's weight unit preference
-        user = get_supabase_data(supabase.table('users').select('*').eq('user_id', current_user["user_id"]).execute())
         weight_unit = user.get("weight_unit", "kg") if user else "kg"
         
         # Calculate total volume
@@ -2646,10 +2049,16 @@ async def update_workout_session(
             "updated_at": datetime.utcnow().isoformat()
         }
         
-        supabase.table('workout_sessions').update(update_data).eq('session_id', session_id).execute()
+        await repos.workout_sessions.update(current_user["user_id"], session_id, update_data)
+        
+        # Recompute the aggregates the session left and joined
+        await asyncio.gather(*[
+            repos.exercise_aggregates.refresh(current_user["user_id"], exercise_id)
+            for exercise_id in {existing_session["exercise_id"], session_data.exercise_id}
+        ])
         
         # Return updated session
-        session = get_supabase_data(supabase.table('workout_sessions').select('*').eq('session_id', session_id).eq('user_id', current_user['user_id']).execute())
+        updated_session = {**existing_session, **update_data}
         
         return updated_session
         
@@ -2662,16 +2071,19 @@ async def update_workout_session(
 async def get_exercise_history(
     exercise_id: str,
     limit: int = 10,
+    cursor: Optional[str] = None,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    """Get workout history for a specific exercise"""
+    """Get workout history for a specific exercise (newest first)"""
     try:
         current_user = decode_jwt_token(credentials.credentials)
         
-        sessions = get_supabase_list(supabase.table('workout_sessions').select('*').eq('user_id', current_user['user_id']).eq('exercise_id', exercise_id).execute())
+        sessions, next_cursor = await repos.workout_sessions.list_page(
+            current_user['user_id'], clamp_limit(limit), parse_cursor(cursor), exercise_id, WORKOUT_SESSION_HISTORY_COLUMNS
+        )
         
         if not sessions:
-            return {"history": [], "count": 0}
+            return {"history": [], "count": 0, "next_cursor": None}
         
         # Calculate progress data
         history = []
@@ -2689,7 +2101,7 @@ async def get_exercise_history(
                 "weight_unit": session.get("weight_unit", "kg")
             })
         
-        return {"history": history, "count": len(history)}
+        return {"history": history, "count": len(history), "next_cursor": next_cursor}
         
     except HTTPException:
         raise
@@ -2705,10 +2117,10 @@ async def get_exercise_stats(
     try:
         current_user = decode_jwt_token(credentials.credentials)
         
-        # Get all sessions for this exercise
-        sessions = get_supabase_list(supabase.table('workout_sessions').select('*').eq('user_id', current_user['user_id']).eq('exercise_id', exercise_id).execute())
+        # Single-row read: the aggregate is maintained as sessions are created, edited and deleted
+        aggregate = await repos.exercise_aggregates.get(current_user['user_id'], exercise_id)
         
-        if not sessions:
+        if not aggregate or not aggregate.get("total_sessions"):
             return {
                 "personal_best": None,
                 "max_reps": None,
@@ -2718,57 +2130,30 @@ async def get_exercise_stats(
                 "avg_volume_per_session": 0
             }
         
-        # Calculate personal best (highest weight used) and max reps
-        all_weights = []
-        all_reps = []
-        all_sets = []
-        for session in sessions:
-            for set_data in session["sets"]:
-                all_weights.append(set_data["weight"])
-                all_reps.append(set_data["reps"])
-                all_sets.append(set_data)
-        
-        personal_best = max(all_weights) if all_weights else 0
-        max_reps = max(all_reps) if all_reps else 0
-        
-        # Estimate 1RM using Epley formula: weight * (1 + reps/30)
-        # Find the set with highest estimated 1RM
-        estimated_1rm = 0
-        for set_data in all_sets:
-            set_1rm = set_data["weight"] * (1 + set_data["reps"] / 30)
-            if set_1rm > estimated_1rm:
-                estimated_1rm = set_1rm
-        
-        # Calculate total volume across all sessions
-        total_volume = sum(session["total_volume"] for session in sessions)
-        avg_volume = total_volume / len(sessions) if sessions else 0
-        
-        # Get last session data
-        last_session = sessions[0] if sessions else None
+        total_sessions = aggregate["total_sessions"]
+        total_volume = aggregate.get("total_volume") or 0
+        last_session = aggregate.get("last_session")
         
         # Check if there's progress (compare last session to session before)
         progress = None
-        if len(sessions) >= 2:
-            last_volume = sessions[0]["total_volume"]
-            prev_volume = sessions[1]["total_volume"]
-            volume_diff = last_volume - prev_volume
+        if total_sessions >= 2 and last_session and aggregate.get("previous_volume") is not None:
+            prev_volume = aggregate["previous_volume"]
+            volume_diff = last_session.get("total_volume", 0) - prev_volume
             progress = {
                 "volume_change": volume_diff,
                 "percent_change": (volume_diff / prev_volume * 100) if prev_volume > 0 else 0
             }
         
-        weight_unit = sessions[0].get("weight_unit", "kg") if sessions else "kg"
-        
         return {
-            "personal_best": personal_best,
-            "max_reps": max_reps,
-            "estimated_1rm": round(estimated_1rm, 1),
-            "total_sessions": len(sessions),
+            "personal_best": aggregate.get("personal_best") or 0,
+            "max_reps": aggregate.get("max_reps") or 0,
+            "estimated_1rm": round(aggregate.get("estimated_1rm") or 0, 1),
+            "total_sessions": total_sessions,
             "total_volume": round(total_volume, 1),
-            "avg_volume_per_session": round(avg_volume, 1),
+            "avg_volume_per_session": round(total_volume / total_sessions, 1),
             "last_session": last_session,
             "progress": progress,
-            "weight_unit": weight_unit
+            "weight_unit": aggregate.get("weight_unit") or "kg"
         }
         
     except HTTPException:
@@ -2784,10 +2169,15 @@ async def get_workout_dashboard_stats(
     try:
         current_user = decode_jwt_token(credentials.credentials)
         
-        # Get all user's workout sessions
-        all_sessions = get_supabase_list(supabase.table('workout_sessions').select('*').eq('user_id', current_user['user_id']).execute())
+        # One aggregate query; cost does not grow with the number of sessions
+        now = datetime.utcnow()
+        stats = await repos.workout_sessions.dashboard_stats(
+            current_user['user_id'],
+            (now - timedelta(days=7)).isoformat(),
+            (now - timedelta(days=30)).isoformat()
+        )
         
-        if not all_sessions:
+        if not stats or not stats.get("total_workouts"):
             return {
                 "total_workouts": 0,
                 "total_volume_lifted": 0,
@@ -2797,60 +2187,29 @@ async def get_workout_dashboard_stats(
                 "recent_workout": None
             }
         
-        # Calculate total volume
-        total_volume = sum(session["total_volume"] for session in all_sessions)
-        
-        # Get workouts this week
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        workouts_this_week = sum(
-            1 for session in all_sessions
-            if datetime.fromisoformat(session["created_at"]) >= week_ago
-        )
-        
-        # Get workouts this month
-        month_ago = datetime.utcnow() - timedelta(days=30)
-        workouts_this_month = sum(
-            1 for session in all_sessions
-            if datetime.fromisoformat(session["created_at"]) >= month_ago
-        )
-        
-        # Find favorite exercise (most frequent)
-        exercise_counts = {}
-        for session in all_sessions:
-            exercise_id = session["exercise_id"]
-            exercise_name = session["exercise_name"]
-            if exercise_id not in exercise_counts:
-                exercise_counts[exercise_id] = {"name": exercise_name, "count": 0}
-            exercise_counts[exercise_id]["count"] += 1
-        
         favorite_exercise = None
-        if exercise_counts:
-            fav_id = max(exercise_counts, key=lambda k: exercise_counts[k]["count"])
+        if stats.get("favorite_exercise_id"):
             favorite_exercise = {
-                "exercise_id": fav_id,
-                "name": exercise_counts[fav_id]["name"],
-                "count": exercise_counts[fav_id]["count"]
+                "exercise_id": stats["favorite_exercise_id"],
+                "name": stats["favorite_exercise_name"],
+                "count": stats["favorite_exercise_count"]
             }
         
-        # Find most recent workout
         recent_workout = None
-        if all_sessions:
-            # Sort by created_at to get the most recent
-            sorted_sessions = sorted(all_sessions, key=lambda x: x["created_at"], reverse=True)
-            most_recent = sorted_sessions[0]
+        if stats.get("recent_exercise_id"):
             recent_workout = {
-                "exercise_id": most_recent["exercise_id"],
-                "name": most_recent["exercise_name"],
-                "created_at": most_recent["created_at"]
+                "exercise_id": stats["recent_exercise_id"],
+                "name": stats["recent_exercise_name"],
+                "created_at": stats["recent_created_at"]
             }
         
-        weight_unit = all_sessions[0].get("weight_unit", "kg") if all_sessions else "kg"
+        weight_unit = stats.get("weight_unit") or "kg"
         
         return {
-            "total_workouts": len(all_sessions),
-            "total_volume_lifted": round(total_volume, 1),
-            "workouts_this_week": workouts_this_week,
-            "workouts_this_month": workouts_this_month,
+            "total_workouts": stats["total_workouts"],
+            "total_volume_lifted": round(stats["total_volume_lifted"] or 0, 1),
+            "workouts_this_week": stats["workouts_this_week"],
+            "workouts_this_month": stats["workouts_this_month"],
             "favorite_exercise": favorite_exercise,
             "recent_workout": recent_workout,
             "weight_unit": weight_unit
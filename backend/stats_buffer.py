@@ -0,0 +1,140 @@
+"""
+Write-behind buffer for daily stats increments.
+
+Clients send a PATCH for every small step or water delta. Instead of one
+`user_stats` write per request, deltas are merged in memory per
+(user_id, date) and written in one atomic increment per key every
+STATS_FLUSH_INTERVAL_SECONDS, or as soon as STATS_BUFFER_MAX_KEYS keys are
+waiting. Up to STATS_FLUSH_CONCURRENCY keys are written at a time. The buffer
+is flushed on shutdown.
+
+Reads go through `read()`, which adds the pending deltas on top of the
+stored row so a user always sees their own increments. It never reads while
+the key is being flushed, and it re-reads if a flush of that key started
+meanwhile. A flush that has committed but not returned yet is then not
+counted twice. The buffer is per process: other workers see the deltas once they are flushed.
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+Key = Tuple[str, str]  # (user_id, date)
+FlushFn = Callable[[str, str, dict], Awaitable[dict]]
+
+
+class StatsBuffer:
+    def __init__(self, flush_interval: float = None, max_keys: int = None, flush_concurrency: int = None):
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv('STATS_FLUSH_INTERVAL_SECONDS', '2'))
+        self.max_keys = max_keys if max_keys is not None else int(os.getenv('STATS_BUFFER_MAX_KEYS', '1000'))
+        self.flush_concurrency = flush_concurrency if flush_concurrency is not None else int(os.getenv('STATS_FLUSH_CONCURRENCY', '8'))
+        self._pending: Dict[Key, dict] = {}  # deltas not yet picked up by a flush
+        self._flushing: Dict[Key, dict] = {}  # deltas being written right now
+        self._flushed: Dict[Key, asyncio.Event] = {}  # set when the key's in-flight write ends
+        self._readers: Dict[Key, list] = {}  # reads in progress per key; a flush of the key marks them stale
+        self._flush_fn: Optional[FlushFn] = None
+        self._lock = asyncio.Lock()
+        self._task = None
+        self.increments = 0
+        self.writes = 0
+
+    def start(self, flush_fn: FlushFn):
+        """Start the periodic flush; `flush_fn(user_id, date, deltas)` does the write."""
+        self._flush_fn = flush_fn
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add(self, user_id: str, date: str, field: str, amount: int):
+        deltas = self._pending.setdefault((user_id, date), {})
+        deltas[field] = deltas.get(field, 0) + amount
+        self.increments += 1
+        if len(self._pending) >= self.max_keys and not self._lock.locked():
+            asyncio.get_running_loop().create_task(self.flush())
+
+    def pending(self, user_id: str, date: str) -> dict:
+        """Deltas accepted for this user and day that are not yet in the database."""
+        merged = dict(self._flushing.get((user_id, date), {}))
+        for field, amount in self._pending.get((user_id, date), {}).items():
+            merged[field] = merged.get(field, 0) + amount
+        return merged
+
+    async def read(self, user_id: str, date: str, read_fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, dict]:
+        """`read_fn()` (the stored row) and the deltas not in it, without counting a flush twice."""
+        key = (user_id, date)
+        while True:
+            flushed = self._flushed.get(key)
+            if flushed is not None:
+                await flushed.wait()
+                continue
+            reading = {"stale": False}
+            self._readers.setdefault(key, []).append(reading)
+            try:
+                row = await read_fn()
+            finally:
+                readers = self._readers[key]
+                readers.remove(reading)
+                if not readers:
+                    del self._readers[key]
+            if not reading["stale"]:
+                # No write of this key began during the read: the row and the buffer do not overlap
+                return row, self.pending(user_id, date)
+
+    def discard(self, user_id: str):
+        for key in [key for key in self._pending if key[0] == user_id]:
+            del self._pending[key]
+
+    async def flush(self, user_id: str = None, date: str = None):
+        """Write buffered deltas - all of them, or only one user's day."""
+        async with self._lock:
+            if user_id is not None:
+                keys = [(user_id, date)] if (user_id, date) in self._pending else []
+            else:
+                keys = list(self._pending)
+            for key in keys:
+                self._flushing[key] = self._pending.pop(key)
+                self._flushed[key] = asyncio.Event()
+                for reading in self._readers.get(key, []):
+                    reading["stale"] = True
+            semaphore = asyncio.Semaphore(max(1, self.flush_concurrency))
+            await asyncio.gather(*(self._flush_key(key, semaphore) for key in keys))
+
+    async def _flush_key(self, key: Key, semaphore: asyncio.Semaphore):
+        deltas = self._flushing[key]
+        try:
+            async with semaphore:
+                await self._flush_fn(key[0], key[1], deltas)
+            self.writes += 1
+        except Exception as e:
+            print(f"Stats flush failed for {key}: {e}")
+            # Put the deltas back so the next flush retries them
+            retry = self._pending.setdefault(key, {})
+            for field, amount in deltas.items():
+                retry[field] = retry.get(field, 0) + amount
+        finally:
+            del self._flushing[key]
+            self._flushed.pop(key).set()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending:
+                await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_keys": len(self._pending),
+            "increments": self.increments,
+            "writes": self.writes,
+        }
+
+
+# Singleton instance
+stats_buffer = StatsBuffer()
@@ -0,0 +1,94 @@
+"""
+In-process cache of the slim authenticated-user record.
+
+Every protected endpoint resolves the JWT's user_id to a user row. The cache
+keeps recent records for a short TTL with LRU eviction, so most requests skip
+the `users` round trip entirely. Concurrent misses for the same user share a
+single database load.
+
+The cache is per process: writes to the users table must call `invalidate`,
+and other workers see the change once their entry expires (USER_CACHE_TTL_SECONDS).
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Every waiter may have gone away before a failed load finished
+    if not task.cancelled():
+        task.exception()
+
+
+class UserCache:
+    def __init__(self, ttl_seconds: float = None, max_size: int = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+        self.max_size = max_size if max_size is not None else int(os.getenv('USER_CACHE_MAX_SIZE', '10000'))
+        self._entries = OrderedDict()  # user_id -> (expires_at, user)
+        self._loading = {}  # user_id -> load Task shared by concurrent misses
+        self._generations = {}  # user_id -> bumped on every invalidate
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return user
+
+    def set(self, user_id: str, user: dict):
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+        # A load already in flight may carry the pre-write record; don't let it be cached
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self._loading.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_load(self, user_id: str, loader: Callable[[str], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """Return the cached user, loading it once through `loader` on a miss."""
+        user = self.get(user_id)
+        if user is not None:
+            self.hits += 1
+            return dict(user)
+
+        self.misses += 1
+        task = self._loading.get(user_id)
+        if task is None:
+            # The load runs in its own task: a caller that disconnects must not cancel it for the others
+            task = asyncio.ensure_future(self._load(user_id, loader, self._generations.get(user_id, 0)))
+            task.add_done_callback(_retrieve_exception)
+            self._loading[user_id] = task
+        user = await asyncio.shield(task)
+        return dict(user) if user is not None else None
+
+    async def _load(self, user_id: str, loader: Callable[[str], Awaitable[Optional[dict]]],
+                    generation: int) -> Optional[dict]:
+        try:
+            user = await loader(user_id)
+        finally:
+            if self._loading.get(user_id) is asyncio.current_task():
+                del self._loading[user_id]
+        if user is not None and self._generations.get(user_id, 0) == generation:
+            self.set(user_id, user)
+        return user
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Singleton instance
+user_cache = UserCache()
@@ -3,6 +3,9 @@ import './App.css';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
 
+// Image URLs from the API are either absolute (object storage) or relative to the backend
+const blobUrl = (url) => (url && !url.startsWith('http') ? `${BACKEND_URL}${url}` : url);
+
 function App() {
   const [currentPage, setCurrentPage] = useState('login');
   const [token, setToken] = useState(localStorage.getItem('fitflow_token'));
@@ -17,6 +20,7 @@ function App() {
   // Food scanner state
   const [scannerMode, setScannerMode] = useState('upload'); // 'upload' or 'camera'
   const [capturedImage, setCapturedImage] = useState(null);
+  const [capturedFile, setCapturedFile] = useState(null);
   const [scanResult, setScanResult] = useState(null);
   const [foodHistory, setFoodHistory] = useState([]);
   const [todayFood, setTodayFood] = useState(null);
@@ -356,8 +360,25 @@ function App() {
       }
     }, 100);
     
+    // Update the last message with the assistant's reply so far
+    const updateAssistantMessage = (text, timestamp) => {
+      setChatMessages(prev => {
+        const newMessages = [...prev];
+        newMessages[newMessages.length - 1] = {
+          user_message: userMessage,
+          assistant_message: text,
+          timestamp: timestamp || tempUserMsg.timestamp
+        };
+        return newMessages;
+      });
+      if (chatMessagesContainerRef.current) {
+        chatMessagesContainerRef.current.scrollTop = chatMessagesContainerRef.current.scrollHeight;
+      }
+    };
+    
     try {
-      const response = await fetch(`${BACKEND_URL}/api/chat/fitness`, {
+      // Server-sent events: "token" events while the reply is generated, then "done"
+      const response = await fetch(`${BACKEND_URL}/api/chat/fitness/stream`, {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -370,24 +391,40 @@ function App() {
       });
       
       if (response.ok) {
-        const data = await response.json();
-        // Update the last message with assistant's response
-        setChatMessages(prev => {
-          const newMessages = [...prev];
-          newMessages[newMessages.length - 1] = {
-            user_message: userMessage,
-            assistant_message: data.message,
-            timestamp: data.timestamp
-          };
-          return newMessages;
-        });
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let assistantText = '';
         
-        // Scroll to bottom after receiving AI response
-        setTimeout(() => {
-          if (chatMessagesContainerRef.current) {
-            chatMessagesContainerRef.current.scrollTop = chatMessagesContainerRef.current.scrollHeight;
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          
+          let boundary;
+          while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let eventName = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+              if (line.startsWith('event: ')) eventName = line.slice(7);
+              else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (!data) continue;
+            const payload = JSON.parse(data);
+            
+            if (eventName === 'token') {
+              assistantText += payload.text;
+              updateAssistantMessage(assistantText);
+              setIsChatLoading(false);
+            } else if (eventName === 'done') {
+              updateAssistantMessage(payload.message, payload.timestamp);
+            } else if (eventName === 'error') {
+              console.error('Chat stream error:', payload.detail);
+            }
           }
-        }, 100);
+        }
       }
     } catch (err) {
       console.error('Error sending chat message:', err);
@@ -1340,8 +1377,10 @@ function App() {
       canvas.height = video.videoHeight;
       const ctx = canvas.getContext('2d');
       ctx.drawImage(video, 0, 0);
-      const imageData = canvas.toDataURL('image/jpeg', 0.8);
-      setCapturedImage(imageData);
+      canvas.toBlob((blob) => {
+        setCapturedFile(blob);
+        setCapturedImage(URL.createObjectURL(blob));
+      }, 'image/jpeg', 0.8);
       stopCamera();
     }
   };
@@ -1349,16 +1388,14 @@ function App() {
   const handleFileUpload = (e) => {
     const file = e.target.files[0];
     if (file) {
-      const reader = new FileReader();
-      reader.onloadend = () => {
-        setCapturedImage(reader.result);
-      };
-      reader.readAsDataURL(file);
+      // Uploaded as-is (multipart); the object URL is only for the preview
+      setCapturedFile(file);
+      setCapturedImage(URL.createObjectURL(file));
     }
   };
 
   const analyzeFoodImage = async () => {
-    if (!capturedImage) return;
+    if (!capturedFile) return;
     
     setLoading(true);
     setError('');
@@ -1366,7 +1403,7 @@ function App() {
     
     try {
       const formData = new FormData();
-      formData.append('image', capturedImage);
+      formData.append('file', capturedFile, capturedFile.name || 'scan.jpg');
       
       const response = await fetch(`${BACKEND_URL}/api/food/scan`, {
         method: 'POST',
@@ -1405,7 +1442,9 @@ function App() {
   };
 
   const resetScanner = () => {
+    if (capturedImage) URL.revokeObjectURL(capturedImage);
     setCapturedImage(null);
+    setCapturedFile(null);
     setScanResult(null);
     setError('');
     setSuccess('');
@@ -2180,7 +2219,14 @@ function App() {
           <div className="scan-list">
             {foodHistory.slice(0, 3).map((scan) => (
               <div key={scan.scan_id} className="scan-item">
-                <img src={`data:image/jpeg;base64,${scan.image_base64}`} alt={scan.food_name} />
+                {scan.thumbnails?.['160'] ? (
+                  <picture>
+                    <source srcSet={blobUrl(scan.thumbnails['160'].webp)} type="image/webp" />
+                    <img src={blobUrl(scan.thumbnails['160'].jpeg)} alt={scan.food_name} loading="lazy" />
+                  </picture>
+                ) : scan.image_url && (
+                  <img src={blobUrl(scan.image_url)} alt={scan.food_name} loading="lazy" />
+                )}
                 <div className="scan-info">
                   <h4>{scan.food_name}</h4>
                   <p>{Math.round(scan.calories)} Calories</p>
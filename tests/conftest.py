@@ -0,0 +1,28 @@
+import os
+import sys
+
+# Backend modules import each other as top-level modules (the server runs from backend/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import pytest
+
+
+@pytest.fixture
+def repos():
+    """Repositories on a fresh in-memory SQLite database."""
+    from database import SQLiteDatabase
+    from repositories import Repositories
+
+    repositories = Repositories(SQLiteDatabase(':memory:'))
+    yield repositories
+    repositories.close()
+
+
+
+@pytest.fixture
+def user_id(repos):
+    """A stored user, for tables with a foreign key to users."""
+    import asyncio
+
+    asyncio.run(repos.users.create({"user_id": "u1", "name": "Test", "email": "u1@example.com", "password": "x"}))
+    return "u1"
@@ -0,0 +1,48 @@
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from blob_store import BlobStore, LocalBlobStore
+
+
+def signed(store, key):
+    query = parse_qs(urlparse(store.url(key)).query)
+    return int(query["expires"][0]), query["sig"][0]
+
+
+def test_url_is_signed_and_verifies(tmp_path):
+    store = LocalBlobStore(str(tmp_path), url_secret="secret")
+    key = asyncio.run(store.put(b"\xff\xd8\xffphoto"))
+    expires, sig = signed(store, key)
+
+    assert store.verify(key, expires, sig)
+    assert not store.verify(key, expires, "0" * 64)
+    assert not store.verify(key, expires + 1, sig)
+    assert not LocalBlobStore(str(tmp_path), url_secret="other").verify(key, expires, sig)
+
+
+def test_expired_url_is_rejected(tmp_path):
+    store = LocalBlobStore(str(tmp_path), url_secret="secret")
+    key = asyncio.run(store.put(b"\xff\xd8\xffphoto"))
+
+    assert not store.verify(key, 1, store.signature(key, 1))
+
+
+def test_url_is_stable_within_a_window(tmp_path):
+    store = LocalBlobStore(str(tmp_path), url_secret="secret", url_expiry_seconds=3600)
+    key = asyncio.run(store.put(b"\xff\xd8\xffphoto"))
+
+    assert store.url(key) == store.url(key)
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoUrls(BlobStore):
+        def _put(self, key, data, content_type):
+            pass
+
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        NoUrls()
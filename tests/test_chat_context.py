@@ -0,0 +1,62 @@
+import asyncio
+
+from chat_context import ChatContextManager
+
+
+def seed_turns(repos, count, user_id="u1"):
+    rows = [{
+        "chat_id": f"c{i:02d}",
+        "user_id": user_id,
+        "user_message": f"question {i}",
+        "assistant_message": f"answer {i}",
+        "language": "english",
+        "created_at": f"2026-01-01T00:00:{i:02d}",
+    } for i in range(1, count + 1)]
+    asyncio.run(repos.chat_history.create_many(rows))
+    return rows
+
+
+def test_unsummarized_turns_outside_the_window_stay_verbatim(repos, user_id):
+    seed_turns(repos, 11)
+    manager = ChatContextManager(turns=6, summary_batch=6, max_tokens=10000)
+
+    context = asyncio.run(manager.load(repos, "u1", "system", "hello"))
+
+    assert context.summary is None
+    assert [turn["chat_id"] for turn in context.turns] == [f"c{i:02d}" for i in range(1, 12)]
+
+
+def test_summarized_turns_are_left_out(repos, user_id):
+    rows = seed_turns(repos, 11)
+    asyncio.run(repos.chat_summaries.upsert("u1", "earlier talk", rows[2]["created_at"], rows[2]["chat_id"], 3))
+    manager = ChatContextManager(turns=6, summary_batch=6, max_tokens=10000)
+
+    context = asyncio.run(manager.load(repos, "u1", "system", "hello"))
+
+    assert context.summary == "earlier talk"
+    assert [turn["chat_id"] for turn in context.turns] == [f"c{i:02d}" for i in range(4, 12)]
+
+
+def test_summarize_folds_a_batch_then_load_keeps_the_rest(repos, user_id):
+    seed_turns(repos, 9)
+    manager = ChatContextManager(turns=3, summary_batch=3, max_tokens=10000)
+
+    async def summarize(previous, turns):
+        return "summary of " + ",".join(turn["chat_id"] for turn in turns)
+
+    assert asyncio.run(manager.maybe_summarize(repos, "u1", summarize))
+    context = asyncio.run(manager.load(repos, "u1", "system", "hello"))
+
+    assert context.summary == "summary of c01,c02,c03,c04,c05,c06"
+    assert [turn["chat_id"] for turn in context.turns] == ["c07", "c08", "c09"]
+
+
+def test_budget_drops_oldest_turns_first(repos, user_id):
+    seed_turns(repos, 11)
+    manager = ChatContextManager(turns=6, summary_batch=6, max_tokens=30)
+
+    context = asyncio.run(manager.load(repos, "u1", "system", "hello"))
+
+    assert context.turns
+    assert context.turns[-1]["chat_id"] == "c11"
+    assert len(context.turns) < 11
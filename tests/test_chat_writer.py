@@ -0,0 +1,86 @@
+import asyncio
+
+from chat_writer import ChatHistoryWriter
+
+
+def row(user_id, message):
+    return {"user_id": user_id, "user_message": message, "assistant_message": "ok"}
+
+
+def test_rows_are_written_in_one_batch_and_visible_while_pending():
+    async def scenario():
+        batches = []
+
+        async def write_fn(rows):
+            batches.append([r["user_message"] for r in rows])
+
+        writer = ChatHistoryWriter(flush_interval=60, batch_size=100, max_retries=3)
+        writer.start(write_fn)
+        writer.add(row("u1", "a"))
+        writer.add(row("u2", "b"))
+        writer.add(row("u1", "c"))
+        assert [r["user_message"] for r in writer.pending("u1")] == ["c", "a"]
+        await writer.stop()
+        assert batches == [["a", "b", "c"]]
+        assert writer.pending("u1") == []
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_is_retried_then_written_row_by_row():
+    async def scenario():
+        written = []
+
+        async def write_fn(rows):
+            if len(rows) > 1 or rows[0]["user_message"] == "bad":
+                raise RuntimeError("write failed")
+            written.append(rows[0]["user_message"])
+
+        writer = ChatHistoryWriter(flush_interval=60, batch_size=100, max_retries=2)
+        writer._write_fn = write_fn
+        for message in ("a", "bad", "c"):
+            writer.add(row("u1", message))
+        assert not await writer.flush()
+        assert writer.stats()["pending_rows"] == 3  # back in the queue for the retry
+        assert not await writer.flush()
+        assert written == ["a", "c"]
+        assert writer.stats()["dropped"] == 1
+        assert writer.stats()["pending_rows"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_merge_pending_overlays_stored_rows():
+    writer = ChatHistoryWriter(flush_interval=60, batch_size=100, max_retries=3)
+    stored = [{"chat_id": "old", "user_id": "u1", "created_at": "2026-01-01T00:00:00"}]
+    queued = writer.add({"user_id": "u1", "user_message": "new", "created_at": "2026-01-02T00:00:00"})
+    assert [r["chat_id"] for r in writer.merge_pending("u1", stored, 10)] == [queued["chat_id"], "old"]
+    assert [r["chat_id"] for r in writer.merge_pending("u1", stored, 1)] == [queued["chat_id"]]
+
+
+def test_batches_land_in_sqlite(repos, user_id):
+    async def scenario():
+        writer = ChatHistoryWriter(flush_interval=60, batch_size=100, max_retries=3)
+        writer.start(repos.chat_history.create_many)
+        for message in ("a", "b"):
+            writer.add(row(user_id, message))
+        await writer.stop()
+        rows, _ = await repos.chat_history.list_page(user_id, 10)
+        return rows
+
+    assert sorted(r["user_message"] for r in asyncio.run(scenario())) == ["a", "b"]
+
+
+def test_history_page_is_newest_first(repos, user_id):
+    # What /api/chat/history returns for the first page: stored rows plus pending ones, newest first
+    async def scenario():
+        writer = ChatHistoryWriter(flush_interval=60, batch_size=100, max_retries=3)
+        await repos.chat_history.create_many([
+            {**row(user_id, f"q{i}"), "chat_id": f"c{i}", "created_at": f"2026-01-01T00:00:0{i}"} for i in range(3)
+        ])
+        queued = writer.add({**row(user_id, "q3"), "created_at": "2026-01-02T00:00:00"})
+        rows, _ = await repos.chat_history.list_page(user_id, 3)
+        return queued["chat_id"], writer.merge_pending(user_id, rows, 3)
+
+    queued_id, page = asyncio.run(scenario())
+    assert [r["chat_id"] for r in page] == [queued_id, "c2", "c1"]
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from database import Database, SQLiteDatabase
+
+
+@pytest.fixture
+def db():
+    database = SQLiteDatabase(':memory:')
+    asyncio.run(database.insert('users', {"user_id": "u1", "name": "Test", "email": "u1@example.com", "password": "x"}))
+    yield database
+    database.close()
+
+
+def chat(chat_id, user_id="u1"):
+    return {"chat_id": chat_id, "user_id": user_id, "user_message": "hi"}
+
+
+def test_failed_bulk_insert_writes_nothing(db):
+    with pytest.raises(Exception):
+        # The second row violates the users foreign key
+        asyncio.run(db.insert('chat_history', [chat("c1"), chat("c2", user_id="missing")]))
+    # An unrelated write afterwards must not commit the first row of the failed batch
+    asyncio.run(db.insert('goals', {"goal_id": "g1", "user_id": "u1", "goal_type": "steps",
+                                    "target_value": 10000, "unit": "steps"}))
+
+    assert asyncio.run(db.fetch_all('chat_history', {'user_id': 'u1'}, 'chat_id')) == []
+    assert len(asyncio.run(db.fetch_all('goals', {'user_id': 'u1'}, 'goal_id'))) == 1
+
+
+def test_failed_bulk_upsert_writes_nothing(db):
+    with pytest.raises(Exception):
+        asyncio.run(db.upsert('chat_history', [chat("c1"), chat("c2", user_id="missing")]))
+    assert asyncio.run(db.fetch_all('chat_history', {'user_id': 'u1'}, 'chat_id')) == []
+
+
+def test_json_and_bool_columns_round_trip(db):
+    asyncio.run(db.insert('meal_plans', {"plan_id": "p1", "user_id": "u1", "name": "Plan", "type": "manual",
+                                         "duration": 1, "days": [{"day_number": 1, "meals": {}}]}))
+    plan = asyncio.run(db.fetch_one('meal_plans', {'plan_id': 'p1'}, 'plan_id, days'))
+    assert plan["days"] == [{"day_number": 1, "meals": {}}]
+
+
+def test_wildcard_select_is_rejected(db):
+    with pytest.raises(ValueError):
+        asyncio.run(db.fetch_one('users', {'user_id': 'u1'}, '*'))
+
+
+def test_update_and_delete_return_row_counts(db):
+    assert asyncio.run(db.update('users', {"name": "New"}, {'user_id': 'u1'})) == 1
+    assert asyncio.run(db.update('users', {"name": "New"}, {'user_id': 'nobody'})) == 0
+    assert asyncio.run(db.delete('users', {'user_id': 'u1'})) == 1
+
+
+def test_incomplete_backend_fails_at_construction():
+    class Partial(Database):
+        def _select(self, table, columns, filters, gte, order, desc, limit):
+            return []
+
+    with pytest.raises(TypeError):
+        Partial(None)
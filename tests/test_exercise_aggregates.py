@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def exercise_id(repos):
+    asyncio.run(repos.db.insert('exercises', {"exercise_id": "bench", "name": "Bench Press", "category": "chest"}))
+    return "bench"
+
+
+def session(user_id, exercise_id, weight, reps, created_at):
+    sets = [{"weight": weight, "reps": reps}]
+    return {
+        "session_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "exercise_id": exercise_id,
+        "exercise_name": "Bench Press",
+        "sets": sets,
+        "total_sets": 1,
+        "total_volume": weight * reps,
+        "weight_unit": "kg",
+        "created_at": created_at,
+        "completed": True,
+    }
+
+
+def test_record_session_inserts_and_folds(repos, user_id, exercise_id):
+    asyncio.run(repos.exercise_aggregates.record_session(session(user_id, exercise_id, 100, 5, "2026-01-01T00:00:00")))
+    asyncio.run(repos.exercise_aggregates.record_session(session(user_id, exercise_id, 80, 10, "2026-01-02T00:00:00")))
+
+    aggregate = asyncio.run(repos.exercise_aggregates.get(user_id, exercise_id))
+    assert aggregate["total_sessions"] == 2
+    assert aggregate["total_volume"] == 1300
+    assert aggregate["personal_best"] == 100
+    assert aggregate["previous_volume"] == 500
+    rows, _ = asyncio.run(repos.workout_sessions.list_page(user_id, 10))
+    assert len(rows) == 2
+
+
+def test_refresh_between_insert_and_fold_does_not_double_count(repos, user_id, exercise_id):
+    new = session(user_id, exercise_id, 100, 5, "2026-01-01T00:00:00")
+    # A refresh that already saw the session, then the fold of that same session
+    asyncio.run(repos.workout_sessions.create(new))
+    asyncio.run(repos.exercise_aggregates.refresh(user_id, exercise_id))
+    params = {"p_user_id": user_id, "p_exercise_id": exercise_id, "p_total_volume": 500, "p_max_weight": 100,
+              "p_max_reps": 5, "p_estimated_1rm": None, "p_weight_unit": "kg",
+              "p_last_session": {"session_id": new["session_id"], "total_volume": 500}}
+    asyncio.run(repos.db.rpc('apply_workout_session', params))
+
+    aggregate = asyncio.run(repos.exercise_aggregates.get(user_id, exercise_id))
+    assert aggregate["total_sessions"] == 1
+    assert aggregate["total_volume"] == 500
+
+
+def test_failed_record_leaves_no_session(repos, user_id):
+    # Unknown exercise: the aggregate's foreign key fails after the session insert
+    with pytest.raises(Exception):
+        asyncio.run(repos.exercise_aggregates.record_session(session(user_id, "missing", 100, 5, "2026-01-01T00:00:00")))
+    rows, _ = asyncio.run(repos.workout_sessions.list_page(user_id, 10))
+    assert rows == []
+
+
+def test_record_session_defaults_omitted_fields(repos, user_id, exercise_id):
+    new = session(user_id, exercise_id, 100, 5, None)
+    for field in ("created_at", "weight_unit", "completed"):
+        del new[field]
+    asyncio.run(repos.exercise_aggregates.record_session(new))
+
+    rows, _ = asyncio.run(repos.workout_sessions.list_page(user_id, 10))
+    assert rows[0]["created_at"] is not None
+    assert rows[0]["weight_unit"] == "kg"
+    assert rows[0]["completed"] in (True, 1)
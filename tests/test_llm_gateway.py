@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from llm_gateway import LlmGateway, LlmGatewaySaturated, PRIORITY_CHAT, PRIORITY_SCAN
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_admits_up_to_max_concurrency_then_queues():
+    async def scenario():
+        gateway = LlmGateway(max_concurrency=1, max_queued=4, max_queued_per_user=4, queue_timeout=5)
+        await gateway.acquire("a", PRIORITY_CHAT)
+        waiting = asyncio.ensure_future(gateway.acquire("b", PRIORITY_CHAT))
+        await asyncio.sleep(0)
+        assert gateway.stats()["queued"] == 1
+        gateway.release()
+        await waiting
+        assert gateway.in_flight == 1
+        gateway.release()
+        assert gateway.in_flight == 0
+
+    run(scenario())
+
+
+def test_priority_then_round_robin_between_users():
+    async def scenario():
+        gateway = LlmGateway(max_concurrency=1, max_queued=8, max_queued_per_user=4, queue_timeout=5)
+        await gateway.acquire("holder", PRIORITY_CHAT)
+        order = []
+
+        async def call(user_id, priority):
+            await gateway.acquire(user_id, priority)
+            order.append(user_id)
+            gateway.release()
+
+        tasks = [asyncio.ensure_future(call(user_id, priority)) for user_id, priority in
+                 [("a", PRIORITY_CHAT), ("a", PRIORITY_CHAT), ("b", PRIORITY_CHAT), ("scan", PRIORITY_SCAN)]]
+        await asyncio.sleep(0)
+        gateway.release()
+        await asyncio.gather(*tasks)
+        assert order == ["scan", "a", "b", "a"]
+        assert gateway.in_flight == 0
+
+    run(scenario())
+
+
+def test_rejects_when_user_queue_is_full():
+    async def scenario():
+        gateway = LlmGateway(max_concurrency=1, max_queued=8, max_queued_per_user=1, queue_timeout=5)
+        await gateway.acquire("a", PRIORITY_CHAT)
+        waiting = asyncio.ensure_future(gateway.acquire("a", PRIORITY_CHAT))
+        await asyncio.sleep(0)
+        with pytest.raises(LlmGatewaySaturated):
+            await gateway.acquire("a", PRIORITY_CHAT)
+        assert gateway.rejected == 1
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+    run(scenario())
+
+
+def test_release_after_queued_caller_is_cancelled_frees_the_slot():
+    async def scenario():
+        gateway = LlmGateway(max_concurrency=1, max_queued=4, max_queued_per_user=4, queue_timeout=5)
+        await gateway.acquire("a", PRIORITY_CHAT)
+        waiting = asyncio.ensure_future(gateway.acquire("b", PRIORITY_CHAT))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.sleep(0)  # wait_for has cancelled the waiter, acquire has not cleaned up yet
+        gateway.release()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert gateway.in_flight == 0
+        assert gateway.stats()["queued"] == 0
+        # The slot is usable again
+        await asyncio.wait_for(gateway.acquire("c", PRIORITY_CHAT), 1)
+        assert gateway.in_flight == 1
+
+    run(scenario())
+
+
+def test_release_after_queued_caller_times_out_frees_the_slot():
+    async def scenario():
+        gateway = LlmGateway(max_concurrency=1, max_queued=4, max_queued_per_user=4, queue_timeout=0.01)
+        await gateway.acquire("a", PRIORITY_CHAT)
+        with pytest.raises(LlmGatewaySaturated):
+            await gateway.acquire("b", PRIORITY_CHAT)
+        gateway.release()
+        assert gateway.in_flight == 0
+        assert gateway.stats()["queued"] == 0
+        assert gateway.timed_out == 1
+
+    run(scenario())
+
+
+def test_release_skips_waiter_whose_timeout_fired_but_has_not_cleaned_up():
+    async def scenario():
+        gateway = LlmGateway(max_concurrency=1, max_queued=4, max_queued_per_user=4, queue_timeout=0.01)
+        await gateway.acquire("a", PRIORITY_CHAT)
+        waiting = asyncio.ensure_future(gateway.acquire("b", PRIORITY_CHAT))
+        await asyncio.sleep(0)
+        # Cancel the queued future directly, as wait_for does on timeout, and release before acquire resumes
+        queued = next(iter(gateway._queues[PRIORITY_CHAT]["b"]))
+        queued.cancel()
+        gateway.release()
+        results = await asyncio.gather(waiting, return_exceptions=True)
+        assert isinstance(results[0], (LlmGatewaySaturated, asyncio.CancelledError))
+        assert gateway.in_flight == 0
+        assert gateway.stats()["queued"] == 0
+
+    run(scenario())
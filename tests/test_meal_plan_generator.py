@@ -0,0 +1,69 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from llm_gateway import llm_gateway
+from meal_plan_generator import InvalidMealPlan, MEAL_KEYS, MEAL_PLAN_MAX_DAYS, generate_days, validate_days
+
+
+def reply_for(prompt):
+    first, last = map(int, re.search(r"day_number (\d+) to (\d+)", prompt).groups())
+    meal = {"name": "Oats", "calories": "400", "protein": 20, "carbs": 50, "fat": 10}
+    days = [{"day_number": 1, "meals": {key: meal for key in MEAL_KEYS}} for _ in range(first, last + 1)]
+    return "```json\n" + json.dumps({"days": days}) + "\n```"
+
+
+def test_chunks_are_merged_in_day_order():
+    prompts = []
+
+    async def send(prompt):
+        prompts.append(prompt)
+        return reply_for(prompt)
+
+    days = asyncio.run(generate_days(send, 7, 2000, "vegetarian", None, days_per_call=2))
+    assert [day["day_number"] for day in days] == list(range(1, 8))
+    assert len(prompts) == 4
+    assert days[0]["meals"]["breakfast"]["calories"] == 400.0
+    assert all("vegetarian" in prompt for prompt in prompts)
+
+
+def test_invalid_chunk_is_retried_once():
+    calls = []
+
+    async def send(prompt):
+        calls.append(prompt)
+        return "not json" if len(calls) == 1 else reply_for(prompt)
+
+    days = asyncio.run(generate_days(send, 2, 2000, days_per_call=2))
+    assert len(days) == 2 and len(calls) == 2
+
+
+def test_missing_meal_is_rejected():
+    data = json.loads(reply_for("day_number 1 to 1").split("```json")[1].split("```")[0])
+    del data["days"][0]["meals"]["dinner"]
+    with pytest.raises(InvalidMealPlan):
+        validate_days(data, [1])
+
+
+def test_duration_is_capped():
+    async def send(prompt):
+        raise AssertionError("no call expected")
+
+    with pytest.raises(ValueError):
+        asyncio.run(generate_days(send, MEAL_PLAN_MAX_DAYS + 1, 2000))
+
+
+def test_default_fan_out_is_a_fraction_of_the_gateway():
+    running, peak = [0], [0]
+
+    async def send(prompt):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return reply_for(prompt)
+
+    asyncio.run(generate_days(send, 14, 2000, days_per_call=2))
+    assert 1 <= peak[0] <= max(1, llm_gateway.max_concurrency // 4)
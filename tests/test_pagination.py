@@ -0,0 +1,30 @@
+import pytest
+
+from pagination import clamp_limit, decode_cursor, encode_cursor, page, MAX_PAGE_SIZE
+
+
+def test_clamp_limit():
+    assert clamp_limit(None) == 20
+    assert clamp_limit(0) == 20
+    assert clamp_limit(-5) == 1
+    assert clamp_limit(10_000) == MAX_PAGE_SIZE
+
+
+def test_cursor_round_trip():
+    row = {"created_at": "2026-01-01T00:00:00", "chat_id": "c1"}
+    assert decode_cursor(encode_cursor(row, "created_at", "chat_id")) == ("2026-01-01T00:00:00", "c1")
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzEsMl0", "e30"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_page_splits_the_extra_row_into_a_cursor():
+    rows = [{"created_at": f"t{i}", "chat_id": f"c{i}"} for i in range(3)]
+    assert page(rows, 3, "created_at", "chat_id") == (rows, None)
+    first, cursor = page(rows, 2, "created_at", "chat_id")
+    assert first == rows[:2]
+    assert decode_cursor(cursor) == ("t1", "c1")
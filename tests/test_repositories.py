@@ -0,0 +1,55 @@
+import asyncio
+
+from pagination import decode_cursor
+
+
+def add_chats(repos, user_id, count):
+    asyncio.run(repos.chat_history.create_many([{
+        "chat_id": f"c{i:02d}",
+        "user_id": user_id,
+        "user_message": f"question {i}",
+        # Pairs of rows share a timestamp so the id tiebreak matters
+        "created_at": f"2026-01-01T00:00:{i // 2:02d}",
+    } for i in range(count)]))
+
+
+def test_user_round_trip_uses_the_slim_projection(repos, user_id):
+    asyncio.run(repos.users.update(user_id, {"profile_picture": "data:image/png;base64,AAAA", "age": 30}))
+    user = asyncio.run(repos.users.get(user_id))
+    assert user["age"] == 30
+    assert "profile_picture" not in user and "password" not in user
+
+
+def test_cursor_pages_cover_every_row_once(repos, user_id):
+    add_chats(repos, user_id, 7)
+    seen, before = [], None
+    while True:
+        rows, cursor = asyncio.run(repos.chat_history.list_page(user_id, 3, before))
+        seen.extend(row["chat_id"] for row in rows)
+        if cursor is None:
+            break
+        before = decode_cursor(cursor)
+    assert seen == [f"c{i:02d}" for i in reversed(range(7))]
+
+
+def test_stats_increment_creates_then_adds(repos, user_id):
+    asyncio.run(repos.user_stats.increment(user_id, "2026-01-01", {"steps": 100}))
+    row = asyncio.run(repos.user_stats.increment(user_id, "2026-01-01", {"steps": 50, "water_intake": 2}))
+    assert row["steps"] == 150 and row["water_intake"] == 2
+    assert asyncio.run(repos.user_stats.get_for_date(user_id, "2026-01-01"))["steps"] == 150
+
+
+def test_chat_summary_upsert_replaces(repos, user_id):
+    asyncio.run(repos.chat_summaries.upsert(user_id, "first", "2026-01-01T00:00:00", "c1", 3))
+    asyncio.run(repos.chat_summaries.upsert(user_id, "second", "2026-01-01T00:00:05", "c6", 6))
+    summary = asyncio.run(repos.chat_summaries.get(user_id))
+    assert summary["summary"] == "second" and summary["turn_count"] == 6
+
+
+def test_delete_for_user_only_touches_that_user(repos, user_id):
+    asyncio.run(repos.users.create({"user_id": "u2", "name": "Other", "email": "u2@example.com", "password": "x"}))
+    add_chats(repos, user_id, 2)
+    asyncio.run(repos.chat_history.create({"chat_id": "other", "user_id": "u2", "user_message": "hi"}))
+    assert asyncio.run(repos.chat_history.delete_for_user(user_id)) == 2
+    rows, _ = asyncio.run(repos.chat_history.list_page("u2", 10))
+    assert [row["chat_id"] for row in rows] == ["other"]
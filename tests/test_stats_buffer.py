@@ -0,0 +1,152 @@
+import asyncio
+
+from stats_buffer import StatsBuffer
+
+
+def test_deltas_merge_per_key_and_flush_once():
+    async def scenario():
+        writes = []
+
+        async def flush_fn(user_id, date, deltas):
+            writes.append((user_id, date, dict(deltas)))
+            return {}
+
+        buffer = StatsBuffer(flush_interval=60, max_keys=100)
+        buffer.start(flush_fn)
+        buffer.add("u1", "2026-01-01", "steps", 100)
+        buffer.add("u1", "2026-01-01", "steps", 50)
+        buffer.add("u1", "2026-01-01", "water_intake", 1)
+        assert buffer.pending("u1", "2026-01-01") == {"steps": 150, "water_intake": 1}
+        await buffer.stop()
+        assert writes == [("u1", "2026-01-01", {"steps": 150, "water_intake": 1})]
+        assert buffer.pending("u1", "2026-01-01") == {}
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_keeps_the_deltas():
+    async def scenario():
+        async def flush_fn(user_id, date, deltas):
+            raise RuntimeError("db down")
+
+        buffer = StatsBuffer(flush_interval=60, max_keys=100)
+        buffer._flush_fn = flush_fn
+        buffer.add("u1", "2026-01-01", "steps", 100)
+        await buffer.flush()
+        buffer.add("u1", "2026-01-01", "steps", 1)
+        assert buffer.pending("u1", "2026-01-01") == {"steps": 101}
+
+    asyncio.run(scenario())
+
+
+def test_flush_writes_through_the_repository(repos, user_id):
+    async def scenario():
+        buffer = StatsBuffer(flush_interval=60, max_keys=100)
+        buffer._flush_fn = repos.user_stats.increment
+        buffer.add(user_id, "2026-01-01", "steps", 100)
+        buffer.add(user_id, "2026-01-01", "steps", 20)
+        await buffer.flush(user_id, "2026-01-01")
+        return await repos.user_stats.get_for_date(user_id, "2026-01-01")
+
+    assert asyncio.run(scenario())["steps"] == 120
+
+
+def test_read_does_not_count_a_committed_flush_twice():
+    async def scenario():
+        stored = {"steps": 0}
+        committed = asyncio.Event()
+        finish = asyncio.Event()
+
+        async def flush_fn(user_id, date, deltas):
+            stored["steps"] += deltas["steps"]  # committed in the database...
+            committed.set()
+            await finish.wait()  # ...but the response has not arrived yet
+            return {}
+
+        async def read_fn():
+            return dict(stored)
+
+        buffer = StatsBuffer(flush_interval=60, max_keys=100)
+        buffer._flush_fn = flush_fn
+        buffer.add("u1", "2026-01-01", "steps", 100)
+        flush = asyncio.ensure_future(buffer.flush())
+        await committed.wait()
+        read = asyncio.ensure_future(buffer.read("u1", "2026-01-01", read_fn))
+        await asyncio.sleep(0)
+        assert not read.done()  # waits for the in-flight write
+        finish.set()
+        await flush
+        row, pending = await read
+        assert row["steps"] + pending.get("steps", 0) == 100
+
+    asyncio.run(scenario())
+
+
+def test_read_retries_when_a_flush_starts_during_it():
+    async def scenario():
+        stored = {"steps": 0}
+        reads = []
+
+        async def flush_fn(user_id, date, deltas):
+            stored["steps"] += deltas["steps"]
+            return {}
+
+        buffer = StatsBuffer(flush_interval=60, max_keys=100)
+        buffer._flush_fn = flush_fn
+        buffer.add("u1", "2026-01-01", "steps", 100)
+
+        async def read_fn():
+            reads.append(dict(stored))
+            if len(reads) == 1:
+                await buffer.flush()  # a flush begins and commits while the read is out
+            return dict(stored)
+
+        row, pending = await buffer.read("u1", "2026-01-01", read_fn)
+        assert row["steps"] + pending.get("steps", 0) == 100
+        assert len(reads) == 2
+
+    asyncio.run(scenario())
+
+
+def test_keys_are_written_concurrently_up_to_the_limit():
+    async def scenario():
+        running, peak = [0], [0]
+
+        async def flush_fn(user_id, date, deltas):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            return {}
+
+        buffer = StatsBuffer(flush_interval=60, max_keys=100, flush_concurrency=3)
+        buffer._flush_fn = flush_fn
+        for i in range(10):
+            buffer.add(f"u{i}", "2026-01-01", "steps", 1)
+        await buffer.flush()
+        assert peak[0] == 3
+        assert buffer.writes == 10
+
+    asyncio.run(scenario())
+
+
+def test_flush_of_another_user_does_not_make_a_read_retry():
+    async def scenario():
+        reads = []
+
+        async def flush_fn(user_id, date, deltas):
+            return {}
+
+        buffer = StatsBuffer(flush_interval=60, max_keys=100)
+        buffer._flush_fn = flush_fn
+        buffer.add("u2", "2026-01-01", "steps", 5)
+
+        async def read_fn():
+            reads.append(1)
+            await buffer.flush()
+            return {"steps": 0}
+
+        await buffer.read("u1", "2026-01-01", read_fn)
+        assert len(reads) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from user_cache import UserCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = UserCache(ttl_seconds=60, max_size=10)
+        calls = []
+
+        async def loader(user_id):
+            calls.append(user_id)
+            await asyncio.sleep(0.01)
+            return {"user_id": user_id}
+
+        users = await asyncio.gather(*(cache.get_or_load("u1", loader) for _ in range(3)))
+        assert users == [{"user_id": "u1"}] * 3
+        assert calls == ["u1"]
+        assert await cache.get_or_load("u1", loader) == {"user_id": "u1"}
+        assert cache.stats()["hits"] == 1
+
+    run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_load():
+    async def scenario():
+        cache = UserCache(ttl_seconds=60, max_size=10)
+
+        async def loader(user_id):
+            await asyncio.sleep(0.01)
+            return {"user_id": user_id}
+
+        first = asyncio.ensure_future(cache.get_or_load("u1", loader))
+        second = asyncio.ensure_future(cache.get_or_load("u1", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == {"user_id": "u1"}
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert cache.get("u1") == {"user_id": "u1"}
+
+    run(scenario())
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        cache = UserCache(ttl_seconds=60, max_size=10)
+
+        async def loader(user_id):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(*(cache.get_or_load("u1", loader) for _ in range(2)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert cache.get("u1") is None
+
+    run(scenario())
+
+
+def test_invalidate_during_load_keeps_stale_record_out():
+    async def scenario():
+        cache = UserCache(ttl_seconds=60, max_size=10)
+
+        async def loader(user_id):
+            await asyncio.sleep(0.01)
+            return {"user_id": user_id, "name": "old"}
+
+        load = asyncio.ensure_future(cache.get_or_load("u1", loader))
+        await asyncio.sleep(0)
+        cache.invalidate("u1")
+        assert (await load)["name"] == "old"
+        assert cache.get("u1") is None
+
+    run(scenario())